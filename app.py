@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import time
-from modules import data_loader, logic_chaser, logic_auditor, logic_welfare, chatbot, mock_generator, insight_engine, config_manager
-from ui import cards
+import json
+import os
+import uuid
+from modules import dataset_cache, decision_journal, issue_store, sql_issue_store, batch_executor, chatbot, insight_engine, config_manager, event_timeline, instrumentation, logic_role_pay, simulation
+from ui import cards, figure_cache, grouping
 
 # --- Page Config ---
 st.set_page_config(
@@ -12,6 +15,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- Instrumentation (per-rerun trace; no-op unless enabled in Admin Mode or MELZI_TRACE=1) ---
+instrumentation.begin_trace()
+rerun_span = instrumentation.span('app.rerun')
+
 # --- CSS Styling ---
 st.markdown("""
 <style>
@@ -117,83 +124,126 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 # --- State Management ---
+# Issue store backend: 'memory' (default, IssueStore) or 'sqlite' (SqlIssueStore)
+ISSUE_BACKEND = os.environ.get('MELZI_ISSUE_BACKEND', 'memory')
+# Non-interactive charts in the grouped list views (lighter to draw when many cards are open)
+STATIC_CHARTS = os.environ.get('MELZI_STATIC_CHARTS', '0') == '1'
+
+def journal_owner():
+    """Whose journal this session replays: the signed-in user, else a workspace id kept in the URL (?user=)."""
+    email = st.user.get('email')
+    if email:
+        return email
+    if 'user' not in st.query_params:
+        st.query_params['user'] = uuid.uuid4().hex[:12]
+    return st.query_params['user']
+
+def get_timeline():
+    """Effective-dated event timeline of the current dataset snapshot (built once per version)."""
+    version = st.session_state['dataset_lease'].snapshot.version
+    cached = st.session_state.get('event_timeline')
+    if cached is None or cached[0] != version:
+        cached = (version, event_timeline.build_timeline(st.session_state['data']))
+        st.session_state['event_timeline'] = cached
+    return cached[1]
+
+def get_role_pay():
+    """Role-pay mismatch candidates of the current dataset snapshot, by employee (built once per version)."""
+    version = st.session_state['dataset_lease'].snapshot.version
+    cached = st.session_state.get('role_pay')
+    if cached is None or cached[0] != version:
+        candidates = logic_role_pay.role_pay_candidates(st.session_state['data'], get_timeline())
+        cached = (version, logic_role_pay.index_by_employee(candidates))
+        st.session_state['role_pay'] = cached
+    return cached[1]
+
+# Tables and detected issues live in one shared, read-only snapshot per server process.
+# Each session only keeps its own IssueStore: decision deltas, issues it created and completed copies.
+# Decisions are also journaled to disk per user and replayed here, so they survive a reset or server restart.
+state_span = instrumentation.span('app.session_state')
 if 'data_loaded' not in st.session_state:
-    data = data_loader.load_data()
-    st.session_state['data'] = data
-    
-    # Generate initial issues
-    chaser_issues = logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'])
-    auditor_issues = logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'])
-    welfare_issues = logic_welfare.get_welfare_issues(data_loader.DATA_DIR)
-    
-    all_issues = chaser_issues + auditor_issues + welfare_issues
-    
-    # --- Mock Data Enrichment for Melzi 2.0 (Refactored) ---
-    # Optimized for Demo: Reduced scale to 50 issues (approx 400 employees) for speed
-    expanded_issues = mock_generator.generate_mock_data(all_issues, target_count=50)
-
-    st.session_state['issues'] = expanded_issues
-    st.session_state['completed_issues'] = []
+    st.session_state['journal_owner'] = journal_owner()
+    journal = decision_journal.open_journal(st.session_state['journal_owner'])
+    if ISSUE_BACKEND == 'sqlite':
+        # Embedded SQL backend: counts, groups and pages are indexed queries
+        st.session_state['store'] = sql_issue_store.SqlIssueStore(journal=journal)
+        st.session_state['pivot'] = grouping.SqlPivot(st.session_state['store'])
+    else:
+        st.session_state['store'] = issue_store.IssueStore(journal=journal)
+        # Pivot View groups (all four dimensions) are kept up to date incrementally
+        st.session_state['pivot'] = grouping.PivotIndex()
+        st.session_state['store'].subscribe(st.session_state['pivot'])
+    st.session_state['store'].restore(journal.load())
+    # Insights are kept up to date incrementally as the store changes
+    st.session_state['insight_engine'] = insight_engine.InsightEngine()
+    st.session_state['store'].subscribe(st.session_state['insight_engine'])
     st.session_state['chat_history'] = []
     st.session_state['active_issue'] = None
     st.session_state['data_loaded'] = True
 
+lease = st.session_state.get('dataset_lease')
+if lease is None or not dataset_cache.is_current(lease):
+    # First run of this session, or data/ changed: move to the current snapshot and re-apply our decisions
+    new_lease = dataset_cache.acquire()
+    st.session_state['dataset_lease'] = new_lease
+    st.session_state['data'] = new_lease.snapshot.data
+    # Before the rebase: the engine picks the role-pay lines out of the replayed issues
+    st.session_state['insight_engine'].set_role_pay(get_role_pay())
+    st.session_state['store'].rebase(new_lease.snapshot.issues)
+    if lease is not None:
+        lease.release()
+state_span.end()
+
+# Messenger / Davinci DB calls (local stub; latency optimized for Demo)
+BACKEND = batch_executor.StubBackend(latency=0.1)
+
 def reset_app():
     st.session_state.clear()
     st.rerun()
 
+def complete_issue(issue, status, action_taken):
+    """
+    Moves an issue to completed in this session's store (O(1)).
+    Issues may belong to the shared snapshot, so the store keeps a copy and never mutates the original.
+    """
+    return st.session_state['store'].transition(issue['issue_id'], status, action_taken)
+
 def handle_approve(issue, rerun=True):
     # Simulate API call
     with st.spinner("메신저 발송 중..."):
-        time.sleep(0.1) # Optimized for Demo
+        BACKEND.send_message(issue)
     st.toast(f"✅ {issue['name']}님에게 독촉 메시지를 발송했습니다.")
     
-    # Move to completed
-    issue['status'] = 'Approved'
-    issue['action_taken'] = '메시지 발송'
-    st.session_state['completed_issues'].insert(0, issue)
+    # Move to completed (also removes it from the pending list)
+    complete_issue(issue, 'Approved', '메시지 발송')
     
-    # Remove from list
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] != issue['issue_id']]
     if rerun:
         st.rerun()
 
 def handle_apply(issue, rerun=True):
     # Simulate DB Update
     with st.spinner("Davinci DB 업데이트 중..."):
-        time.sleep(0.1) # Optimized for Demo
+        BACKEND.update_davinci(issue)
     st.toast(f"✅ {issue['name']}님의 급여 정보가 업데이트되었습니다.")
     
-    # Move to completed
-    issue['status'] = 'Applied'
-    issue['action_taken'] = 'DB 반영'
-    st.session_state['completed_issues'].insert(0, issue)
+    # Move to completed (also removes it from the pending list)
+    complete_issue(issue, 'Applied', 'DB 반영')
     
-    # Remove from list
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] != issue['issue_id']]
     if rerun:
         st.rerun()
 
 def handle_ignore(issue, rerun=True):
     st.toast(f"db {issue['name']}님의 이슈를 무시했습니다.")
     
-    # Move to completed
-    issue['status'] = 'Ignored'
-    issue['action_taken'] = '무시하기'
-    st.session_state['completed_issues'].insert(0, issue)
+    # Move to completed (also removes it from the pending list)
+    complete_issue(issue, 'Ignored', '무시하기')
     
-    # Remove from list
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] != issue['issue_id']]
     if rerun:
         st.rerun()
 
-def handle_welfare_approve(issue, rerun=True):
-    # 1. Simulate API call
-    with st.spinner("급여 대장 반영 중..."):
-        time.sleep(0.1) # Optimized for Demo
-    
-    # 2. Create new Payroll Issue (Integration)
-    new_payroll_issue = {
+def build_payroll_issue(issue):
+    """New Payroll (Auditor) issue created when a welfare claim is approved."""
+    return {
         'issue_id': f"PAY-{issue['issue_id']}",
         'type': 'Auditor',
         'employee_id': issue['employee_id'],
@@ -204,17 +254,18 @@ def handle_welfare_approve(issue, rerun=True):
         'action_label': '다빈치 적용',
         'status': 'Pending'
     }
+
+def handle_welfare_approve(issue, rerun=True):
+    # 1. Simulate API call
+    with st.spinner("급여 대장 반영 중..."):
+        BACKEND.post_payroll_item(issue)
     
-    # 3. Update Session State
-    # Move welfare issue to completed
-    issue['status'] = 'Approved'
-    issue['action_taken'] = '급여 반영'
-    st.session_state['completed_issues'].insert(0, issue)
-    
-    # Remove welfare issue
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] != issue['issue_id']]
-    # Add new payroll issue
-    st.session_state['issues'].append(new_payroll_issue)
+    # 2. Update Session State
+    # Move welfare issue to completed and add its payroll issue (Integration)
+    store = st.session_state['store']
+    with store.batch():
+        complete_issue(issue, 'Approved', '급여 반영')
+        store.add(build_payroll_issue(issue), local=True)
     
     st.toast(f"✅ 승인 완료! '급여 심사' 탭에 지급 내역({issue['amount']:,}원)이 추가되었습니다.")
     if rerun:
@@ -222,61 +273,77 @@ def handle_welfare_approve(issue, rerun=True):
 
 def handle_welfare_reject(issue, rerun=True):
     with st.spinner("반려 처리 중..."):
-        time.sleep(0.1) # Optimized for Demo
+        BACKEND.update_davinci(issue)
     st.toast(f"🚫 {issue['name']}님의 의료비 청구가 반려되었습니다.")
     
-    # Move to completed
-    issue['status'] = 'Rejected'
-    issue['action_taken'] = '반려'
-    st.session_state['completed_issues'].insert(0, issue)
+    # Move to completed (also removes it from the pending list)
+    complete_issue(issue, 'Rejected', '반려')
     
-    # Remove from list
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] != issue['issue_id']]
     if rerun:
         st.rerun()
 
+def handle_bulk(issues):
+    """
+    Bulk action for the selected rows: backend calls run concurrently (batch_executor),
+    then every successful transition is committed at once and the page reruns a single time.
+    """
+    progress = st.progress(0.0, text=f"0/{len(issues)}건 처리 중...")
+    results = batch_executor.run_batch(
+        issues, BACKEND,
+        on_progress=lambda done, total: progress.progress(done / total, text=f"{done}/{total}건 처리 중...")
+    )
+
+    # Commit all state transitions at once, grouped by issue type (one journal transaction for the whole action)
+    store = st.session_state['store']
+    succeeded = [r['issue'] for r in results if r['ok']]
+    with store.batch():
+        for issue_type, (_, status, action_taken) in batch_executor.ACTIONS.items():
+            typed = [i for i in succeeded if i['type'] == issue_type]
+            store.transition_many([i['issue_id'] for i in typed], status, action_taken)
+            if issue_type == 'Welfare':
+                for issue in typed:
+                    store.add(build_payroll_issue(issue), local=True)
+
+    summary = batch_executor.summarize(results)
+    st.toast(f"✅ {summary['succeeded']}건 처리 완료" + (f" / ⚠️ {summary['failed']}건 실패" if summary['failed'] else ""))
+    failed = [r for r in results if not r['ok']]
+    if failed:
+        st.session_state['bulk_failures'] = [f"{r['issue']['issue_id']}: {r['error']}" for r in failed]
+    st.rerun()
+
 def set_active_issue(issue):
     st.session_state['active_issue'] = issue
 
 def handle_insight_action(insight):
     target_ids = insight['issue_ids']
-    processed_count = 0
-    
-    # Identify issues to move
-    to_move = [i for i in st.session_state['issues'] if i['issue_id'] in target_ids]
     
-    for issue in to_move:
-        # Update status based on insight type
-        if insight['type'] == "Role-Pay Mismatch":
-            issue['status'] = 'Resolved'
-            issue['action_taken'] = '환수 제안'
-        elif insight['type'] == "Bottleneck Manager":
-            issue['status'] = 'Reminded'
-            issue['action_taken'] = '리포트 발송'
-        elif insight['type'] == "Unplanned OT":
-            issue['status'] = 'Investigating'
-            issue['action_taken'] = '부서장 확인'
-            
-        # Move to completed
-        st.session_state['completed_issues'].insert(0, issue)
-        processed_count += 1
-        
-    # Remove from active list
-    st.session_state['issues'] = [i for i in st.session_state['issues'] if i['issue_id'] not in target_ids]
+    # Status based on insight type
+    status, action_taken = {
+        "Role-Pay Mismatch": ('Resolved', '환수 제안'),
+        "Bottleneck Manager": ('Reminded', '리포트 발송'),
+        "Unplanned OT": ('Investigating', '부서장 확인')
+    }.get(insight['type'], ('Resolved', insight['action']))
+
+    # Move to completed in one batch
+    processed_count = len(st.session_state['store'].transition_many(target_ids, status, action_taken))
     
     st.toast(f"✅ {processed_count}건의 이슈를 처리하고 완료 내역으로 이동했습니다.")
     time.sleep(0.2)
     st.rerun()
 
 # --- Sidebar ---
-with st.sidebar:
+with st.sidebar, instrumentation.span('render.sidebar'):
     # --- Melzi's Deep Insight (Sidebar) ---
-    insights = insight_engine.detect_insights(st.session_state['issues'])
+    insights = st.session_state['insight_engine'].insights()
     if insights:
         st.markdown("### 🚨 Risk Monitor")
         for i, insight in enumerate(insights):
             with st.expander(f"{insight['title']}", expanded=True):
                 st.caption(insight['message'])
+                # Per-employee detail (role-pay): the allowances behind the insight
+                for emp_id, items in list(insight.get('employees', {}).items())[:5]:
+                    st.caption(' · '.join(f"{emp_id}: {item['allowance']} {item['amount']:,}원 ({item['months_since_change']}개월)"
+                                          for item in items))
                 if st.button(insight['action'], key=f"btn_insight_side_{insight['type']}_{i}"):
                     handle_insight_action(insight)
         st.divider()
@@ -296,7 +363,7 @@ with st.sidebar:
             st.write(prompt)
             
         # Bot Response
-        response = chatbot.get_bot_response(prompt, st.session_state['active_issue'])
+        response = chatbot.get_bot_response(prompt, st.session_state['active_issue'], get_timeline())
         st.session_state['chat_history'].append({"role": "assistant", "content": response})
         with st.chat_message("assistant"):
             st.write(response)
@@ -316,7 +383,7 @@ def render_admin_page():
     config = config_manager.load_config()
     
     # Tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["⚙️ 기초 설정", "🧠 심층 분석", "🔔 알림 봇", "🛡️ 시뮬레이션"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["⚙️ 기초 설정", "🧠 심층 분석", "🔔 알림 봇", "🛡️ 시뮬레이션", "⏱️ 성능"])
     
     with tab1:
         st.subheader("Global Parameters")
@@ -327,6 +394,23 @@ def render_admin_page():
         with col2:
             new_meal_limit = st.number_input("식대 비과세 한도 (원)", value=config.get('meal_tax_free_limit', 200000))
             new_family_allowance = st.number_input("가족수당 인당 (원)", value=config.get('family_allowance_per_person', 100000))
+            new_promotion_raise = st.number_input("승진 인상률", value=config.get('promotion_raise_rate', 0.09), step=0.01)
+
+        st.subheader("Shared Dataset")
+        snapshot_stats = dataset_cache.stats()
+        st.caption(f"스냅샷 버전 v{snapshot_stats['current_version']} · 활성 세션 {snapshot_stats['leases']}")
+        if st.button("🔁 데이터 스냅샷 갱신"):
+            dataset_cache.invalidate()
+            st.rerun()
+
+        st.subheader("Decision Journal")
+        journal = decision_journal.open_journal(st.session_state['journal_owner'])
+        journal_stats = journal.stats()
+        st.caption(f"사용자 {journal_stats['owner']} · 미압축 기록 {journal_stats['rows']:,}건 · "
+                   f"스냅샷 seq {journal_stats['snapshot_seq'] or '-'}")
+        if st.button("🗑️ 결정 기록 초기화"):
+            journal.clear()
+            reset_app()
             
     with tab2:
         st.subheader("Insight Thresholds")
@@ -351,6 +435,7 @@ def render_admin_page():
             "overtime_rate": new_overtime_rate,
             "meal_tax_free_limit": new_meal_limit,
             "family_allowance_per_person": new_family_allowance,
+            "promotion_raise_rate": new_promotion_raise,
             "zombie_months": new_zombie_months,
             "bottleneck_limit": new_bottleneck_limit,
             "ghost_shift_tolerance": new_ghost_tolerance,
@@ -359,21 +444,45 @@ def render_admin_page():
             "msg_template": new_template
         })
         
+        # Live impact: the draft is re-evaluated against the whole population on every widget change
+        store = st.session_state['store']
+        sim_key = (st.session_state['dataset_lease'].snapshot.version, store.count('type', 'Chaser'), store.completed_count())
+        cached = st.session_state.get('simulation_base')
+        if cached is None or cached[0] != sim_key:
+            cached = (sim_key, simulation.prepare(st.session_state['data'], store.by('type', 'Chaser'), get_timeline(), store))
+            st.session_state['simulation_base'] = cached
+        result = simulation.simulate(cached[1], config, draft_config)
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.metric("예상 급여 변동", f"{result['payroll_delta_pct']:+.2%}", f"{result['payroll_delta']:+,}원",
+                      delta_color="inverse")
+        with col_b:
+            issue_delta = result['issues_draft'] - result['issues_current']
+            st.metric("감지될 이슈 수", f"{result['issues_draft']:,}건 ({issue_delta:+,})", issue_delta, delta_color="inverse")
+        st.caption(f"대상 인원 {result['employees']:,}명 · 과세 식대 {result['draft']['taxable_meal']:+,}원")
+        st.dataframe(pd.DataFrame([
+            {"항목": label, "현재": result['current'][key], "변경안": result['draft'][key],
+             "차이": result['draft'][key] - result['current'][key]}
+            for key, label in (('base_pay', "기본급"), ('overtime_pay', "초과근무수당"), ('family_allowance', "가족수당"),
+                               ('meal_allowance', "식대"), ('payroll', "총 급여"))
+        ] + [
+            {"항목": label, "현재": result['current']['issues'][key], "변경안": result['draft']['issues'][key],
+             "차이": result['issue_deltas'][key]}
+            for key, label in (('min_wage', "최저임금 미달 (명)"), ('role_pay_mismatch', "직무 불일치 수당 (건)"),
+                               ('bottleneck', "결재 병목 (결재권자)"))
+        ]), hide_index=True, use_container_width=True)
+
+        # Saving requires a simulation run of exactly this draft
         if st.button("🚀 Run Simulation", type="primary"):
-            with st.spinner("영향도 분석 중..."):
-                time.sleep(0.3) # Fake simulation
-                
-            # Mock Impact Analysis
+            st.session_state['simulated_config'] = draft_config
             st.success("시뮬레이션 완료!")
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.metric("예상 급여 변동", "+0.5%", delta_color="inverse")
-            with col_b:
-                st.metric("감지될 이슈 수", "8건 (+3)", delta_color="inverse")
-                
+
+        if st.session_state.get('simulated_config') == draft_config:
             st.warning("⚠️ 변경 사항을 적용하시겠습니까?")
             if st.button("💾 Save & Apply"):
                 if config_manager.save_config(draft_config):
+                    st.session_state.pop('simulated_config', None)
                     st.toast("설정이 저장되었습니다!")
                     time.sleep(1)
                     st.rerun()
@@ -384,14 +493,52 @@ def render_admin_page():
             config_manager.reset_config()
             st.rerun()
 
+    with tab5:
+        st.subheader("Rerun Timing")
+        enabled = st.toggle("계측 활성화", value=instrumentation.is_enabled())
+        if enabled != instrumentation.is_enabled():
+            instrumentation.enable(enabled)
+            st.rerun()
+
+        # The breakdown is from the last completed rerun (this one is still running)
+        trace = st.session_state.get('last_trace')
+        if trace is None:
+            st.info("계측을 켜면 다음 실행부터 구간별 소요 시간이 기록됩니다.")
+        else:
+            st.caption(f"직전 실행 총 {trace.duration_ns / 1e6:,.1f}ms")
+            rows = instrumentation.summarize(trace)
+            st.dataframe(pd.DataFrame([{
+                "구간": "  " * row['depth'] + row['span'],
+                "호출": row['calls'],
+                "합계 (ms)": round(row['total_ms'], 2),
+                "최대 (ms)": round(row['max_ms'], 2),
+                "비중": f"{row['share']:.0%}"
+            } for row in rows]), hide_index=True, use_container_width=True)
+            if trace.counters:
+                st.dataframe(pd.DataFrame([{"카운터": name, "값": value} for name, value in trace.counters.items()]),
+                             hide_index=True, use_container_width=True)
+            st.download_button("📥 Chrome Trace 내보내기", json.dumps(instrumentation.to_chrome_trace(trace)),
+                               file_name="melzi_trace.json", mime="application/json")
+
+        st.subheader("Chart Cache")
+        fig_stats = figure_cache.stats()
+        lookups = fig_stats['hits'] + fig_stats['misses']
+        st.caption(f"차트 {fig_stats['figures']}/{fig_stats['max_figures']}개 보관 · 적중률 "
+                   f"{fig_stats['hits'] / lookups if lookups else 0:.0%} ({fig_stats['hits']:,}/{lookups:,}) · "
+                   f"{'정적' if STATIC_CHARTS else '인터랙티브'} 모드")
+        if st.button("🧹 차트 캐시 비우기"):
+            figure_cache.clear()
+            st.rerun()
+
 # --- Main Content ---
 if admin_mode:
-    render_admin_page()
+    with instrumentation.span('render.admin'):
+        render_admin_page()
 else:
     st.title("Melzi InBOX 📥")
 
 # --- Daily Briefing Dashboard ---
-with st.container():
+with st.container(), instrumentation.span('render.briefing'):
     st.markdown("### 📊 Daily Briefing")
     col1, col2, col3 = st.columns(3)
 
@@ -403,7 +550,7 @@ with st.container():
 
     # 2. Payroll Status
     with col2:
-        issue_count = len(st.session_state['issues'])
+        issue_count = len(st.session_state['store'])
         st.metric(label="급여 마감 (11/28)", value="D-8")
         # Calculate readiness based on issue count (arbitrary scale for demo)
         readiness = max(0.0, min(1.0, 1.0 - (issue_count / 20))) 
@@ -425,10 +572,11 @@ Melzi는 매일 오전 3시 Davinci HRIS의 근태/인사 데이터를 동기화
 """)
 
 # Metrics
-total_issues = len(st.session_state['issues'])
-chaser_count = len([i for i in st.session_state['issues'] if i['type'] == 'Chaser'])
-auditor_count = len([i for i in st.session_state['issues'] if i['type'] == 'Auditor'])
-welfare_count = len([i for i in st.session_state['issues'] if i['type'] == 'Welfare'])
+store = st.session_state['store']
+total_issues = len(store)
+chaser_count = store.count('type', 'Chaser')
+auditor_count = store.count('type', 'Auditor')
+welfare_count = store.count('type', 'Welfare')
 
 def render_metric_card(label, value, icon, color_class):
     st.markdown(f"""
@@ -439,6 +587,7 @@ def render_metric_card(label, value, icon, color_class):
     </div>
     """, unsafe_allow_html=True)
 
+metrics_span = instrumentation.span('render.metrics')
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     render_metric_card("총 대기 건수", total_issues, "📮", "text-gray-900")
@@ -449,10 +598,13 @@ with col3:
 with col4:
     render_metric_card("의료비 심사", welfare_count, "🏥", "text-green-600")
 
+metrics_span.end()
+
 st.markdown("---")
 
 # Inbox Zero Check
-if total_issues == 0 and len(st.session_state['completed_issues']) == 0:
+list_span = instrumentation.span('render.issue_list')
+if total_issues == 0 and store.completed_count() == 0:
     st.markdown("""
     <div class="inbox-zero">
         <h1>&#127881;</h1>
@@ -461,84 +613,58 @@ if total_issues == 0 and len(st.session_state['completed_issues']) == 0:
     </div>
     """, unsafe_allow_html=True)
 else:
+    # Failures from the last bulk action (kept until dismissed)
+    if st.session_state.get('bulk_failures'):
+        with st.expander(f"⚠️ 일괄 처리 실패 {len(st.session_state['bulk_failures'])}건", expanded=True):
+            st.code("\n".join(st.session_state['bulk_failures']))
+            if st.button("확인", key="dismiss_bulk_failures"):
+                st.session_state.pop('bulk_failures')
+                st.rerun()
+
     # --- Pivot View Controller ---
     st.markdown("### 🔀 Pivot View")
-    view_mode = st.radio(
-        "기준 선택:",
-        ["이슈별 (Issue Type)", "특이사항별 (Special Status)", "사업장별 (Workplace)", "원인별 (Cause)"],
-        horizontal=True,
-        label_visibility="collapsed"
-    )
+    col_mode, col_page_size = st.columns([0.8, 0.2])
+    with col_mode:
+        view_mode = st.radio(
+            "기준 선택:",
+            grouping.VIEW_MODES,
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+    with col_page_size:
+        page_size = st.selectbox("페이지당 건수", grouping.PAGE_SIZES,
+                                 index=grouping.PAGE_SIZES.index(grouping.DEFAULT_PAGE_SIZE))
     
-    # Filter Tabs (Keep for now, but content changes based on Pivot)
-    # Actually, Pivot View replaces the Tabs concept for the main list. 
-    # But to keep existing structure, let's apply Pivot View to "전체 보기" tab primarily.
-    
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["전체 보기", "근태 소명", "급여 심사", "의료비 심사", "완료 내역"])
+    # Filter Tabs: only the selected view is rendered.
+    # (st.tabs runs every tab body on each rerun, which rendered the same issues up to four times.)
+    # Pivot View applies to "전체 보기"; the per-type views always use the Issue Type grouping.
+    TAB_TYPES = {"전체 보기": None, "근태 소명": 'Chaser', "급여 심사": 'Auditor', "의료비 심사": 'Welfare'}
+    active_tab = st.radio("보기", list(TAB_TYPES) + ["완료 내역"], horizontal=True,
+                          label_visibility="collapsed", key="active_tab")
+    st.divider()
 
-    def render_grouped_issues(issues, tab_key, mode="이슈별 (Issue Type)"):
-        if not issues:
+    def render_pager(total, key):
+        """Page selector for a list of `total` items. Returns the 1-based page to show."""
+        pages = grouping.page_count(total, page_size)
+        if pages <= 1:
+            return 1
+        return st.number_input(f"페이지 (총 {pages}쪽)", min_value=1, max_value=pages, value=1, step=1, key=key)
+
+    def render_grouped_issues(pivot, tab_key, mode="이슈별 (Issue Type)", issue_type=None):
+        # 1. Groups with precomputed summaries (count / total diff / impact order are maintained by the pivot index)
+        groups = grouping.list_groups(pivot, mode, issue_type)
+        instrumentation.count('render.groups', len(groups))
+        if not groups:
             st.info("대기 중인 이슈가 없습니다.")
             return
 
-        # 1. Dynamic Grouping Logic
-        groups = {}
-        
-        if "이슈별" in mode:
-            # Strict 3 Categories
-            groups = {
-                "🚨 [Action Required] 근태 소명": [],
-                "💰 [Approval Pending] 급여 변동 심사": [],
-                "🧾 [Claims] 의료비/복리후생": []
-            }
-            for issue in issues:
-                if issue['type'] == 'Chaser':
-                    groups["🚨 [Action Required] 근태 소명"].append(issue)
-                elif issue['type'] == 'Auditor':
-                    groups["💰 [Approval Pending] 급여 변동 심사"].append(issue)
-                elif issue['type'] == 'Welfare':
-                    groups["🧾 [Claims] 의료비/복리후생"].append(issue)
-                    
-        elif "특이사항별" in mode:
-            for issue in issues:
-                status = issue.get('special_status', '일반 (특이사항 없음)')
-                # Add emoji based on status
-                emoji = "👤"
-                if "입사" in status: emoji = "🆕"
-                elif "퇴사" in status: emoji = "👋"
-                elif "휴직" in status: emoji = "🛌"
-                elif "복직" in status: emoji = "🔙"
-                elif "변경" in status: emoji = "🔄"
-                
-                key = f"{emoji} {status}"
-                if key not in groups: groups[key] = []
-                groups[key].append(issue)
-                
-        elif "사업장별" in mode:
-            for issue in issues:
-                key = f"🏭 {issue.get('workplace', 'Unknown')}"
-                if key not in groups: groups[key] = []
-                groups[key].append(issue)
-                
-        elif "원인별" in mode:
-            for issue in issues:
-                key = f"🔗 {issue.get('event_id', 'Unknown Event')}"
-                if key not in groups: groups[key] = []
-                groups[key].append(issue)
-
         # 2. Render Expanders
-        for title, group_issues in groups.items():
-            if not group_issues:
-                continue # Skip empty groups
-                
-            # Calculate Summary
-            count = len(group_issues)
-            total_diff = sum([i.get('diff', 0) or 0 for i in group_issues])
+        for group in groups:
+            title = group['title']
+            count = group['count']
+            total_diff = group['total_diff']
             diff_str = f" / 합계 {total_diff:+,}원" if total_diff != 0 else ""
             
-            # Sort by Impact (Diff absolute value)
-            group_issues.sort(key=lambda x: abs(x.get('diff', 0) or 0), reverse=True)
-            
             with st.expander(f"{title} ({count}건{diff_str})", expanded=False):
                 # Add Description based on title (Only for Issue Type mode)
                 if "이슈별" in mode:
@@ -549,79 +675,63 @@ else:
                     elif "의료비" in title:
                         st.caption("제출된 영수증의 규정 위반 여부를 확인했습니다.")
 
-                # Select All Toggle
+                # Sorted by Impact (Diff absolute value); only the visible page is prepared below
+                page = render_pager(count, key=f"page_{title}_{tab_key}")
+                page_issues = grouping.group_issues(pivot, group, page, page_size)
+                instrumentation.count('render.cards', len(page_issues))
+
+                # Select All Toggle (applies to the whole group, not just the visible page)
                 select_all_key = f"select_all_{title}_{tab_key}"
-                select_all = st.checkbox("전체 선택", key=select_all_key)
-
-                # 3. Prepare Data for Table
-                df_data = []
-                for i, issue in enumerate(group_issues):
-                    df_data.append({
-                        "선택": select_all, # Default to Select All state
-                        "ID": issue['issue_id'],
-                        "이름": issue['name'],
-                        "부서": issue.get('department', '-'), # Show Dept
-                        "결재권자": issue.get('manager_id', '-'), # Added Manager Column
-                        "내용": issue.get('description') or issue.get('reason') or issue.get('title'),
-                        "차액": f"{issue.get('diff', 0):+,}원" if issue.get('diff') else "-",
-                        "제안": "독촉" if issue['type'] == 'Chaser' else ("반영" if issue['type'] == 'Auditor' else "승인"),
-                        "_obj": issue # Hidden object for reference
-                    })
-                
-                df = pd.DataFrame(df_data)
+                select_all = st.checkbox(f"전체 선택 ({count}건)", key=select_all_key)
+
+                # 3. Prepare Data for Table (visible page only)
+                df = pd.DataFrame(grouping.build_table_rows(page_issues, select_all))
                 
                 # 4. Table View with Selection
                 edited_df = st.data_editor(
                     df,
                     column_config={
-                        "선택": st.column_config.CheckboxColumn("선택", default=False),
-                        "_obj": None # Hide object column
+                        "선택": st.column_config.CheckboxColumn("선택", default=False)
                     },
                     disabled=["ID", "이름", "부서", "결재권자", "내용", "차액", "제안"],
                     hide_index=True,
-                    key=f"editor_{title}_{tab_key}",
+                    key=f"editor_{title}_{tab_key}_{page}",
                     use_container_width=True
                 )
                 
                 # 5. Bulk Action Button
-                selected_indices = edited_df.index[edited_df["선택"]].tolist()
-                selected_issues = [group_issues[i] for i in selected_indices]
+                if select_all:
+                    selected_issues = grouping.group_issues(pivot, group)
+                else:
+                    selected_indices = edited_df.index[edited_df["선택"]].tolist()
+                    selected_issues = [page_issues[i] for i in selected_indices]
                 
                 if selected_issues:
                     # Determine action label based on mixed types if necessary, or just generic
                     # If grouped by Person/Dept, types might be mixed.
-                    # For simplicity, we can check if all are same type, or provide generic "Process Selected"
-                    
                     types = set([i['type'] for i in selected_issues])
                     if len(types) == 1:
                         # Single type logic (same as before)
                         t = list(types)[0]
                         if t == 'Chaser':
                             if st.button(f"선택 항목 {len(selected_issues)}건 독촉 발송", key=f"bulk_btn_{title}_{tab_key}"):
-                                for issue in selected_issues: handle_approve(issue, rerun=False)
-                                time.sleep(0.1); st.rerun()
+                                handle_bulk(selected_issues)
                         elif t == 'Auditor':
                             if st.button(f"선택 항목 {len(selected_issues)}건 급여 반영", key=f"bulk_btn_{title}_{tab_key}", type="primary"):
-                                for issue in selected_issues: handle_apply(issue, rerun=False)
-                                time.sleep(0.1); st.rerun()
+                                handle_bulk(selected_issues)
                         elif t == 'Welfare':
                             if st.button(f"선택 항목 {len(selected_issues)}건 승인 및 이관", key=f"bulk_btn_{title}_{tab_key}", type="primary"):
-                                for issue in selected_issues: handle_welfare_approve(issue, rerun=False)
-                                time.sleep(0.1); st.rerun()
+                                handle_bulk(selected_issues)
                     else:
                         # Mixed types (e.g. Person View)
                         if st.button(f"선택 항목 {len(selected_issues)}건 일괄 처리", key=f"bulk_btn_{title}_{tab_key}", type="primary"):
-                            for issue in selected_issues:
-                                if issue['type'] == 'Chaser': handle_approve(issue, rerun=False)
-                                elif issue['type'] == 'Auditor': handle_apply(issue, rerun=False)
-                                elif issue['type'] == 'Welfare': handle_welfare_approve(issue, rerun=False)
-                            time.sleep(0.1); st.rerun()
+                            handle_bulk(selected_issues)
 
-                # 6. Detailed View (All Items)
+                # 6. Detailed View (visible page only; charts are created when toggled open)
                 st.markdown("---")
-                st.caption(f"👇 {title} 관련 상세 내역 ({len(group_issues)}건)")
+                st.caption(f"👇 {title} 관련 상세 내역 ({len(page_issues)}/{count}건)")
                 
-                for target_issue in group_issues:
+                for target_issue in page_issues:
                     # Wrapper for visual separation
                     st.markdown(f"##### 🔹 {target_issue['name']} ({target_issue['issue_id']})")
                     
@@ -634,39 +744,34 @@ else:
                     if target_issue['type'] == 'Chaser':
                         cards.render_chaser_card(target_issue, handle_approve, handle_ignore, key_suffix=unique_key)
                     elif target_issue['type'] == 'Auditor':
-                        cards.render_auditor_card(target_issue, handle_apply, handle_ignore, set_active_issue, key_suffix=unique_key)
+                        cards.render_auditor_card(target_issue, handle_apply, handle_ignore, set_active_issue, key_suffix=unique_key,
+                                                  lazy_charts=True, static_charts=STATIC_CHARTS)
                     elif target_issue['type'] == 'Welfare':
                         cards.render_welfare_card(target_issue, handle_welfare_approve, handle_welfare_reject, key_suffix=unique_key)
                     
                     st.markdown("<br>", unsafe_allow_html=True) # Spacer
 
-    with tab1:
-        render_grouped_issues(st.session_state['issues'], "tab1", view_mode)
-                
-    with tab2:
-        # Tabs 2,3,4 are specific types, so Pivot might not apply fully or we just force Issue Type?
-        # Let's keep them simple or apply pivot if it makes sense. 
-        # For now, let's just use default grouping for specific tabs to avoid confusion, 
-        # OR hide them if Pivot is active. 
-        # User request implies Pivot is the main way. Let's just render default for specific tabs.
-        render_grouped_issues([i for i in st.session_state['issues'] if i['type'] == 'Chaser'], "tab2")
-            
-    with tab3:
-        render_grouped_issues([i for i in st.session_state['issues'] if i['type'] == 'Auditor'], "tab3")
-            
-    with tab4:
-        render_grouped_issues([i for i in st.session_state['issues'] if i['type'] == 'Welfare'], "tab4")
-            
-    with tab5:
-        if not st.session_state['completed_issues']:
+    if active_tab in TAB_TYPES:
+        issue_type = TAB_TYPES[active_tab]
+        # Tabs 2,3,4 are specific types, so they use the default (Issue Type) grouping
+        render_grouped_issues(st.session_state['pivot'], active_tab, view_mode if issue_type is None else "이슈별 (Issue Type)", issue_type)
+    else:
+        if not store.completed_count():
             st.info("완료된 내역이 없습니다.")
         else:
-            # Completed items can remain as a simple list or also be grouped. 
-            # For now, keeping it simple list for history.
-            for issue in st.session_state['completed_issues']:
+            # Completed items stay a simple list for history, one page at a time
+            total_completed = store.completed_count()
+            page = render_pager(total_completed, key="page_completed")
+            for issue in store.completed(*grouping.page_bounds(total_completed, page, page_size)):
                 if issue['type'] == 'Chaser':
                     cards.render_chaser_card(issue, None, None, key_suffix="done", read_only=True)
                 elif issue['type'] == 'Auditor':
                     cards.render_auditor_card(issue, None, None, set_active_issue, key_suffix="done", read_only=True)
                 elif issue['type'] == 'Welfare':
                     cards.render_welfare_card(issue, None, None, key_suffix="done", read_only=True)
+
+list_span.end()
+rerun_span.end()
+last_trace = instrumentation.end_trace()
+if last_trace is not None:
+    st.session_state['last_trace'] = last_trace
@@ -0,0 +1,91 @@
+"""
+Benchmark: Auditor engine (iterrows + per-row hr_master scan vs batched join).
+
+Usage:
+    python -m benchmarks.bench_auditor
+    python -m benchmarks.bench_auditor --sizes 10000 100000 1000000 --employees 30000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import logic_auditor
+
+def make_frames(ledger_rows, employees, seed=0):
+    """Builds a synthetic hr_master / shadow_ledger pair of the requested size."""
+    rng = np.random.default_rng(seed)
+    emp_ids = np.arange(1000, 1000 + employees)
+    hr_master = pd.DataFrame({
+        'employee_id': emp_ids,
+        'name': [f"직원{i}" for i in emp_ids],
+        'position': '사원',
+        'base_salary': 3000000,
+        'family_count': 1
+    })
+
+    melzi = rng.integers(200, 600, ledger_rows) * 10000
+    davinci = rng.integers(200, 600, ledger_rows) * 10000
+    shadow_ledger = pd.DataFrame({
+        'issue_id': [f"ISSUE-{i:07d}" for i in range(ledger_rows)],
+        'employee_id': rng.choice(emp_ids, ledger_rows),
+        'issue_type': rng.choice(['소급', '일할', '수당', '근태'], ledger_rows),
+        'melzi_calc': melzi,
+        'davinci_calc': davinci,
+        'diff': melzi - davinci,
+        'logic_text': '벤치마크용 산출 근거',
+        'status': rng.choice(['Pending', 'Applied'], ledger_rows, p=[0.8, 0.2]),
+        'reason': ''
+    })
+    return shadow_ledger, hr_master
+
+def legacy_get_auditor_issues(shadow_ledger_df, hr_master_df):
+    """The original row-by-row implementation, kept here as the baseline."""
+    issues = []
+    pending_issues = shadow_ledger_df[shadow_ledger_df['status'] == 'Pending']
+    for _, row in pending_issues.iterrows():
+        emp_id = row['employee_id']
+        emp_info = hr_master_df[hr_master_df['employee_id'] == emp_id]
+        name = emp_info['name'].values[0] if not emp_info.empty else "Unknown"
+        issues.append({
+            'issue_id': row['issue_id'],
+            'type': 'Auditor',
+            'employee_id': emp_id,
+            'name': name,
+            'title': row['issue_type'],
+            'diff': row['diff'],
+            'logic_text': row['logic_text'],
+            'action_label': '다빈치 적용',
+            'status': 'Pending'
+        })
+    return issues
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditor engine benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--employees', type=int, default=30000)
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help="Largest ledger size the legacy implementation is timed at (it is O(ledger x employees)).")
+    args = parser.parse_args()
+
+    print(f"{'ledger rows':>12} {'legacy (s)':>12} {'batched (s)':>12} {'speedup':>10}")
+    for size in args.sizes:
+        ledger, master = make_frames(size, args.employees)
+        batched_t, batched = _time(logic_auditor.build_auditor_issues, ledger, master)
+
+        if size <= args.legacy_max:
+            legacy_t, legacy = _time(legacy_get_auditor_issues, ledger, master)
+            assert [i['issue_id'] for i in legacy] == [i['issue_id'] for i in batched]
+            assert [i['name'] for i in legacy] == [i['name'] for i in batched]
+            print(f"{size:>12,} {legacy_t:>12.3f} {batched_t:>12.3f} {legacy_t / batched_t:>9.0f}x")
+        else:
+            print(f"{size:>12,} {'skipped':>12} {batched_t:>12.3f} {'-':>10}")
+
+if __name__ == '__main__':
+    main()
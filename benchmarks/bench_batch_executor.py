@@ -0,0 +1,50 @@
+"""
+Benchmark: bulk actions, serial per-issue calls vs the batched executor.
+
+Usage:
+    python -m benchmarks.bench_batch_executor
+    python -m benchmarks.bench_batch_executor --count 2000 --latency 0.1 --workers 64 --failure-rate 0.02
+"""
+import argparse
+import time
+
+from modules import batch_executor
+
+def make_issues(count):
+    types = ['Chaser', 'Auditor', 'Welfare']
+    return [{'issue_id': f"B-{n:06d}", 'type': types[n % len(types)], 'name': f"직원{n}"} for n in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch executor benchmark")
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=batch_executor.DEFAULT_WORKERS)
+    parser.add_argument('--serial-sample', type=int, default=20,
+                        help="Issues timed serially; the serial total is extrapolated from them.")
+    args = parser.parse_args()
+
+    issues = make_issues(args.count)
+
+    # Serial baseline: the old one-call-per-issue loop, timed on a sample
+    backend = batch_executor.StubBackend(args.latency, args.jitter, args.failure_rate, seed=0)
+    sample = issues[:args.serial_sample]
+    start = time.perf_counter()
+    batch_executor.run_batch(sample, backend, max_workers=1)
+    serial_estimate = (time.perf_counter() - start) / max(1, len(sample)) * args.count
+
+    backend = batch_executor.StubBackend(args.latency, args.jitter, args.failure_rate, seed=0)
+    start = time.perf_counter()
+    results = batch_executor.run_batch(issues, backend, max_workers=args.workers)
+    batched = time.perf_counter() - start
+
+    summary = batch_executor.summarize(results)
+    print(f"issues {args.count:,}  latency {args.latency}s  workers {args.workers}")
+    print(f"serial (estimated) {serial_estimate:8.2f}s")
+    print(f"batched            {batched:8.2f}s  ({serial_estimate / batched:.0f}x)")
+    print(f"succeeded {summary['succeeded']:,}  failed {summary['failed']:,}  retried {summary['retried']:,}  "
+          f"backend calls {backend.calls:,}")
+
+if __name__ == '__main__':
+    main()
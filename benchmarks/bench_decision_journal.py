@@ -0,0 +1,62 @@
+"""
+Benchmark: decision journal group commit and restart replay.
+
+Usage:
+    python -m benchmarks.bench_decision_journal
+    python -m benchmarks.bench_decision_journal --decisions 100000 --batch 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from modules import decision_journal, issue_store
+
+def make_issues(count):
+    return [{'issue_id': f"J-{n:07d}", 'type': 'Auditor', 'name': f"직원{n}", 'title': '소급',
+             'diff': (n % 97) * 10000, 'status': 'Pending'} for n in range(count)]
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Decision journal benchmark")
+    parser.add_argument('--decisions', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=500, help="Issues per bulk action (one transaction each)")
+    args = parser.parse_args()
+
+    issues = make_issues(args.decisions)
+    ids = [issue['issue_id'] for issue in issues]
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = decision_journal.DecisionJournal(os.path.join(tmp, decision_journal.JOURNAL_FILE))
+        store = issue_store.IssueStore(issues, journal=journal)
+
+        def write():
+            for start in range(0, len(ids), args.batch):
+                store.transition_many(ids[start:start + args.batch], 'Applied', 'DB 반영')
+
+        write_t, _ = _time(write)
+        replay_t, state = _time(journal.load, False)
+        compact_t, _ = _time(journal.compact)
+        snapshot_t, _ = _time(journal.load, False)
+
+        def restart():
+            restored = issue_store.IssueStore(journal=journal)
+            restored.restore(journal.load())
+            restored.rebase(issues)
+            return restored
+
+        restart_t, restored = _time(restart)
+        assert len(state.decisions) == args.decisions and len(restored) == 0
+
+    print(f"{args.decisions:,} decisions in batches of {args.batch}")
+    print(f"{'group-commit write':<24}{write_t:>8.3f}s")
+    print(f"{'replay (no snapshot)':<24}{replay_t:>8.3f}s")
+    print(f"{'compact':<24}{compact_t:>8.3f}s")
+    print(f"{'load from snapshot':<24}{snapshot_t:>8.3f}s")
+    print(f"{'restart (load + rebase)':<24}{restart_t:>8.3f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: ghost-shift detection over months of minute-level gate logs.
+
+Usage:
+    python -m benchmarks.bench_ghost_shift
+    python -m benchmarks.bench_ghost_shift --employees 50000 --months 3
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from modules import config_manager, logic_ghost_shift, workload_generator
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def build_month(employees, seed, month):
+    """tna_record and gate log of one generated month (dates shifted to `month`)."""
+    tna = workload_generator.generate_workload(employees, seed)['tna_record']
+    shift = pd.Period(month, 'M').to_timestamp() - pd.Period(workload_generator.MONTH, 'M').to_timestamp()
+    tna = tna.assign(date=pd.to_datetime(tna['date'].astype(str)) + shift)
+    gate_log = workload_generator.generate_gate_log(tna, seed)
+    gate_log['event_time'] = pd.to_datetime(gate_log['event_time'], format=logic_ghost_shift.GATE_TIME_FORMAT)
+    gate_log['direction'] = gate_log['direction'].astype('category')
+    return tna, gate_log
+
+def main():
+    parser = argparse.ArgumentParser(description="Ghost-shift detection benchmark")
+    parser.add_argument('--employees', type=int, default=30000)
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    months = pd.period_range(end=workload_generator.MONTH, periods=args.months, freq='M').astype(str)
+    parts = [build_month(args.employees, args.seed + k, month) for k, month in enumerate(months)]
+    tna = pd.concat([part[0] for part in parts], ignore_index=True)
+    gate_log = pd.concat([part[1] for part in parts], ignore_index=True)
+    tolerance = config_manager.DEFAULT_CONFIG['ghost_shift_tolerance']
+
+    presence_t, _ = _time(logic_ghost_shift.presence_minutes, gate_log)
+    detect_t, ghosts = _time(logic_ghost_shift.find_ghost_shifts, tna, gate_log, tolerance)
+    issues_t, issues = _time(logic_ghost_shift.build_ghost_shift_issues, ghosts, pd.DataFrame())
+
+    print(f"{args.employees:,} employees x {args.months} months: {len(tna):,} TNA days, {len(gate_log):,} gate swipes")
+    print(f"{'presence per day':<22}{presence_t:>8.3f}s")
+    print(f"{'join + flag':<22}{detect_t:>8.3f}s  {len(ghosts):,} ghost days (tolerance {tolerance} min)")
+    print(f"{'issues':<22}{issues_t:>8.3f}s  {len(issues):,} employees")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: memory held by detected issues as dicts vs IssueRecord.
+
+Usage:
+    python -m benchmarks.bench_issue_record
+    python -m benchmarks.bench_issue_record --employees 500000
+"""
+import argparse
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+from modules import data_loader, employee_index, issue_record, logic_auditor, logic_chaser, workload_generator
+
+def detect(data):
+    name_index = employee_index.build_name_index(data['hr_master'])
+    return (logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'], name_index)
+            + logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'], name_index))
+
+def _measure(build, blob):
+    """Bytes still allocated by build(blob) (the result is kept alive while measuring)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(blob)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, seconds, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Issue representation memory benchmark")
+    parser.add_argument('--employees', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        workload_generator.write_workload(workload_generator.generate_workload(args.employees, args.seed), data_dir)
+        data = data_loader.load_data(use_cache=False, data_dir=data_dir)
+    # Unpickled, like issues loaded from a snapshot or the decision journal: no shared strings
+    blob = pickle.dumps(detect(data), protocol=pickle.HIGHEST_PROTOCOL)
+    del data
+
+    dict_bytes, dict_t, dicts = _measure(pickle.loads, blob)
+    count = len(dicts)
+    del dicts
+    record_bytes, record_t, records = _measure(lambda b: issue_record.compact_all(pickle.loads(b)), blob)
+    assert len(records) == count
+
+    print(f"{args.employees:,} employees, {count:,} issues")
+    print(f"{'representation':<16}{'MiB':>10}{'bytes/issue':>14}{'build s':>10}")
+    for label, size, seconds in (('dict', dict_bytes, dict_t), ('IssueRecord', record_bytes, record_t)):
+        print(f"{label:<16}{size / 2**20:>10.1f}{size / max(count, 1):>14.0f}{seconds:>10.3f}")
+    print(f"reduction {1 - record_bytes / dict_bytes:.0%}")
+
+if __name__ == '__main__':
+    main()
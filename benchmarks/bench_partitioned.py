@@ -0,0 +1,52 @@
+"""
+Benchmark: single-process detection vs per-company / per-workplace shards on a process pool.
+
+Usage:
+    python -m benchmarks.bench_partitioned
+    python -m benchmarks.bench_partitioned --employees 1000000 --by company --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from modules import data_loader, employee_index, logic_chaser, logic_auditor, logic_welfare, partitioned, workload_generator
+
+def detect_single(data, welfare_df):
+    """The single-process path of pipeline.build_issues (without mock enrichment)."""
+    name_index = employee_index.build_name_index(data['hr_master'])
+    return (logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'], name_index)
+            + logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'], name_index)
+            + logic_welfare.build_welfare_issues(welfare_df))
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned detection benchmark")
+    parser.add_argument('--employees', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--by', choices=partitioned.PARTITION_FIELDS, default='workplace')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        workload_generator.write_workload(workload_generator.generate_workload(args.employees, args.seed), data_dir)
+        data = data_loader.load_data(use_cache=False, data_dir=data_dir)
+    welfare_df = logic_welfare.load_welfare_claims(data_loader.DATA_DIR)
+
+    single_t, single = _time(detect_single, data, welfare_df)
+    partitions = partitioned.partition_tables(data, welfare_df, args.by)
+    print(f"{args.employees:,} employees, {len(single):,} issues, {len(partitions)} partitions by {args.by} "
+          f"({os.cpu_count()} CPUs)")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>10}")
+    print(f"{'single':>8} {single_t:>10.3f} {'1.0x':>10}")
+    for workers in sorted(set(args.workers)):
+        seconds, issues = _time(partitioned.detect_issues, data, welfare_df, args.by, workers)
+        assert issues == single, "partitioned merge differs from the single-process result"
+        print(f"{workers:>8} {seconds:>10.3f} {single_t / seconds:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Headless benchmark suite (no Streamlit needed).
+
+Times and memory-profiles the hot paths across several dataset sizes:
+data_loader.load_data (cold / warm), get_chaser_issues, get_auditor_issues,
+get_welfare_issues, generate_mock_data, detect_insights, the grouping +
+table prep behind render_grouped_issues, the Auditor card charts, the
+admin what-if simulation, the event timeline, role-pay mismatch detection
+and the shadow payroll recomputation. Fixtures come from the seeded
+workload generator and are reused between runs.
+
+Results are written as JSON and compared against a stored baseline; any case
+slower than the baseline by more than the tolerance fails the run (exit 1).
+
+Usage:
+    python -m benchmarks.run_benchmarks                       # run + compare with benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000
+    python -m benchmarks.run_benchmarks --save-baseline       # accept current numbers as the new baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from modules import (config_manager, data_loader, data_store, employee_index, event_timeline, insight_engine,
+                     issue_store, logic_auditor, logic_chaser, logic_role_pay, logic_welfare, mock_generator, shadow_payroll,
+                     simulation, sql_issue_store, workload_generator)
+from ui import cards, figure_cache, grouping
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, '.fixtures')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+# Differences below this are timer noise, never a regression
+NOISE_FLOOR_SECONDS = 0.010
+
+def fixture_dir(size, seed):
+    """Generates (once) and returns the CSV fixture directory for a size."""
+    path = os.path.join(FIXTURE_DIR, f"{size}-{seed}")
+    if not os.path.exists(os.path.join(path, 'welfare_claims.csv')):
+        workload_generator.write_workload(workload_generator.generate_workload(size, seed), path)
+    return path
+
+def render_prep(pivot):
+    """What one rerun of render_grouped_issues computes, for every pivot mode and per-type tab."""
+    rows = 0
+    views = [(mode, None) for mode in grouping.VIEW_MODES] + [("이슈별", t) for t in grouping.ISSUE_TYPE_GROUPS]
+    for mode, issue_type in views:
+        for group in grouping.list_groups(pivot, mode, issue_type):
+            page = grouping.group_issues(pivot, group, 1, grouping.DEFAULT_PAGE_SIZE)
+            rows += len(pd.DataFrame(grouping.build_table_rows(page)))
+    return rows
+
+CHART_BUILDERS = {'소급': ('retro', cards.build_retro_figure), '일할': ('proration', cards.build_proration_figure)}
+
+SIMULATION_CURRENT = config_manager.DEFAULT_CONFIG
+SIMULATION_DRAFT = dict(config_manager.DEFAULT_CONFIG, min_wage=12000, overtime_rate=2.0, meal_tax_free_limit=100000,
+                        family_allowance_per_person=150000, bottleneck_limit=5, zombie_months=2)
+
+def timeline_month(data):
+    """Timeline build plus the payroll month's proration and retro as-of joins."""
+    timeline = event_timeline.build_timeline(data)
+    month = shadow_payroll.payroll_month(data)
+    return timeline.paid_days(month), timeline.retro_deltas(month)
+
+def card_figures(issues):
+    """The chart figures one page of expanded Auditor cards draws."""
+    for issue in issues:
+        kind, build_figure = CHART_BUILDERS[issue['title']]
+        figure_cache.get_figure(kind, issue, build_figure, cards.FIGURE_INPUTS[kind])
+    return len(issues)
+
+def build_cases(data_dir):
+    """(name, setup, fn) per case; setup output is passed to fn and excluded from timing."""
+    def loaded():
+        return data_loader.load_data(data_dir=data_dir)
+
+    def detected():
+        data = loaded()
+        name_index = employee_index.build_name_index(data['hr_master'])
+        issues = (logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'], name_index)
+                  + logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'], name_index)
+                  + logic_welfare.get_welfare_issues(data_dir))
+        return issues
+
+    def enriched():
+        base = detected()
+        return mock_generator.generate_mock_data(base, target_count=len(base), seed=0)
+
+    def pivoted():
+        """A session's pivot index after its first render (later reruns only read it)."""
+        pivot = grouping.PivotIndex()
+        issue_store.IssueStore(enriched()).subscribe(pivot)
+        render_prep(pivot)
+        return pivot
+
+    def chart_page():
+        charted = [i for i in enriched() if i['type'] == 'Auditor' and i['title'] in CHART_BUILDERS]
+        return charted[:grouping.DEFAULT_PAGE_SIZE]
+
+    def chart_page_cold():
+        figure_cache.clear()
+        return chart_page()
+
+    def chart_page_warm():
+        page = chart_page_cold()
+        card_figures(page)
+        return page
+
+    def simulation_base():
+        data = loaded()
+        return simulation.prepare(data, logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master']))
+
+    def first_render(store):
+        pivot = grouping.PivotIndex()
+        store.subscribe(pivot)
+        return render_prep(pivot)
+
+    return [
+        ('load_data_cold', lambda: data_store.clear_cache(data_dir), lambda _: data_loader.load_data(data_dir=data_dir)),
+        ('load_data_warm', loaded, lambda _: data_loader.load_data(data_dir=data_dir)),
+        ('get_chaser_issues', loaded, lambda d: logic_chaser.get_chaser_issues(d['tna_record'], d['hr_master'])),
+        ('get_auditor_issues', loaded, lambda d: logic_auditor.get_auditor_issues(d['shadow_ledger'], d['hr_master'])),
+        ('get_welfare_issues', lambda: None, lambda _: logic_welfare.get_welfare_issues(data_dir)),
+        ('generate_mock_data', detected, lambda base: mock_generator.generate_mock_data(base, target_count=len(base), seed=0)),
+        ('detect_insights', enriched, lambda issues: insight_engine.detect_insights(issues)),
+        ('pivot_first_render', lambda: issue_store.IssueStore(enriched()), first_render),
+        ('render_prep', pivoted, render_prep),
+        ('render_prep_sqlite', lambda: grouping.SqlPivot(sql_issue_store.SqlIssueStore(enriched())), render_prep),
+        ('card_figures_cold', chart_page_cold, card_figures),
+        ('card_figures_warm', chart_page_warm, card_figures),
+        ('simulation_prepare', loaded, lambda d: simulation.prepare(d)),
+        ('simulate', simulation_base, lambda base: simulation.simulate(base, SIMULATION_CURRENT, SIMULATION_DRAFT)),
+        ('event_timeline', loaded, timeline_month),
+        ('role_pay', loaded, lambda d: logic_role_pay.index_by_employee(logic_role_pay.role_pay_candidates(d))),
+        ('shadow_ledger', loaded, lambda d: shadow_payroll.build_ledger(d, SIMULATION_CURRENT))
+    ]
+
+def measure(setup, fn, repeat):
+    """Median/min wall time over `repeat` runs, then one tracemalloc run for peak memory."""
+    timings = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+
+    arg = setup()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': statistics.median(timings), 'min_seconds': min(timings), 'peak_bytes': peak}
+
+def run(sizes, repeat, seed, only=None):
+    results = {}
+    for size in sizes:
+        data_dir = fixture_dir(size, seed)
+        for name, setup, fn in build_cases(data_dir):
+            if only and name not in only:
+                continue
+            key = f"{name}@{size}"
+            results[key] = measure(setup, fn, repeat)
+            r = results[key]
+            print(f"{key:<32}{r['seconds'] * 1000:>12.1f}ms{r['peak_bytes'] / 1024 / 1024:>12.1f}MB", flush=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the list of regressions: (key, baseline seconds, current seconds, ratio).
+    Best-of-N (min) times are compared; they are far less noisy than medians.
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        before, after = base['min_seconds'], current['min_seconds']
+        if after - before > NOISE_FLOOR_SECONDS and after > before * (1 + tolerance):
+            regressions.append((key, before, after, after / before))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Melzi benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Employee counts")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', help="Run only these case names")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.seed, set(args.only) if args.only else None)
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"results -> {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline -> {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against (run with --save-baseline)")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n!!! {len(regressions)} PERFORMANCE REGRESSION(S) (tolerance {args.tolerance:.0%}) !!!")
+        for key, base, current, ratio in regressions:
+            print(f"  {key:<32}{base * 1000:>10.1f}ms -> {current * 1000:>10.1f}ms  ({ratio:.2f}x)")
+        return 1
+    print(f"no regressions vs baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Batched bulk-action executor.
+
+Backend calls (messenger for Chaser reminders, Davinci DB for Auditor and
+Welfare items) are sent concurrently through a bounded thread pool, retried
+with exponential backoff when the failure is transient (TRANSIENT_ERRORS),
+and tracked per item. The caller commits all
+successful state transitions at once afterwards, so a bulk action costs one
+rerun instead of one spinner + sleep per issue.
+"""
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_WORKERS = 32
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.05
+
+# issue type -> (backend method, completed status, action label)
+ACTIONS = {
+    'Chaser': ('send_message', 'Approved', '메시지 발송'),
+    'Auditor': ('update_davinci', 'Applied', 'DB 반영'),
+    'Welfare': ('post_payroll_item', 'Approved', '급여 반영')
+}
+
+class BackendError(Exception):
+    """A failed messenger / Davinci call (retryable)."""
+
+# Failures worth retrying: backend errors, a locked / busy Davinci DB, network and file I/O.
+# Anything else (KeyError, ValueError, ...) is a bug or bad data and fails on the first attempt.
+TRANSIENT_ERRORS = (BackendError, sqlite3.OperationalError, OSError)
+
+class StubBackend:
+    """Local stand-in for the messenger and Davinci DB APIs with configurable latency and failures."""
+
+    def __init__(self, latency=0.1, jitter=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.calls = 0
+
+    def _call(self, kind, issue):
+        with self._rng_lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self._rng.random() < self.failure_rate
+        time.sleep(delay)
+        if failed:
+            raise BackendError(f"{kind} failed for {issue['issue_id']}")
+        return {'kind': kind, 'issue_id': issue['issue_id']}
+
+    def send_message(self, issue):
+        return self._call('messenger', issue)
+
+    def update_davinci(self, issue):
+        return self._call('davinci', issue)
+
+    def post_payroll_item(self, issue):
+        return self._call('payroll', issue)
+
+def _execute_one(backend, issue, max_retries, backoff):
+    method, _, _ = ACTIONS[issue['type']]
+    start = time.perf_counter()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            response = getattr(backend, method)(issue)
+            return {'issue': issue, 'ok': True, 'attempts': attempts, 'error': None,
+                    'response': response, 'seconds': time.perf_counter() - start}
+        except Exception as e:
+            if not isinstance(e, TRANSIENT_ERRORS) or attempts > max_retries:
+                return {'issue': issue, 'ok': False, 'attempts': attempts, 'error': str(e),
+                        'response': None, 'seconds': time.perf_counter() - start}
+            time.sleep(backoff * (2 ** (attempts - 1)))
+
+def run_batch(issues, backend, max_workers=DEFAULT_WORKERS, max_retries=DEFAULT_RETRIES,
+              backoff=DEFAULT_BACKOFF, on_progress=None):
+    """
+    Executes the backend call for every issue concurrently.
+    Returns one result per issue (input order): {'issue', 'ok', 'attempts', 'error', 'response', 'seconds'}.
+    on_progress(done, total) is called from the calling thread, so it may touch Streamlit widgets.
+    """
+    issues = list(issues)
+    if not issues:
+        return []
+
+    results = [None] * len(issues)
+    workers = max(1, min(max_workers, len(issues)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_execute_one, backend, issue, max_retries, backoff): pos
+                   for pos, issue in enumerate(issues)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(issues))
+    return results
+
+def summarize(results):
+    succeeded = [r for r in results if r['ok']]
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'retried': sum(1 for r in results if r['attempts'] > 1)
+    }
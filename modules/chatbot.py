@@ -1,6 +1,53 @@
-def get_bot_response(user_input, context):
+import numpy as np
+import pandas as pd
+
+from modules import event_timeline
+
+def _day(days):
+    return pd.Timestamp(np.datetime64(int(days), 'D'))
+
+def _timeline_response(user_input, issue_type, emp_name, employee_id, timeline):
+    """Answer from the employee's effective-dated events, or None if they do not explain the issue."""
+    try:
+        positions = timeline.events_of(employee_id)
+    except KeyError:
+        return None
+
+    if "소급" in issue_type:
+        late = [p for p in positions.tolist()
+                if timeline.event_type[p] == event_timeline.PROMOTION_EVENT
+                and (_day(timeline.entered[p]).to_period('M') > _day(timeline.effective[p]).to_period('M'))]
+        if not late:
+            return None
+        p = late[-1]
+        effective, entered = _day(timeline.effective[p]), _day(timeline.entered[p])
+        periods = (entered.to_period('M') - effective.to_period('M')).n
+        before = timeline.salary[p - 1] if p > positions[0] else timeline.base_salary[timeline.rows[p]]
+        if "계산" in user_input:
+            return (f"계산식: (변경 후 기본급 {timeline.salary[p]:,} - 변경 전 기본급 {before:,}) * {periods}개월 = "
+                    f"{(timeline.salary[p] - before) * periods:,}원")
+        if "근거" in user_input or "왜" in user_input or "이유" in user_input:
+            return (f"{emp_name}님의 경우, {effective.month}월 {effective.day}일자 승진 발령이 {entered.month}월 "
+                    f"{entered.day}일에 입력되었습니다. 이에 따라 이미 지급된 {periods}개월분 급여 차액(기본급 인상분)이 "
+                    f"소급 적용되었습니다. (규정: 인사규정 제5조 급여의 계산)")
+
+    if "일할" in issue_type and ("근거" in user_input or "왜" in user_input):
+        changes = [p for p in positions.tolist() if timeline.event_type[p] in event_timeline.STATUS_EVENTS]
+        if not changes:
+            return None
+        effective = _day(timeline.effective[changes[-1]])
+        paid, days, _ = timeline.paid_days(effective)
+        row = timeline.rows[changes[-1]]
+        return (f"{emp_name}님은 {effective.month}월 {effective.day}일자로 {timeline.event_type[changes[-1]]} "
+                f"발령이 있었습니다. 따라서 {effective.month}월 급여는 {days}일 중 {paid[row]}일치만 "
+                f"일할 계산되어 지급됩니다.")
+    return None
+
+def get_bot_response(user_input, context, timeline=None):
     """
-    Returns a hardcoded response based on keywords and context (selected issue).
+    Returns a response based on keywords and context (selected issue).
+    With an event_timeline.EventTimeline, 소급 / 일할 questions are answered from the
+    employee's effective-dated events; otherwise (or for mock employees) from canned text.
     """
     user_input = user_input.lower()
     
@@ -9,6 +56,11 @@ def get_bot_response(user_input, context):
     
     issue_type = context.get('title', '')
     emp_name = context.get('name', '')
+
+    if timeline is not None and context.get('employee_id') is not None:
+        response = _timeline_response(user_input, issue_type, emp_name, context['employee_id'], timeline)
+        if response:
+            return response
     
     # Scenario 1: Retroactive (Kim Cheol-su)
     if "소급" in issue_type or "김철수" in emp_name:
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 
@@ -8,6 +9,7 @@ DEFAULT_CONFIG = {
   "overtime_rate": 1.5,
   "meal_tax_free_limit": 200000,
   "family_allowance_per_person": 100000,
+  "promotion_raise_rate": 0.09,
   "zombie_months": 3,
   "bottleneck_limit": 15,
   "ghost_shift_tolerance": 60,
@@ -16,23 +18,42 @@ DEFAULT_CONFIG = {
   "msg_template": "안녕하세요 {name}님, 급여 마감을 위해 확인 부탁드립니다."
 }
 
+# In-memory cache: (file signature, parsed config). Re-read only when the file changes.
+_cache = {'signature': None, 'config': None}
+
+def config_signature():
+    """(mtime_ns, size) of the config file, or None if missing. Changes whenever the file does."""
+    try:
+        stat = os.stat(CONFIG_PATH)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 def load_config():
-    """Loads configuration from JSON file. Returns default if file missing."""
-    if not os.path.exists(CONFIG_PATH):
-        return DEFAULT_CONFIG.copy()
+    """Loads configuration from JSON file (cached until the file changes). Returns default if file missing."""
+    signature = config_signature()
+    if signature is None:
+        return copy.deepcopy(DEFAULT_CONFIG)
+    if _cache['signature'] == signature:
+        return copy.deepcopy(_cache['config'])
     
     try:
         with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            config = json.load(f)
     except Exception as e:
         print(f"Error loading config: {e}")
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    _cache['signature'] = signature
+    _cache['config'] = config
+    return copy.deepcopy(config)
 
 def save_config(new_config):
     """Saves configuration to JSON file."""
     try:
         with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
             json.dump(new_config, f, indent=2, ensure_ascii=False)
+        _cache['signature'] = None
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
@@ -1,16 +1,29 @@
 import pandas as pd
 import os
 
+from modules import data_store, instrumentation, stream_ingest
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 
-def load_data():
-    """Loads all mock data CSVs into a dictionary of DataFrames."""
+@instrumentation.traced('data.load_data')
+def load_data(use_cache=True, streaming=False, memory_limit_mb=stream_ingest.DEFAULT_MEMORY_LIMIT_MB, on_progress=None,
+              data_dir=DATA_DIR):
+    """
+    Loads all mock data CSVs into a dictionary of DataFrames.
+    Tables are typed (see data_store.SCHEMAS) and served from the binary cache when fresh.
+    With streaming=True, tna_record and shadow_ledger are read in bounded chunks and only
+    their pending rows are kept (see stream_ingest). `data_dir` points at another export
+    (e.g. a generated benchmark fixture).
+    """
     data = {}
     try:
-        data['hr_master'] = pd.read_csv(os.path.join(DATA_DIR, 'hr_master.csv'))
-        data['hr_event_log'] = pd.read_csv(os.path.join(DATA_DIR, 'hr_event_log.csv'))
-        data['tna_record'] = pd.read_csv(os.path.join(DATA_DIR, 'tna_record.csv'))
-        data['shadow_ledger'] = pd.read_csv(os.path.join(DATA_DIR, 'shadow_ledger.csv'))
+        if streaming:
+            data = stream_ingest.load_data_streaming(data_dir, memory_limit_mb, on_progress)
+        elif use_cache:
+            data = data_store.load_tables(data_dir)
+        else:
+            for table in data_store.TABLES:
+                data[table] = data_store.read_csv_typed(os.path.join(data_dir, f"{table}.csv"), table)
     except FileNotFoundError as e:
         print(f"Error loading data: {e}")
         # Return empty DFs if files missing to prevent crash
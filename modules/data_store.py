@@ -0,0 +1,235 @@
+"""
+Typed, cached columnar store behind data_loader.load_data.
+
+Each CSV is parsed once with an explicit schema and written to a binary
+cache under data/.cache (Feather when pyarrow is installed, pandas pickle
+otherwise). Later loads are served from the cache as long as the source
+file is unchanged (mtime + size, confirmed by a content hash).
+
+Usage (report cold/warm load time and memory per table):
+    python -m modules.data_store
+"""
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from modules import instrumentation
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+CACHE_DIR_NAME = '.cache'
+
+# Bump when a schema changes so stale caches are rebuilt
+SCHEMA_VERSION = 3
+
+SCHEMAS = {
+    'hr_master': {
+        # company/workplace/manager_id/special_status are optional (present in generated workloads).
+        # Pay columns are nullable: a blank cell is reported (see read_csv_typed), not a failed load.
+        'dtypes': {'employee_id': 'int32', 'name': 'object', 'position': 'category',
+                   'base_salary': 'Int64', 'family_count': 'Int16', 'company': 'category',
+                   'workplace': 'category', 'manager_id': 'category', 'special_status': 'category'},
+        'dates': []
+    },
+    'hr_event_log': {
+        'dtypes': {'employee_id': 'int32', 'event_type': 'category', 'description': 'object'},
+        'dates': ['event_date', 'effective_date']
+    },
+    'tna_record': {
+        'dtypes': {'employee_id': 'int32', 'status': 'category', 'work_hours': 'float32'},
+        'dates': ['date']
+    },
+    'shadow_ledger': {
+        'dtypes': {'issue_id': 'object', 'employee_id': 'int32', 'issue_type': 'category',
+                   'melzi_calc': 'int64', 'davinci_calc': 'int64', 'diff': 'int64',
+                   'logic_text': 'object', 'status': 'category', 'reason': 'object'},
+        'dates': []
+    }
+}
+
+TABLES = list(SCHEMAS.keys())
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+def _cache_dir(data_dir):
+    return os.path.join(data_dir, CACHE_DIR_NAME)
+
+def _cache_paths(table, data_dir):
+    base = os.path.join(_cache_dir(data_dir), table)
+    return f"{base}.{CACHE_FORMAT}", f"{base}.meta.json"
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+def read_csv_typed(path, table, **kwargs):
+    """
+    Parses a CSV with the table's explicit schema (extra kwargs go to pd.read_csv).
+    Blank cells in nullable integer columns load as <NA> and are reported by employee_id.
+    """
+    schema = SCHEMAS[table]
+    df = pd.read_csv(path, dtype=schema['dtypes'], parse_dates=schema['dates'] or False, **kwargs)
+    _report_missing(df, table)
+    return df
+
+def _report_missing(df, table):
+    for col, dtype in SCHEMAS[table]['dtypes'].items():
+        if not dtype.startswith('Int') or col not in df.columns:
+            continue
+        missing = df[col].isna().to_numpy()
+        if missing.any():
+            ids = df['employee_id'].to_numpy()[missing][:10].tolist()
+            print(f"Warning: {table}: {int(missing.sum())} rows with blank {col} (employee_id {ids}); treated as 0")
+
+def _write_cache(df, cache_path):
+    if CACHE_FORMAT == 'feather':
+        df.reset_index(drop=True).to_feather(cache_path)
+    else:
+        df.to_pickle(cache_path)
+
+def _read_cache(cache_path):
+    if CACHE_FORMAT == 'feather':
+        return pd.read_feather(cache_path)
+    return pd.read_pickle(cache_path)
+
+def _cache_is_valid(source_path, meta, cache_path):
+    """Cheap mtime/size check first; on mismatch fall back to comparing content hashes."""
+    if not meta or meta.get('schema_version') != SCHEMA_VERSION or meta.get('format') != CACHE_FORMAT:
+        return False, None
+    if not os.path.exists(cache_path):
+        return False, None
+
+    stat = os.stat(source_path)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True, None
+
+    # Touched but maybe not changed (e.g. re-exported with identical content)
+    source_hash = _file_hash(source_path)
+    return source_hash == meta.get('sha1'), source_hash
+
+@instrumentation.traced('data.load_table')
+def load_table(table, data_dir=DATA_DIR, stats=None):
+    """
+    Loads one table through the cache.
+    If `stats` is a dict, it receives {'source', 'seconds', 'rows', 'memory_bytes'}.
+    """
+    start = time.perf_counter()
+    source_path = os.path.join(data_dir, f"{table}.csv")
+    cache_path, meta_path = _cache_paths(table, data_dir)
+
+    meta = _read_meta(meta_path)
+    valid, source_hash = _cache_is_valid(source_path, meta, cache_path)
+
+    df = None
+    if valid:
+        try:
+            df = _read_cache(cache_path)
+            source = 'cache'
+            if source_hash:
+                # Content unchanged: refresh the stat fields so the next check is cheap again
+                stat = os.stat(source_path)
+                meta.update({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size})
+                _write_meta(meta_path, meta)
+        except Exception as e:
+            print(f"Error reading cache for {table}: {e}")
+            df = None
+
+    if df is None:
+        df = read_csv_typed(source_path, table)
+        source = 'csv'
+        try:
+            os.makedirs(_cache_dir(data_dir), exist_ok=True)
+            _write_cache(df, cache_path)
+            stat = os.stat(source_path)
+            _write_meta(meta_path, {
+                'schema_version': SCHEMA_VERSION,
+                'format': CACHE_FORMAT,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha1': source_hash or _file_hash(source_path)
+            })
+        except Exception as e:
+            # Cache is an optimisation only; the parsed frame is still returned
+            print(f"Error writing cache for {table}: {e}")
+
+    if stats is not None:
+        stats.update({
+            'source': source,
+            'seconds': time.perf_counter() - start,
+            'rows': len(df),
+            'memory_bytes': int(df.memory_usage(deep=True).sum())
+        })
+    return df
+
+def load_tables(data_dir=DATA_DIR, tables=TABLES, report=None):
+    """Loads several tables; per-table stats are written into `report` if given."""
+    data = {}
+    for table in tables:
+        stats = {} if report is not None else None
+        data[table] = load_table(table, data_dir, stats)
+        if report is not None:
+            report[table] = stats
+    return data
+
+def clear_cache(data_dir=DATA_DIR):
+    """Removes all cached tables so the next load is a cold start."""
+    cache_dir = _cache_dir(data_dir)
+    if not os.path.isdir(cache_dir):
+        return
+    for table in TABLES:
+        for path in _cache_paths(table, data_dir):
+            if os.path.exists(path):
+                os.remove(path)
+
+def profile(data_dir=DATA_DIR):
+    """Returns cold start, warm start and resident memory per table."""
+    clear_cache(data_dir)
+    cold, warm = {}, {}
+    load_tables(data_dir, report=cold)
+    load_tables(data_dir, report=warm)
+
+    results = {}
+    for table in TABLES:
+        untyped = pd.read_csv(os.path.join(data_dir, f"{table}.csv"))
+        results[table] = {
+            'rows': warm[table]['rows'],
+            'cold_seconds': cold[table]['seconds'],
+            'warm_seconds': warm[table]['seconds'],
+            'warm_source': warm[table]['source'],
+            'memory_bytes': warm[table]['memory_bytes'],
+            'untyped_memory_bytes': int(untyped.memory_usage(deep=True).sum())
+        }
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Melzi data store cold/warm load report")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    print(f"cache format: {CACHE_FORMAT}")
+    print(f"{'table':<15}{'rows':>12}{'cold (s)':>11}{'warm (s)':>11}{'memory':>12}{'untyped':>12}")
+    for table, r in profile(args.data_dir).items():
+        print(f"{table:<15}{r['rows']:>12,}{r['cold_seconds']:>11.4f}{r['warm_seconds']:>11.4f}"
+              f"{r['memory_bytes'] / 1024:>10,.1f}KB{r['untyped_memory_bytes'] / 1024:>10,.1f}KB")
@@ -0,0 +1,158 @@
+"""
+Process-wide shared dataset snapshot.
+
+All Streamlit sessions in the server process share one immutable snapshot
+(loaded tables + detected issues) instead of parsing and detecting per
+session. Sessions hold a lease on a snapshot version; a version is dropped
+once it is no longer current and its last lease is released. Sessions keep
+only their own decision deltas (see issue_store.IssueStore.rebase).
+
+A new version is built automatically when any CSV in data/ changes
+(mtime/size fingerprint), or on the next acquire() after invalidate().
+Tables come from one in-process delta_sync.DeltaSync: a new version only
+parses the rows appended since the previous one, and its Chaser / Auditor
+issues are the sync's live issue set instead of a re-detection. Issues come
+from the headless pipeline's snapshot file when it was built from the same
+CSVs (python -m modules.pipeline), else detection runs here. invalidate()
+also restarts the sync from a full load.
+
+is_current() runs on every Streamlit rerun of every session, so it reuses
+the last fingerprint for FINGERPRINT_TTL seconds instead of scanning data/
+each time: a changed CSV is picked up within that window.
+"""
+import itertools
+import threading
+import time
+import weakref
+
+from modules import data_loader, delta_sync, instrumentation, pipeline
+
+_lock = threading.RLock()
+_versions = itertools.count(1)
+_current = None
+_snapshots = {}   # version -> DatasetSnapshot (current + retired ones still leased)
+_refcounts = {}   # version -> number of live leases
+_force_rebuild = False  # set by invalidate(): skip the precomputed snapshot once
+_sync = None      # delta_sync.DeltaSync over data/ (keep_tables) feeding each new version
+_checked = None   # (time.monotonic(), fingerprint) of the last data/ scan
+
+# Seconds is_current() trusts the last data/ fingerprint before scanning again
+FINGERPRINT_TTL = 2.0
+
+class DatasetSnapshot:
+    """Immutable, shared dataset. Treat `data` and `issues` as read-only."""
+    __slots__ = ('version', 'fingerprint', 'data', 'issues', 'created_at', 'build_seconds')
+
+    def __init__(self, version, fingerprint, data, issues, build_seconds):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.data = data
+        self.issues = tuple(issues)
+        self.created_at = time.time()
+        self.build_seconds = build_seconds
+
+class SnapshotLease:
+    """A session's reference to a snapshot. Released on release() or when garbage collected."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._finalizer = weakref.finalize(self, _release, snapshot.version)
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def release(self):
+        self._finalizer()
+
+# Shared with the headless pipeline (one definition of "what the snapshot was built from")
+data_fingerprint = pipeline.data_fingerprint
+build_issues = pipeline.build_issues
+
+def _fingerprint(max_age=0.0):
+    """data_fingerprint(), reused when the last scan is at most `max_age` seconds old."""
+    global _checked
+    now = time.monotonic()
+    checked = _checked
+    if checked is not None and now - checked[0] <= max_age:
+        return checked[1]
+    fingerprint = data_fingerprint()
+    _checked = (now, fingerprint)
+    return fingerprint
+
+def _sync_tables():
+    """(tables, Chaser + Auditor issues) after syncing data/; full load without detected issues if that fails."""
+    global _sync
+    if _sync is None or _force_rebuild:
+        _sync = delta_sync.DeltaSync(data_loader.DATA_DIR, keep_tables=True)
+    try:
+        _sync.sync()
+    except (OSError, ValueError) as e:
+        print(f"Error syncing data: {e}")
+        _sync = None
+        return data_loader.load_data(), None
+    return dict(_sync.tables), _sync.get_issues()
+
+def _build_snapshot(fingerprint):
+    """Uses the pipeline's precomputed snapshot when it matches data/, else detects in-process."""
+    global _force_rebuild
+    start = time.perf_counter()
+    data, detected = _sync_tables()
+    precomputed = None if _force_rebuild else pipeline.load_snapshot(fingerprint=fingerprint)
+    issues = precomputed['issues'] if precomputed else build_issues(data, detected=detected)
+    _force_rebuild = False
+    return DatasetSnapshot(next(_versions), fingerprint, data, issues, time.perf_counter() - start)
+
+@instrumentation.traced('dataset.acquire')
+def acquire():
+    """Returns a lease on the current snapshot, building a new version if data/ changed."""
+    global _current
+    with _lock:
+        fingerprint = _fingerprint()
+        if _current is None or _current.fingerprint != fingerprint:
+            _current = _build_snapshot(fingerprint)
+            _snapshots[_current.version] = _current
+            _refcounts[_current.version] = 0
+            _drop_unreferenced()
+        _refcounts[_current.version] += 1
+        return SnapshotLease(_current)
+
+def _release(version):
+    with _lock:
+        if version in _refcounts:
+            _refcounts[version] -= 1
+        _drop_unreferenced()
+
+def _drop_unreferenced():
+    """Forgets retired versions nobody holds a lease on. Caller must hold _lock."""
+    for version in [v for v, count in _refcounts.items() if count <= 0]:
+        if _current is None or version != _current.version:
+            _refcounts.pop(version, None)
+            _snapshots.pop(version, None)
+
+def is_current(lease):
+    """
+    False when the lease's snapshot was invalidated or data/ changed since it was built
+    (noticed within FINGERPRINT_TTL seconds).
+    """
+    with _lock:
+        current = _current
+    return (current is not None and lease.version == current.version
+            and current.fingerprint == _fingerprint(FINGERPRINT_TTL))
+
+def invalidate():
+    """Retires the current snapshot; the next acquire() re-runs detection on data/."""
+    global _current, _force_rebuild, _checked
+    with _lock:
+        _current = None
+        _force_rebuild = True
+        _checked = None
+        _drop_unreferenced()
+
+def stats():
+    """Live versions and their lease counts (for the admin page / debugging)."""
+    with _lock:
+        return {
+            'current_version': _current.version if _current else None,
+            'leases': dict(_refcounts)
+        }
@@ -0,0 +1,285 @@
+"""
+Persistent decision journal (SQLite, append-only).
+
+Every completed decision (approve / apply / ignore / reject / insight action)
+and every issue a session creates (e.g. the payroll item of an approved
+welfare claim) is appended as one row keyed by issue_id. Bulk actions are
+group-committed: one transaction per batch instead of one per issue, and
+every row recorded inside `with journal.group():` (a bulk action's
+transitions plus the issues it creates) goes out in one transaction.
+
+Rows belong to an owner (the signed-in user or workspace id a session runs
+as): a session replays only its owner's decisions, so one user's approvals
+never hide issues in another user's queue. All owners share one SQLite file
+and connection; each owner has its own snapshot.
+
+On startup the journal is rebuilt from the latest snapshot (one pickled
+state blob) plus a replay of the rows appended after it. load() compacts
+(writes a new snapshot and drops the replayed rows) once more than
+SNAPSHOT_EVERY rows have accumulated, so replay stays short no matter how
+long the journal has been running. Replay keeps the newest
+issue_store.HISTORY_LIMIT completed copies; older decisions expire (and
+drop out of the next snapshot).
+
+    journal = decision_journal.open_journal(owner)
+    store = issue_store.IssueStore(journal=journal)
+    store.restore(journal.load())
+
+    python -m modules.decision_journal --owner kim   # stats (+ load time)
+    python -m modules.decision_journal --compact     # snapshot now (default owner '')
+    python -m modules.decision_journal --clear
+"""
+import contextlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from modules import data_store, instrumentation, issue_store
+
+DATA_DIR = data_store.DATA_DIR
+JOURNAL_FILE = 'decisions.sqlite'
+# Rows replayed on load before it writes a fresh snapshot
+SNAPSHOT_EVERY = 10000
+DEFAULT_OWNER = ''
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL DEFAULT '',  -- user / workspace the decision belongs to
+    kind TEXT NOT NULL,              -- 'decision' | 'local'
+    issue_id TEXT NOT NULL,
+    status TEXT,
+    action TEXT,
+    recorded_at REAL NOT NULL,
+    payload BLOB NOT NULL            -- pickled completed copy / created issue
+);
+CREATE INDEX IF NOT EXISTS journal_owner_seq ON journal (owner, seq);
+"""
+SNAPSHOT_TABLE = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    owner TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    payload BLOB NOT NULL            -- pickled JournalState
+)
+"""
+
+_databases = {}   # path -> (connection, lock): one connection per file per process
+_databases_lock = threading.Lock()
+
+def journal_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, data_store.CACHE_DIR_NAME, JOURNAL_FILE)
+
+def open_journal(owner=DEFAULT_OWNER, path=None):
+    """`owner`'s journal in `path` (default data/.cache/decisions.sqlite)."""
+    return DecisionJournal(path or journal_path(), owner)
+
+def _create_schema(conn):
+    """Creates the tables; a file from before owners existed keeps its rows under DEFAULT_OWNER."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(journal)")]
+    if columns and 'owner' not in columns:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("ALTER TABLE journal ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            conn.execute("ALTER TABLE snapshot RENAME TO snapshot_single")
+            conn.execute(SNAPSHOT_TABLE)
+            conn.execute("INSERT INTO snapshot (owner, last_seq, created_at, payload) "
+                         "SELECT '', last_seq, created_at, payload FROM snapshot_single")
+            conn.execute("DROP TABLE snapshot_single")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    conn.executescript(SCHEMA)
+    conn.execute(SNAPSHOT_TABLE)
+
+def _database(path):
+    with _databases_lock:
+        if path not in _databases:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Shared by Streamlit's script threads; every use is under the lock
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _create_schema(conn)
+            _databases[path] = (conn, threading.Lock())
+        return _databases[path]
+
+class JournalState:
+    """Replayed decisions: what IssueStore.restore() needs."""
+    __slots__ = ('decisions', 'completed', 'local')
+
+    def __init__(self):
+        self.decisions = {}   # issue_id -> status (last decision wins)
+        self.completed = []   # completed copies, oldest first
+        self.local = {}       # issue_id -> issue created by a session
+
+    def apply(self, kind, issue):
+        if kind == 'local':
+            self.local[issue['issue_id']] = issue
+        else:
+            self.decisions[issue['issue_id']] = issue['status']
+            self.completed.append(issue)
+
+    def trim(self, limit=issue_store.HISTORY_LIMIT):
+        """Keeps the newest `limit` completed copies and the decisions they carry."""
+        if len(self.completed) <= limit:
+            return
+        del self.completed[:-limit]
+        self.decisions = {issue['issue_id']: issue['status'] for issue in self.completed}
+
+class DecisionJournal:
+    """One owner's view of a journal file (cheap to create; the connection is shared per file)."""
+
+    def __init__(self, path, owner=DEFAULT_OWNER):
+        self.path = path
+        self.owner = owner
+        self._conn, self._lock = _database(path)
+        self._group = threading.local()   # rows buffered by group(), per script thread
+
+    # --- Writing ---
+    @contextlib.contextmanager
+    def group(self):
+        """Rows recorded inside the block (by this thread) are written in one transaction when it ends."""
+        if getattr(self._group, 'rows', None) is not None:
+            yield   # nested: the outermost block writes
+            return
+        self._group.rows = []
+        try:
+            yield
+        finally:
+            rows, self._group.rows = self._group.rows, None
+            self._append(rows)
+
+    def record(self, completed):
+        """Appends completed issue copies in one transaction (group commit). Returns rows written."""
+        now = time.time()
+        rows = [('decision', str(issue['issue_id']), issue.get('status'), issue.get('action_taken'), now,
+                 pickle.dumps(issue, protocol=pickle.HIGHEST_PROTOCOL))
+                for issue in completed]
+        return self._append(rows)
+
+    def record_local(self, issue):
+        """Appends an issue created in a session (re-added as pending on replay until decided)."""
+        return self._append([('local', str(issue['issue_id']), issue.get('status'), None, time.time(),
+                              pickle.dumps(issue, protocol=pickle.HIGHEST_PROTOCOL))])
+
+    def _append(self, rows):
+        if not rows:
+            return 0
+        buffered = getattr(self._group, 'rows', None)
+        if buffered is not None:
+            buffered.extend(rows)
+            return len(rows)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO journal (owner, kind, issue_id, status, action, recorded_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.owner,) + row for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        instrumentation.count('journal.rows_written', len(rows))
+        return len(rows)
+
+    # --- Reading ---
+    @instrumentation.traced('journal.load')
+    def load(self, compact=True):
+        """Snapshot + replay of the rows after it. Compacts when the replayed tail is long."""
+        state, replayed = self._load(SNAPSHOT_EVERY if compact else None)
+        instrumentation.count('journal.rows_replayed', replayed)
+        return state
+
+    def _load(self, compact_after):
+        """
+        Replays in one transaction, so the snapshot and the tail come from the same database state.
+        With `compact_after` (rows), the transaction is IMMEDIATE and a snapshot is written up to the
+        last replayed seq once more rows than that were replayed: rows appended meanwhile (by any
+        thread or process) wait for the lock and land after it.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN" if compact_after is None else "BEGIN IMMEDIATE")
+            try:
+                state, last_seq = self._read_snapshot()
+                replayed = 0
+                cursor = self._conn.execute(
+                    "SELECT seq, kind, payload FROM journal WHERE owner = ? AND seq > ? ORDER BY seq",
+                    (self.owner, last_seq))
+                for seq, kind, payload in cursor:
+                    state.apply(kind, pickle.loads(payload))
+                    last_seq = seq
+                    replayed += 1
+                state.trim()
+                if compact_after is not None and replayed > compact_after:
+                    self._write_snapshot(state, last_seq)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return state, replayed
+
+    def _read_snapshot(self):
+        row = self._conn.execute("SELECT last_seq, payload FROM snapshot WHERE owner = ?", (self.owner,)).fetchone()
+        if row is None:
+            return JournalState(), 0
+        return pickle.loads(row[1]), row[0]
+
+    def _write_snapshot(self, state, last_seq):
+        """Stores `state` as of `last_seq` and drops the rows it covers. Caller holds self._lock and a write transaction."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO snapshot (owner, last_seq, created_at, payload) VALUES (?, ?, ?, ?)",
+            (self.owner, last_seq, time.time(), pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)))
+        self._conn.execute("DELETE FROM journal WHERE owner = ? AND seq <= ?", (self.owner, last_seq))
+
+    def compact(self):
+        """Writes a snapshot of the full journal now (up to the last row it replayed)."""
+        return self._load(compact_after=0)[0]
+
+    def clear(self):
+        """Forgets every decision of this owner (reset)."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM journal WHERE owner = ?", (self.owner,))
+            self._conn.execute("DELETE FROM snapshot WHERE owner = ?", (self.owner,))
+            self._conn.execute("COMMIT")
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM journal WHERE owner = ?", (self.owner,)).fetchone()[0]
+            snapshot = self._conn.execute("SELECT last_seq, created_at FROM snapshot WHERE owner = ?",
+                                          (self.owner,)).fetchone()
+        return {
+            'path': self.path,
+            'owner': self.owner,
+            'rows': rows,
+            'snapshot_seq': snapshot[0] if snapshot else None,
+            'snapshot_at': snapshot[1] if snapshot else None
+        }
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Decision journal maintenance")
+    parser.add_argument('--path', default=None)
+    parser.add_argument('--owner', default=DEFAULT_OWNER, help="User / workspace id (default: the shared '' owner)")
+    parser.add_argument('--compact', action='store_true', help="Write a snapshot now")
+    parser.add_argument('--clear', action='store_true', help="Delete every journaled decision")
+    args = parser.parse_args()
+
+    journal = open_journal(args.owner, args.path)
+    if args.clear:
+        journal.clear()
+    if args.compact:
+        journal.compact()
+    start = time.perf_counter()
+    state = journal.load(compact=False)
+    seconds = time.perf_counter() - start
+    stats = journal.stats()
+    print(f"{stats['path']} [{stats['owner'] or 'default'}]: {stats['rows']:,} rows after snapshot seq {stats['snapshot_seq']}")
+    print(f"decisions {len(state.decisions):,}  completed {len(state.completed):,}  local {len(state.local):,}  "
+          f"(load {seconds:.3f}s)")
@@ -0,0 +1,346 @@
+"""
+Incremental delta sync of the Davinci exports.
+
+Instead of rebuilding every issue on each refresh, DeltaSync keeps a live
+issue set plus a cursor per source table:
+
+    hr_event_log   high-water mark on event_date
+    tna_record     high-water mark on date
+    shadow_ledger  row offset (issue ids are text: 'ISSUE-10' sorts before 'ISSUE-9')
+
+Each cursor also remembers the byte offset already consumed, so a refresh
+only parses the lines appended since the last sync, and a file whose size and
+mtime are unchanged is not read at all. Appended event / TNA rows with a date
+above the watermark are new; rows at or below it are corrections of rows
+already seen. Ledger rows are corrections when their issue_id was seen
+before. If an export was rewritten rather than appended (the file shrank or
+its head changed), that table is rescanned once (through the data_store
+cache) and diffed against the live state.
+
+hr_master and its employee-name index are part of the state and are only
+reloaded when hr_master.csv changes; that also rescans tna_record and
+shadow_ledger so issue names follow.
+
+Only the affected issues are touched: a Chaser issue is rebuilt for each
+employee whose pending dates changed, and an Auditor issue is added, modified
+or retired for each ledger line. Event rows move the watermark and are
+reported, but no issue is derived from them yet.
+
+With keep_tables=True the synced frames are kept as well (appended rows are
+concatenated onto the previous frame, never modified in place). That is how
+dataset_cache builds each new shared snapshot version: its tables and its
+Chaser / Auditor issues come from one in-process DeltaSync instead of a full
+reload and re-detection. The CLI below keeps its own state file:
+
+Usage:
+    python -m modules.delta_sync            # sync and print what changed
+    python -m modules.delta_sync --reset    # drop saved state and start from a full load
+"""
+import hashlib
+import io
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from modules import data_store, employee_index, logic_auditor, logic_chaser
+
+DATA_DIR = data_store.DATA_DIR
+STATE_FILE = 'delta_sync.pkl'
+# Bump when the pickled state layout changes (older state files are then ignored)
+STATE_VERSION = 2
+
+# table -> watermark column (None: row offset)
+TABLE_KEYS = {
+    'hr_event_log': 'event_date',
+    'tna_record': 'date',
+    'shadow_ledger': None
+}
+
+# Bytes at the head of a file used to tell "appended to" from "rewritten"
+PREFIX_BYTES = 64 * 1024
+
+def _prefix_hash(path, length):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def _append_rows(frame, rows):
+    """
+    New frame with `rows` appended (`frame` is not modified). Categorical columns
+    stay categorical: categories first seen in `rows` are added after the existing ones.
+    """
+    if frame is None or frame.empty:
+        return rows.reset_index(drop=True)
+    if rows.empty:
+        return frame
+    widened, tail = {}, {}
+    for col, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            extra = pd.Index(rows[col].astype(object).dropna().unique()).difference(dtype.categories)
+            if len(extra):
+                dtype = pd.CategoricalDtype(dtype.categories.append(extra))
+                widened[col] = dtype
+            tail[col] = dtype
+    if widened:
+        frame = frame.astype(widened)
+    return pd.concat([frame, rows.astype(tail)], ignore_index=True)
+
+class DeltaSync:
+    """Live issue set maintained from appended/changed source rows."""
+
+    def __init__(self, data_dir=DATA_DIR, keep_tables=False):
+        self.state_version = STATE_VERSION
+        self.data_dir = data_dir
+        self.keep_tables = keep_tables
+        self.cursors = {}         # table -> {'offset', 'size', 'mtime_ns', 'prefix_len', 'prefix_sha1', 'header', 'empty', 'watermark'}
+        self.issues = {}          # issue_id -> issue dict (Chaser + Auditor)
+        self.pending_dates = {}   # employee_id -> {date: label}, in arrival order
+        self.ledger_ids = set()   # issue ids that came from shadow_ledger
+        self.hr_master = None
+        self.hr_master_stat = None
+        self.name_index = None
+        self.tables = {}          # table -> synced frame (keep_tables only)
+        self.last_result = None
+
+    # --- Persistence ---
+    @staticmethod
+    def state_path(data_dir=DATA_DIR):
+        return os.path.join(data_dir, data_store.CACHE_DIR_NAME, STATE_FILE)
+
+    @classmethod
+    def load(cls, data_dir=DATA_DIR):
+        """Restores the saved state, or returns a fresh instance (full load on first sync)."""
+        try:
+            with open(cls.state_path(data_dir), 'rb') as f:
+                state = pickle.load(f)
+            if isinstance(state, cls) and getattr(state, 'state_version', None) == STATE_VERSION:
+                state.data_dir = data_dir
+                return state
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading sync state: {e}")
+        return cls(data_dir)
+
+    def save(self):
+        path = self.state_path(self.data_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    # --- Reading ---
+    def _refresh_hr_master(self):
+        """Reloads hr_master and the name index only when hr_master.csv changed. Returns True if it did."""
+        stat = os.stat(os.path.join(self.data_dir, 'hr_master.csv'))
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.hr_master is not None and signature == self.hr_master_stat:
+            return False
+        self.hr_master = data_store.load_table('hr_master', self.data_dir)
+        self.name_index = employee_index.build_name_index(self.hr_master)
+        self.hr_master_stat = signature
+        return True
+
+    def _scan(self, path, table):
+        """Full read through the typed cache; retried if the file changed while it was read."""
+        while True:
+            before = os.stat(path)
+            rows = data_store.load_table(table, self.data_dir)
+            after = os.stat(path)
+            if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+                return rows, after
+
+    def _read_delta(self, table):
+        """Returns (rows, rescanned). Only bytes past the saved offset are parsed when possible."""
+        path = os.path.join(self.data_dir, f"{table}.csv")
+        stat = os.stat(path)
+        cursor = self.cursors.get(table)
+
+        if cursor and stat.st_size == cursor['size'] and stat.st_mtime_ns == cursor['mtime_ns']:
+            return cursor['empty'], False
+
+        if (cursor and stat.st_size >= cursor['offset']
+                and _prefix_hash(path, cursor['prefix_len']) == cursor['prefix_sha1']):
+            with open(path, 'rb') as f:
+                f.seek(cursor['offset'])
+                tail = f.read()
+            # Only consume complete lines; a half-written last line is picked up next time
+            body = tail[:tail.rfind(b'\n') + 1]
+            cursor['offset'] += len(body)
+            cursor['size'], cursor['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            if not body.strip():
+                return cursor['empty'], False
+            rows = data_store.read_csv_typed(io.BytesIO(body), table, header=None, names=cursor['header'])
+            return rows, False
+
+        # First sync, or the export was rewritten: full scan once
+        rows, stat = self._scan(path, table)
+        prefix_len = min(PREFIX_BYTES, stat.st_size)
+        self.cursors[table] = {
+            'offset': stat.st_size,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'prefix_len': prefix_len,
+            'prefix_sha1': _prefix_hash(path, prefix_len),
+            'header': list(rows.columns),
+            'empty': rows.iloc[:0].copy(),
+            'watermark': cursor['watermark'] if cursor else None
+        }
+        return rows, True
+
+    def _advance_watermark(self, table, rows, rescanned):
+        """Moves the table's high-water mark; returns (new_rows, changed_rows) counts."""
+        cursor = self.cursors[table]
+        key = TABLE_KEYS[table]
+        if key is None:
+            # Row offset: corrections repeat an issue_id seen before
+            changed = int(rows['issue_id'].isin(self.ledger_ids).sum()) if len(rows) else 0
+            cursor['watermark'] = len(rows) if rescanned else (cursor['watermark'] or 0) + len(rows)
+            return len(rows) - changed, changed
+        if rows.empty:
+            return 0, 0
+        keys = rows[key]
+        watermark = cursor['watermark']
+        changed = int((keys <= watermark).sum()) if watermark is not None else 0
+        top = keys.max()
+        cursor['watermark'] = top if watermark is None else max(watermark, top)
+        return len(rows) - changed, changed
+
+    # --- Issue set updates ---
+    def _upsert(self, issue, result):
+        old = self.issues.get(issue['issue_id'])
+        if old is None:
+            result['added'].add(issue['issue_id'])
+        elif old != issue:
+            result['modified'].add(issue['issue_id'])
+        else:
+            return
+        self.issues[issue['issue_id']] = issue
+
+    def _retire(self, issue_id, result):
+        if self.issues.pop(issue_id, None) is not None:
+            result['retired'].add(issue_id)
+
+    def _apply_tna(self, rows, rescanned, result):
+        if rescanned:
+            touched = set(self.pending_dates)
+            self.pending_dates = {}
+        else:
+            touched = set()
+
+        if not rows.empty:
+            # Only the last row of an (employee, date) pair counts
+            last = rows.drop_duplicates(['employee_id', 'date'], keep='last')
+            touched.update(pd.unique(last['employee_id']).tolist())
+            is_open = (last['status'] == '미마감').to_numpy()
+            closed = last[~is_open]
+            if self.pending_dates and not closed.empty:
+                for emp_id, date in zip(closed['employee_id'].tolist(), closed['date']):
+                    dates = self.pending_dates.get(emp_id)
+                    if dates:
+                        dates.pop(date, None)
+            opened = last[is_open]
+            if not opened.empty:
+                unique_dates = pd.unique(opened['date'])
+                labels = dict(zip(unique_dates, logic_chaser.format_date_labels(unique_dates)))
+                for emp_id, date in zip(opened['employee_id'].tolist(), opened['date']):
+                    self.pending_dates.setdefault(emp_id, {})[date] = labels[date]
+
+        if not touched:
+            return
+        touched = sorted(touched)
+        names = employee_index.lookup_names(pd.Series(touched), self.name_index)
+        for emp_id, name in zip(touched, names.tolist()):
+            dates = self.pending_dates.get(emp_id)
+            if dates:
+                self._upsert(logic_chaser.make_chaser_issue(emp_id, name, list(dates.values())), result)
+            else:
+                self.pending_dates.pop(emp_id, None)
+                self._retire(f"CHASER-{emp_id}", result)
+
+    def _apply_ledger(self, rows, rescanned, result):
+        # The last line for an issue_id wins
+        rows = rows.drop_duplicates('issue_id', keep='last')
+        if rescanned:
+            for issue_id in self.ledger_ids - set(rows['issue_id'].tolist()):
+                self._retire(issue_id, result)
+            self.ledger_ids = set()
+
+        pending = rows['status'] == 'Pending'
+        for issue in logic_auditor.build_auditor_issues(rows[pending], None, self.name_index):
+            self._upsert(issue, result)
+        for issue_id in rows.loc[~pending, 'issue_id'].tolist():
+            self._retire(issue_id, result)
+        self.ledger_ids.update(rows['issue_id'].tolist())
+
+    # --- Entry point ---
+    def sync(self):
+        """
+        Pulls what changed since the last sync and updates the issue set in place.
+        Returns {'added', 'modified', 'retired': sets of issue ids, 'rows': per-table counts,
+        'hr_master': reloaded or not, 'seconds'}.
+        """
+        start = time.perf_counter()
+        result = {'added': set(), 'modified': set(), 'retired': set(), 'rows': {}}
+        result['hr_master'] = self._refresh_hr_master()
+        if result['hr_master']:
+            # Names changed under the live issues: rescan the tables they come from
+            for table in ('tna_record', 'shadow_ledger'):
+                if table in self.cursors:
+                    self.cursors[table]['prefix_sha1'] = None
+                    self.cursors[table]['size'] = None
+        if self.keep_tables:
+            self.tables['hr_master'] = self.hr_master
+
+        for table in TABLE_KEYS:
+            previous_watermark = self.cursors.get(table, {}).get('watermark')
+            rows, rescanned = self._read_delta(table)
+            if self.keep_tables:
+                self.tables[table] = rows if rescanned else _append_rows(self.tables.get(table), rows)
+            if rescanned and table == 'hr_event_log' and previous_watermark is not None:
+                # Append-only log: after a rewrite only rows past the watermark are new
+                rows = rows[rows['event_date'] > previous_watermark]
+            new_rows, changed_rows = self._advance_watermark(table, rows, rescanned)
+            result['rows'][table] = {'new': new_rows, 'changed': changed_rows, 'rescanned': rescanned}
+
+            if table == 'tna_record':
+                self._apply_tna(rows, rescanned, result)
+            elif table == 'shadow_ledger':
+                self._apply_ledger(rows, rescanned, result)
+
+        result['seconds'] = time.perf_counter() - start
+        self.last_result = result
+        return result
+
+    def get_issues(self):
+        """Chaser issues by employee id, then Auditor issues in ledger order (the order full detection uses)."""
+        chasers = sorted((issue for issue in self.issues.values() if issue['type'] == 'Chaser'),
+                         key=lambda issue: issue['employee_id'])
+        return chasers + [issue for issue in self.issues.values() if issue['type'] != 'Chaser']
+
+def sync(data_dir=DATA_DIR):
+    """Loads saved state, syncs, saves. Returns (DeltaSync, result)."""
+    engine = DeltaSync.load(data_dir)
+    result = engine.sync()
+    engine.save()
+    return engine, result
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental Davinci delta sync")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--reset', action='store_true', help="Discard saved sync state first")
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(DeltaSync.state_path(args.data_dir)):
+        os.remove(DeltaSync.state_path(args.data_dir))
+
+    engine, result = sync(args.data_dir)
+    for table, counts in result['rows'].items():
+        mode = 'rescan' if counts['rescanned'] else 'delta'
+        watermark = engine.cursors[table]['watermark']
+        print(f"{table:<15}{mode:>8}  new {counts['new']:>8,}  changed {counts['changed']:>8,}  watermark {watermark}")
+    print(f"issues: {len(engine.issues):,} live  +{len(result['added'])} ~{len(result['modified'])} "
+          f"-{len(result['retired'])}  ({result['seconds']:.3f}s)")
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+def build_name_index(hr_master_df):
+    """
+    Builds a reusable employee_id -> name lookup from hr_master.
+    Duplicate ids keep their first row (same as the old `.values[0]` lookups).
+    """
+    if hr_master_df.empty or 'employee_id' not in hr_master_df.columns:
+        return pd.Series(dtype=object)
+    return hr_master_df.drop_duplicates('employee_id').set_index('employee_id')['name']
+
+def lookup_names(employee_ids, name_index, default="Unknown"):
+    """Maps a Series of employee ids to names in one pass. Unknown ids get `default`."""
+    if name_index is None or name_index.empty:
+        return pd.Series(default, index=employee_ids.index, dtype=object)
+    return employee_ids.map(name_index).astype(object).fillna(default)
+
+def employee_rows(hr_ids, employee_ids):
+    """
+    hr_master row position of each id in `employee_ids` (-1 if unknown). Duplicate ids in
+    `hr_ids` resolve to their first row, like build_name_index.
+    """
+    hr_ids = pd.Index(hr_ids)
+    employee_ids = np.asarray(employee_ids)
+    if hr_ids.is_unique:
+        return hr_ids.get_indexer(employee_ids)
+    first = ~hr_ids.duplicated()
+    rows = hr_ids[first].get_indexer(employee_ids)
+    return np.where(rows >= 0, np.flatnonzero(first)[np.maximum(rows, 0)], -1)
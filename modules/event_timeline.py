@@ -0,0 +1,257 @@
+"""
+Effective-dated HR event timeline (no Streamlit imports).
+
+hr_event_log rows take effect on effective_date but are entered on
+event_date, often later (a promotion effective 10/1 entered 11/15). The
+timeline sorts every event by (employee, day in force) into flat arrays
+with one composite int64 key, and precomputes the salary and employment
+status in force after each event. "Salary and status of employee E on day
+D" is then one np.searchsorted per query, and batches of (employee, day)
+pairs are answered in a single vectorized as-of join.
+
+On top of that, for a payroll month:
+    paid_days()     days each employee was active (proration)
+    late_entries()  events entered after the pay periods they affect
+    retro_deltas()  salary difference owed for those periods (retroactive pay)
+
+    timeline = event_timeline.build_timeline(data)
+    salary, status = timeline.as_of([1001, 1002], ['2025-10-15', '2025-11-20'])
+
+last_event_rows() answers the same as-of question for a subset of event
+types (e.g. "latest role change in force", see logic_role_pay).
+"""
+import numpy as np
+import pandas as pd
+
+from modules import config_manager, employee_index, instrumentation
+
+ACTIVE, LEAVE, LEFT, NOT_HIRED = 0, 1, 2, 3
+STATUS_LABELS = {ACTIVE: '재직', LEAVE: '휴직', LEFT: '퇴사', NOT_HIRED: '입사 전'}
+
+# event_type -> (status in force afterwards, days after effective_date it takes effect)
+# 퇴사 on day d still pays day d; 휴직 on day d stops paying from day d.
+STATUS_EVENTS = {'입사': (ACTIVE, 0), '복직': (ACTIVE, 0), '휴직': (LEAVE, 0), '퇴사': (LEFT, 1)}
+# First status event -> status before it (everyone else starts ACTIVE)
+PRIOR_STATUS = {'입사': NOT_HIRED, '복직': LEAVE}
+PROMOTION_EVENT = '승진'
+
+# Composite key: employee row * DAY_SPAN + days since 1900-01-01
+DAY_SPAN = 1 << 17
+_EPOCH_SHIFT = 25567  # days from 1900-01-01 to 1970-01-01
+
+def to_days(dates):
+    """Dates (strings, datetimes or datetime64) as int64 days since 1970-01-01."""
+    values = np.asarray(dates)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = pd.to_datetime(values).to_numpy()
+    return values.astype('datetime64[D]').astype(np.int64)
+
+def _month_number(days):
+    return np.asarray(days).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+class EventTimeline:
+    """Sorted per-employee event arrays. Treat as read-only."""
+
+    def __init__(self, employee_ids, base_salary, initial_status, rows, in_force, entered, effective,
+                 event_type, salary, status, source):
+        self.employee_ids = pd.Index(employee_ids)
+        self.base_salary = base_salary          # salary before any event, per hr_master row
+        self.initial_status = initial_status    # status before any event, per hr_master row
+        # One entry per event, sorted by (row, in_force)
+        self.rows = rows
+        self.in_force = in_force                # day the event takes effect (days since epoch)
+        self.entered = entered                  # event_date
+        self.effective = effective              # effective_date
+        self.event_type = event_type
+        self.salary = salary                    # salary in force after the event
+        self.status = status                    # status in force after the event
+        self.source = source                    # row in hr_event_log
+        self.keys = rows * DAY_SPAN + (in_force + _EPOCH_SHIFT)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # --- Point-in-time lookups ---
+    def _positions(self, rows, days):
+        """Index of the last event in force on each (row, day), -1 if none."""
+        keys = rows * DAY_SPAN + (days + _EPOCH_SHIFT)
+        pos = np.searchsorted(self.keys, keys, side='right') - 1
+        hit = pos >= 0
+        hit[hit] = self.rows[pos[hit]] == rows[hit]
+        return np.where(hit, pos, -1)
+
+    def as_of_rows(self, rows, days):
+        """(salary, status) in force for hr_master rows on the given days (arrays, one pair per query)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        if not len(self.rows):
+            return self.base_salary[rows], self.initial_status[rows]
+        pos = self._positions(rows, days)
+        hit = pos >= 0
+        safe = np.where(hit, pos, 0)
+        salary = np.where(hit, self.salary[safe], self.base_salary[rows])
+        status = np.where(hit, self.status[safe], self.initial_status[rows])
+        return salary, status
+
+    def as_of(self, employee_ids, dates):
+        """(salary, status) in force for each (employee_id, date) pair. Unknown employees raise KeyError."""
+        rows = employee_index.employee_rows(self.employee_ids, employee_ids)
+        if (rows < 0).any():
+            raise KeyError(f"unknown employee_id: {np.asarray(employee_ids)[rows < 0][:5].tolist()}")
+        return self.as_of_rows(rows, np.broadcast_to(to_days(np.atleast_1d(dates)), rows.shape))
+
+    def last_event_rows(self, rows, days, event_types):
+        """Position of the last event of one of `event_types` in force on each (row, day), -1 if none."""
+        rows = np.asarray(rows, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        # Subset of an already sorted key array: still sorted, no re-sort needed
+        subset = np.flatnonzero(np.isin(self.event_type, list(event_types)))
+        if not len(subset):
+            return np.full(len(rows), -1)
+        pos = np.searchsorted(self.keys[subset], rows * DAY_SPAN + (days + _EPOCH_SHIFT), side='right') - 1
+        hit = pos >= 0
+        hit[hit] = self.rows[subset[pos[hit]]] == rows[hit]
+        return np.where(hit, subset[np.maximum(pos, 0)], -1)
+
+    def events_of(self, employee_id):
+        """Positions of one employee's events, in order of taking effect."""
+        row = employee_index.employee_rows(self.employee_ids, [employee_id])[0]
+        if row < 0:
+            raise KeyError(employee_id)
+        lo, hi = np.searchsorted(self.keys, [row * DAY_SPAN, (row + 1) * DAY_SPAN])
+        return np.arange(lo, hi)
+
+    # --- Payroll month batches ---
+    def _month_bounds(self, month_start):
+        start = pd.Timestamp(month_start).normalize().replace(day=1)
+        end = start + pd.offsets.MonthEnd(0)
+        return int(to_days([start])[0]), int(to_days([end])[0]) + 1
+
+    def paid_days(self, month_start):
+        """
+        (paid, days_in_month, last_event): active days per hr_master row in the month, the month
+        length, and the position of each row's last status change inside the month, else of the
+        status event in force at its start (e.g. 휴직 effective on the 1st; -1 if none).
+        """
+        start, end = self._month_bounds(month_start)
+        n = len(self.employee_ids)
+        _, status_at_start = self.as_of_rows(np.arange(n), np.full(n, start))
+
+        is_status = np.isin(self.event_type, list(STATUS_EVENTS))
+        inside = np.flatnonzero(is_status & (self.in_force > start) & (self.in_force < end))
+        rows = self.rows[inside]
+        seg_start = self.in_force[inside]
+        # Each in-month change lasts until the next change of the same employee, or the month end
+        same_next = np.r_[rows[1:] == rows[:-1], False] if len(rows) else np.zeros(0, dtype=bool)
+        seg_end = np.where(same_next, np.r_[seg_start[1:], end], end)
+        active = self.status[inside] == ACTIVE
+        paid = np.bincount(rows[active], weights=(seg_end - seg_start)[active], minlength=n)
+
+        # Segment before the first in-month change (the whole month for most employees)
+        first = np.full(n, end)
+        heads = np.r_[True, ~same_next[:-1]] if len(rows) else same_next
+        first[rows[heads]] = seg_start[heads]
+        paid += np.where(status_at_start == ACTIVE, first - start, 0)
+
+        last_event = np.full(n, -1)
+        last_event[rows[~same_next]] = inside[~same_next]
+        unchanged = np.flatnonzero(last_event < 0)
+        last_event[unchanged] = self.last_event_rows(unchanged, np.full(len(unchanged), start), STATUS_EVENTS)
+        return paid.astype(np.int64), end - start, last_event
+
+    def late_entries(self, month_start=None):
+        """
+        Events entered after the pay periods they affect (entered month > effective month),
+        optionally only those entered in the payroll month. One row per event, with the first
+        affected period and the number of periods already paid without it.
+        """
+        periods = _month_number(self.entered) - _month_number(self.effective)
+        mask = periods > 0
+        if month_start is not None:
+            mask &= _month_number(self.entered) == _month_number(self._month_bounds(month_start)[0])
+        pos = np.flatnonzero(mask)
+        return pd.DataFrame({
+            'position': pos,
+            'employee_id': self.employee_ids.to_numpy()[self.rows[pos]],
+            'event_type': self.event_type[pos],
+            'effective_date': self.effective[pos].astype('datetime64[D]'),
+            'event_date': self.entered[pos].astype('datetime64[D]'),
+            'first_period': pd.PeriodIndex(self.effective[pos].astype('datetime64[D]'), freq='M'),
+            'periods': periods[pos]
+        })
+
+    def retro_deltas(self, month_start):
+        """
+        Late salary changes entered in the payroll month: per event, the hr_master row, the
+        monthly salary difference it makes and the number of past periods it applies to.
+        """
+        late = self.late_entries(month_start)
+        pos = late['position'].to_numpy()
+        pos = pos[self.event_type[pos] == PROMOTION_EVENT]
+        # Salary before the event: the previous event of the same employee, else the base salary
+        rows = self.rows[pos]
+        prev = pos - 1
+        has_prev = (prev >= 0) & (self.rows[np.maximum(prev, 0)] == rows)
+        before = np.where(has_prev, self.salary[np.maximum(prev, 0)], self.base_salary[rows])
+        periods = _month_number(self.entered[pos]) - _month_number(self.effective[pos])
+        return pos, rows, self.salary[pos] - before, periods
+
+@instrumentation.traced('timeline.build')
+def build_timeline(data, raise_rate=None):
+    """
+    EventTimeline over hr_event_log for the employees in hr_master. raise_rate is the raise a
+    promotion applies (the source tables carry no new salary); defaults to the configured
+    promotion_raise_rate.
+    """
+    if raise_rate is None:
+        raise_rate = config_manager.load_config().get('promotion_raise_rate',
+                                                      config_manager.DEFAULT_CONFIG['promotion_raise_rate'])
+    hr_master = data.get('hr_master', pd.DataFrame())
+    events = data.get('hr_event_log', pd.DataFrame())
+    employee_ids = hr_master['employee_id'].to_numpy() if not hr_master.empty else np.zeros(0, dtype=np.int64)
+    base_salary = hr_master['base_salary'].to_numpy(np.int64, na_value=0) if not hr_master.empty else np.zeros(0, dtype=np.int64)
+    initial_status = np.full(len(employee_ids), ACTIVE, dtype=np.int8)
+    if events.empty or hr_master.empty:
+        empty = np.zeros(0, dtype=np.int64)
+        return EventTimeline(employee_ids, base_salary, initial_status, empty, empty, empty, empty,
+                             np.zeros(0, dtype=object), empty, np.zeros(0, dtype=np.int8), empty)
+
+    rows = employee_index.employee_rows(employee_ids, events['employee_id'].to_numpy())
+    known = np.flatnonzero(rows >= 0)
+    rows = rows[known].astype(np.int64)
+    event_type = events['event_type'].astype(object).to_numpy()[known]
+    effective = to_days(events['effective_date'])[known]
+    entered = to_days(events['event_date'])[known]
+    status_map = pd.Series(event_type).map({k: v[0] for k, v in STATUS_EVENTS.items()})
+    offset = pd.Series(event_type).map({k: v[1] for k, v in STATUS_EVENTS.items()}).fillna(0).to_numpy(np.int64)
+    in_force = effective + offset
+
+    order = np.lexsort((known, in_force, rows))
+    rows, in_force, entered, effective = rows[order], in_force[order], entered[order], effective[order]
+    event_type, source = event_type[order], known[order]
+    is_status = status_map.notna().to_numpy()[order]
+    status_code = status_map.fillna(-1).to_numpy(np.int64)[order]
+
+    n = len(rows)
+    group_start = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    start_of = np.repeat(group_start, np.diff(np.r_[group_start, n]))
+
+    # Salary after each event: base * (1 + raise) ^ (promotions so far, per employee)
+    promotions = np.cumsum(event_type == PROMOTION_EVENT)
+    promotions -= np.r_[0, promotions][start_of]
+    salary = np.round(base_salary[rows] * (1 + raise_rate) ** promotions).astype(np.int64)
+
+    # Status before the first status event: not yet hired before 입사, on leave before 복직
+    status_pos = np.flatnonzero(is_status)
+    first_rows, first_idx = np.unique(rows[status_pos], return_index=True)
+    first_type = event_type[status_pos[first_idx]]
+    for first_event, before in PRIOR_STATUS.items():
+        initial_status[first_rows[first_type == first_event]] = before
+
+    # Status after each event: the last status event so far of the same employee (forward fill)
+    last = np.maximum.accumulate(np.where(is_status, np.arange(n), -1))
+    own = last >= start_of
+    status = np.where(own, status_code[np.maximum(last, 0)], initial_status[rows]).astype(np.int8)
+
+    return EventTimeline(employee_ids, base_salary, initial_status, rows, in_force, entered, effective,
+                         event_type, salary, status, source)
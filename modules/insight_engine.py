@@ -1,67 +1,149 @@
-from modules import config_manager
+from modules import config_manager, instrumentation
 
-def detect_insights(issues):
+UNPLANNED_OT_TITLE = "계획되지 않은 초과근무 (Unplanned OT)"
+
+class InsightEngine:
     """
-    Analyzes the list of issues and detects potential risks or anomalies.
-    Returns a list of insight dictionaries.
+    Incremental insight engine.
+    Subscribed to an IssueStore, it keeps pending role-pay lines, unplanned-OT ids and per-manager
+    Chaser counts up to date as issues are added or resolved. Role-pay lines are the
+    logic_role_pay candidates (see set_role_pay) whose Auditor issue is pending in the store,
+    grouped by employee. insights() only rebuilds its result when
+    something changed (issues, role-pay candidates or config file) and returns the cached
+    list otherwise.
     """
-    config = config_manager.load_config()
-    insights = []
-    
-    # 1. Role-Pay Mismatch (Limit to 1 for variety)
-    mismatch_issues = [i for i in issues if i.get('job_change_date')]
-    if mismatch_issues:
-        issue = mismatch_issues[0] 
-        # In a real scenario, we'd check date diff against config['zombie_months']
-        insights.append({
-            "type": "Role-Pay Mismatch",
-            "title": "직무 불일치 수당 발견",
-            "message": f"**{issue['name']}**님은 {config['zombie_months']}개월 전 사무직으로 발령 났으나, 규정에 어긋난 **'{issue['title']}'**이 계속 지급되고 있습니다.",
-            "action": "지급 중단 및 환수 제안",
-            "color": "red",
-            "issue_ids": [issue['issue_id']] 
-        })
 
-    # 2. Work Plan vs OT Mismatch (New & Impactful!)
-    unplanned_ot = [i for i in issues if i.get('title') == "계획되지 않은 초과근무 (Unplanned OT)"]
-    if unplanned_ot:
-        count = len(unplanned_ot)
-        insights.append({
-            "type": "Unplanned OT",
-            "title": "업무 계획 불일치 감지",
-            "message": f"**{count}명**의 직원이 사전 업무 계획 없이 초과근무를 수행했습니다. 부서장 승인 여부를 확인해야 합니다.",
-            "action": "부서장 확인 요청",
-            "color": "red",
-            "issue_ids": [i['issue_id'] for i in unplanned_ot]
-        })
+    def __init__(self, role_pay=None):
+        self.store_reset()
+        self.set_role_pay(role_pay or {})
+
+    def set_role_pay(self, role_pay):
+        """
+        Role-pay candidates of the current dataset (logic_role_pay.index_by_employee).
+        Call before the store (re)loads its issues: store_reset() and the replayed
+        issue_added() calls then pick the pending lines out of them.
+        """
+        self._role_pay_lines = {item['issue_id']: (emp_id, item)
+                                for emp_id, items in role_pay.items() for item in items}
+        self._role_pay = {}
+        self._cached = None
+
+    # --- IssueStore listener ---
+    def store_reset(self):
+        self._role_pay = {}          # employee_id -> {issue_id: role-pay candidate}, pending lines only
+        self._unplanned_ot = {}      # issue_id -> None
+        self._manager_chasers = {}   # manager_id -> {issue_id: None}
+        self._cached = None
+
+    def issue_added(self, issue):
+        issue_id = issue['issue_id']
+        line = self._role_pay_lines.get(issue_id)
+        if line is not None:
+            self._role_pay.setdefault(line[0], {})[issue_id] = line[1]
+        if issue.get('title') == UNPLANNED_OT_TITLE:
+            self._unplanned_ot[issue_id] = None
+        if issue['type'] == 'Chaser':
+            self._manager_chasers.setdefault(issue.get('manager_id', 'Unknown'), {})[issue_id] = None
+        self._cached = None
+
+    def issue_removed(self, issue):
+        issue_id = issue['issue_id']
+        line = self._role_pay_lines.get(issue_id)
+        if line is not None:
+            bucket = self._role_pay.get(line[0])
+            if bucket is not None:
+                bucket.pop(issue_id, None)
+                if not bucket:
+                    del self._role_pay[line[0]]
+        self._unplanned_ot.pop(issue_id, None)
+        if issue['type'] == 'Chaser':
+            mgr = issue.get('manager_id', 'Unknown')
+            bucket = self._manager_chasers.get(mgr)
+            if bucket is not None:
+                bucket.pop(issue_id, None)
+                if not bucket:
+                    del self._manager_chasers[mgr]
+        self._cached = None
+
+    # --- Results ---
+    @instrumentation.traced('insights.insights', count_result=True)
+    def insights(self):
+        """Current insights; recomputed from the maintained counters only when issues or config changed."""
+        signature = config_manager.config_signature()
+        if self._cached is not None and self._cached[0] == signature:
+            return self._cached[1]
+        insights = self._build(config_manager.load_config())
+        self._cached = (signature, insights)
+        return insights
+
+    def _build(self, config):
+        insights = []
 
-    # 3. Bottleneck Manager
-    chaser_issues = [i for i in issues if i['type'] == 'Chaser']
-    if chaser_issues:
-        manager_counts = {}
-        manager_issue_ids = {} 
-        
-        for i in chaser_issues:
-            mgr = i.get('manager_id', 'Unknown')
-            manager_counts[mgr] = manager_counts.get(mgr, 0) + 1
-            if mgr not in manager_issue_ids: manager_issue_ids[mgr] = []
-            manager_issue_ids[mgr].append(i['issue_id'])
-            
-        total_chasers = len(chaser_issues)
+        # 1. Role-Pay Mismatch: role allowances still paid more than zombie_months after a role change
+        zombie_months = config.get('zombie_months', 3)
+        flagged = {}
+        for emp_id, lines in self._role_pay.items():
+            late = [item for item in lines.values() if item['months_since_change'] > zombie_months]
+            if late:
+                flagged[emp_id] = late
+        if flagged:
+            first = next(iter(flagged.values()))[0]
+            name = first['name']
+            if len(flagged) == 1:
+                message = (f"**{name}**님은 {first['months_since_change']}개월 전 '{first['change']}'이 있었으나, "
+                           f"규정에 어긋난 **'{first['allowance']}'**이 계속 지급되고 있습니다.")
+            else:
+                allowances = ', '.join(dict.fromkeys(item['allowance'] for items in flagged.values() for item in items))
+                message = (f"**{name}**님 외 {len(flagged) - 1}명이 직무 변경 후 {zombie_months}개월이 지나도록 "
+                           f"**{allowances}**을 계속 지급받고 있습니다.")
+            insights.append({
+                "type": "Role-Pay Mismatch",
+                "title": "직무 불일치 수당 발견",
+                "message": message,
+                "action": "지급 중단 및 환수 제안",
+                "color": "red",
+                "issue_ids": [item['issue_id'] for items in flagged.values() for item in items],
+                "employees": flagged
+            })
+
+        # 2. Work Plan vs OT Mismatch (New & Impactful!)
+        if self._unplanned_ot:
+            count = len(self._unplanned_ot)
+            insights.append({
+                "type": "Unplanned OT",
+                "title": "업무 계획 불일치 감지",
+                "message": f"**{count}명**의 직원이 사전 업무 계획 없이 초과근무를 수행했습니다. 부서장 승인 여부를 확인해야 합니다.",
+                "action": "부서장 확인 요청",
+                "color": "red",
+                "issue_ids": list(self._unplanned_ot)
+            })
+
+        # 3. Bottleneck Manager
         bottleneck_limit = config.get('bottleneck_limit', 15)
-        
-        for mgr, count in manager_counts.items():
-            # Use config threshold (default 15) OR percentage logic. 
-            # For this demo, let's respect the config limit if it's set low, or keep the percentage logic.
+        for mgr, issue_ids in self._manager_chasers.items():
+            count = len(issue_ids)
             # User requested: "pending_count_limit: [ 15 ] cases"
-            if count >= bottleneck_limit: 
+            if count >= bottleneck_limit:
                 insights.append({
                     "type": "Bottleneck Manager",
                     "title": "결재 병목 감지",
                     "message": f"현재 미마감 건이 **{count}건**으로 설정된 한도({bottleneck_limit}건)를 초과하여 **'{mgr}'** 결재함에 멈춰 있습니다.",
                     "action": f"{mgr}에게 요약 리포트 발송",
                     "color": "orange",
-                    "issue_ids": manager_issue_ids[mgr] 
+                    "issue_ids": list(issue_ids)
                 })
-                
-    return insights
+
+        return insights
+
+def detect_insights(issues, role_pay=None):
+    """
+    Analyzes the pending issues and detects potential risks or anomalies.
+    Accepts an IssueStore or a plain list of issues; this is a one-off full pass.
+    `role_pay` is the dataset's logic_role_pay.index_by_employee result, if any.
+    For per-rerun use, subscribe an InsightEngine to the store instead.
+    Returns a list of insight dictionaries.
+    """
+    engine = InsightEngine(role_pay)
+    for issue in issues:
+        engine.issue_added(issue)
+    return engine.insights()
@@ -0,0 +1,163 @@
+"""
+Lightweight timing and counter instrumentation.
+
+Spans (named, nested wall-clock intervals) and counters are recorded into a
+per-thread trace, so each Streamlit rerun (one script thread) gets its own
+breakdown. When disabled (the default), span() hands back a shared no-op
+object and traced() calls straight through, so the cost is one flag check.
+
+    instrumentation.enable()
+    instrumentation.begin_trace()
+    with instrumentation.span('render.sidebar'):
+        ...
+    instrumentation.count('chaser.tna_rows', len(tna_df))
+    trace = instrumentation.end_trace()
+    instrumentation.summarize(trace)       # per-span totals for the admin panel
+    instrumentation.to_chrome_trace(trace) # load in chrome://tracing or Perfetto
+
+Set MELZI_TRACE=1 to enable from process start.
+"""
+import functools
+import os
+import threading
+import time
+
+_state = {'enabled': os.environ.get('MELZI_TRACE') == '1'}
+_local = threading.local()
+
+def enable(flag=True):
+    _state['enabled'] = bool(flag)
+
+def is_enabled():
+    return _state['enabled']
+
+class Trace:
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.ended_ns = None
+        self.events = []     # (name, start_ns, duration_ns, depth, thread_id)
+        self.counters = {}   # name -> value
+        self.depth = 0
+
+    @property
+    def duration_ns(self):
+        return (self.ended_ns or time.perf_counter_ns()) - self.started_ns
+
+def begin_trace():
+    """Starts a fresh trace for the current thread (call at the top of a rerun)."""
+    _local.trace = Trace() if _state['enabled'] else None
+    return _local.trace
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+def end_trace():
+    """Closes and returns the current thread's trace (None when disabled)."""
+    trace = current_trace()
+    if trace is not None:
+        trace.ended_ns = time.perf_counter_ns()
+    _local.trace = None
+    return trace
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def end(self):
+        pass
+
+_NOOP = _NoopSpan()
+
+class _Span:
+    __slots__ = ('name', 'trace', 'start_ns', 'depth', 'done')
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.depth = trace.depth
+        trace.depth += 1
+        self.start_ns = time.perf_counter_ns()
+        self.done = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+    def end(self):
+        if self.done:
+            return
+        self.done = True
+        self.trace.depth -= 1
+        self.trace.events.append((self.name, self.start_ns, time.perf_counter_ns() - self.start_ns,
+                                  self.depth, threading.get_ident()))
+
+def span(name):
+    """Context manager timing a block. Also usable as start/stop: s = span(...); ...; s.end()."""
+    if not _state['enabled']:
+        return _NOOP
+    trace = current_trace()
+    if trace is None:
+        return _NOOP
+    return _Span(name, trace)
+
+def count(name, value=1):
+    """Adds to a counter in the current trace (e.g. rows or issues processed)."""
+    if not _state['enabled']:
+        return
+    trace = current_trace()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + value
+
+def traced(name, count_result=False):
+    """Decorator: span around every call; with count_result, len(result) is added to '<name>.items'."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return fn(*args, **kwargs)
+            with span(name):
+                result = fn(*args, **kwargs)
+            if count_result and result is not None:
+                count(f"{name}.items", len(result))
+            return result
+        return wrapper
+    return decorator
+
+def summarize(trace):
+    """Per-span rows (calls, total and max ms, share of the trace), slowest first."""
+    if trace is None:
+        return []
+    rows = {}
+    for name, _, duration_ns, depth, _ in trace.events:
+        row = rows.setdefault(name, {'span': name, 'depth': depth, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        row['calls'] += 1
+        row['total_ms'] += duration_ns / 1e6
+        row['max_ms'] = max(row['max_ms'], duration_ns / 1e6)
+        row['depth'] = min(row['depth'], depth)
+    total_ms = trace.duration_ns / 1e6 or 1.0
+    for row in rows.values():
+        row['share'] = row['total_ms'] / total_ms
+    return sorted(rows.values(), key=lambda r: r['total_ms'], reverse=True)
+
+def to_chrome_trace(trace, process_name="melzi"):
+    """Chrome Trace Event Format (JSON-serializable dict)."""
+    if trace is None:
+        return {'traceEvents': []}
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': process_name}}]
+    for name, start_ns, duration_ns, _, thread_id in trace.events:
+        events.append({
+            'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': 1, 'tid': thread_id,
+            'ts': (start_ns - trace.started_ns) / 1000, 'dur': duration_ns / 1000
+        })
+    end_ts = trace.duration_ns / 1000
+    for name, value in trace.counters.items():
+        events.append({'name': name, 'ph': 'C', 'pid': 1, 'ts': end_ts, 'args': {'value': value}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -0,0 +1,139 @@
+"""
+Compact issue record.
+
+Issues used to be free-form dicts with 10-20 string keys each; at a few
+hundred thousand issues the per-dict overhead dominated memory. IssueRecord
+keeps the known Chaser / Auditor / Welfare fields in __slots__ and interns
+the categorical ones (type, status, workplace, manager_id, special_status,
+event_id, title, action_label), so equal values share one string object.
+Keys outside FIELDS (rare, e.g. fields added by a later detector) go to a
+small per-record dict.
+
+IssueRecord is a read-only Mapping: issue['name'], issue.get('diff', 0),
+'event_id' in issue, dict(issue) and ** all behave like the dict they
+replace, and an absent field is absent (KeyError / get default), not None.
+Use replace() instead of dict(issue, ...) to derive a changed copy; copy()
+returns a plain dict, so code that copies an issue and then edits it keeps
+working.
+
+    python -m benchmarks.bench_issue_record   # memory per 100k issues, dict vs record
+"""
+import sys
+from collections.abc import Mapping
+
+FIELDS = (
+    'issue_id', 'type', 'employee_id', 'name', 'title', 'status', 'action_label', 'action_taken',
+    'workplace', 'manager_id', 'special_status', 'event_id', 'job_change_date',
+    'description', 'diff', 'logic_text', 'reason',
+    'amount', 'receipt_items', 'ai_verdict', 'ai_reason', 'policy_ref'
+)
+INTERNED_FIELDS = frozenset(('type', 'status', 'workplace', 'manager_id', 'special_status', 'event_id',
+                             'title', 'action_label', 'action_taken'))
+_FIELD_SET = frozenset(FIELDS)
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+_MISSING = _Missing()
+
+def _intern(field, value):
+    if field in INTERNED_FIELDS and type(value) is str:
+        return sys.intern(value)
+    return value
+
+class IssueRecord(Mapping):
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, fields=(), **kwargs):
+        values = dict(fields, **kwargs) if kwargs else (fields if isinstance(fields, dict) else dict(fields))
+        setattr_ = object.__setattr__
+        extra = None
+        for key, value in values.items():
+            if key in _FIELD_SET:
+                if key in INTERNED_FIELDS and type(value) is str:
+                    value = sys.intern(value)
+                setattr_(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        setattr_(self, '_extra', extra)
+
+    def _set(self, key, value):
+        if key in _FIELD_SET:
+            object.__setattr__(self, key, _intern(key, value))
+        else:
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[key] = value
+
+    def __setattr__(self, name, value):
+        raise AttributeError("IssueRecord is read-only; use replace()")
+
+    # --- Mapping ---
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"IssueRecord({dict(self)!r})"
+
+    def __reduce__(self):
+        # Only present fields are pickled (snapshots, the decision journal, the SQL store)
+        return (IssueRecord, (tuple(self.items()),))
+
+    # --- Copies ---
+    def copy(self):
+        """A plain, mutable dict with the same items (what dict.copy() callers go on to edit)."""
+        return dict(self.items())
+
+    def replace(self, **changes):
+        """A new record with `changes` applied (the record itself is never modified)."""
+        record = IssueRecord(self.items())
+        for key, value in changes.items():
+            record._set(key, value)
+        return record
+
+def compact(issue):
+    """IssueRecord for a dict (records are returned as-is)."""
+    return issue if isinstance(issue, IssueRecord) else IssueRecord(issue)
+
+def compact_all(issues):
+    return [compact(issue) for issue in issues]
+
+def replace(issue, **changes):
+    """Changed copy of a record or a plain dict, keeping its representation."""
+    if isinstance(issue, IssueRecord):
+        return issue.replace(**changes)
+    return dict(issue, **changes)
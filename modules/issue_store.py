@@ -0,0 +1,231 @@
+"""
+Indexed issue store for a session.
+
+Pending issues are kept in a dict keyed by issue_id (insertion ordered) with
+secondary indexes on the fields the app filters and groups by. Every index
+bucket also carries a running diff total, so group summaries (count, total
+diff) are read, not re-summed, on each render. Status
+transitions remove an issue from the pending set and its indexes in O(1) and
+push a completed copy to the front of the history, so bulk actions are
+linear in the number of selected issues instead of quadratic.
+
+Issues handed to the store may be shared with other sessions (see
+dataset_cache); the store never mutates them, completed entries are copies.
+
+Listeners (e.g. insight_engine.InsightEngine) are told about every change
+through issue_added(issue), issue_removed(issue) and store_reset(), so they
+can keep derived state up to date without rescanning.
+
+With a `journal` (decision_journal.DecisionJournal), every decision and every
+locally created issue is also persisted; transition_many writes its batch in
+one transaction, and so does everything done inside `with store.batch():`.
+restore() brings a fresh store back to the journaled state.
+
+A decision hides an issue only while the issue is the one that was decided:
+decisions are matched on decision_key() (id plus employee, type, title and
+diff), so after a data refresh a new issue that reuses an id (mock and ledger
+ids are sequential) shows up again. The completed history, and with it the
+decisions replayed after a restart, keeps the newest HISTORY_LIMIT entries;
+a decision expires when its last history entry does.
+"""
+import contextlib
+import itertools
+from collections import Counter, deque
+
+from modules import instrumentation, issue_record
+
+INDEX_FIELDS = ('type', 'title', 'workplace', 'manager_id', 'special_status', 'event_id')
+# Completed issues kept in a session's history (older decisions expire with them)
+HISTORY_LIMIT = 100000
+# What identifies "the same issue" across dataset reloads
+DECISION_KEY_FIELDS = ('issue_id', 'employee_id', 'type', 'title', 'diff')
+
+def decision_key(issue):
+    """Text key a decision is matched on: the issue id plus the fields that change when the id is reused."""
+    return '\x1f'.join(str(issue.get(field)) for field in DECISION_KEY_FIELDS)
+
+class IssueStore:
+    def __init__(self, issues=(), journal=None):
+        self._pending = {}           # issue_id -> issue
+        self._index = {field: {} for field in INDEX_FIELDS}  # field -> value -> {issue_id: None}
+        self._diff_sum = {field: {} for field in INDEX_FIELDS}  # field -> value -> total diff
+        self._completed = deque(maxlen=HISTORY_LIMIT)  # newest first
+        self._decided = Counter()    # decision_key -> history entries with it, issues hidden on rebase
+        self._local = {}             # issue_id -> issue created in this session (not in the snapshot)
+        self._listeners = []
+        self._journal = journal
+        self.add_many(issues)
+
+    # --- Listeners ---
+    def subscribe(self, listener):
+        """Registers a listener and replays the current pending issues to it."""
+        self._listeners.append(listener)
+        listener.store_reset()
+        for issue in self._pending.values():
+            listener.issue_added(issue)
+
+    # --- Indexing ---
+    # Missing fields are indexed under None so "Unknown" groups are indexed too
+    def _index_add(self, issue):
+        issue_id = issue['issue_id']
+        diff = issue.get('diff', 0) or 0
+        for field in INDEX_FIELDS:
+            value = issue.get(field)
+            self._index[field].setdefault(value, {})[issue_id] = None
+            self._diff_sum[field][value] = self._diff_sum[field].get(value, 0) + diff
+
+    def _index_remove(self, issue):
+        issue_id = issue['issue_id']
+        diff = issue.get('diff', 0) or 0
+        for field in INDEX_FIELDS:
+            value = issue.get(field)
+            bucket = self._index[field].get(value)
+            if bucket is None or issue_id not in bucket:
+                continue
+            del bucket[issue_id]
+            if bucket:
+                self._diff_sum[field][value] -= diff
+            else:
+                del self._index[field][value]
+                del self._diff_sum[field][value]
+
+    # --- Adding ---
+    def add(self, issue, local=False):
+        """Adds (or replaces) a pending issue. local=True marks issues created by this session."""
+        issue_id = issue['issue_id']
+        if issue_id in self._pending:
+            old = self._pending[issue_id]
+            self._index_remove(old)
+            for listener in self._listeners:
+                listener.issue_removed(old)
+        self._pending[issue_id] = issue
+        self._index_add(issue)
+        for listener in self._listeners:
+            listener.issue_added(issue)
+        if local:
+            self._local[issue_id] = issue
+            if self._journal is not None:
+                self._journal.record_local(issue)
+
+    def add_many(self, issues):
+        for issue in issues:
+            self.add(issue)
+
+    @instrumentation.traced('store.rebase')
+    def rebase(self, issues):
+        """
+        Swaps in a new shared issue set (e.g. a new dataset snapshot) and re-applies
+        this session's decisions and locally created issues. History is kept.
+        """
+        self._pending = {}
+        self._index = {field: {} for field in INDEX_FIELDS}
+        self._diff_sum = {field: {} for field in INDEX_FIELDS}
+        for listener in self._listeners:
+            listener.store_reset()
+        decided = self._decided
+        for issue in itertools.chain(issues, self._local.values()):
+            if decision_key(issue) not in decided:
+                self.add(issue)
+
+    # --- Reading ---
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, issue_id):
+        return issue_id in self._pending
+
+    def __iter__(self):
+        return iter(self._pending.values())
+
+    def get(self, issue_id, default=None):
+        return self._pending.get(issue_id, default)
+
+    def pending(self):
+        """All pending issues in insertion order."""
+        return list(self._pending.values())
+
+    def ids_by(self, field, value):
+        return list(self._index[field].get(value, ()))
+
+    def by(self, field, value):
+        """Pending issues whose `field` equals `value` (indexed lookup)."""
+        return [self._pending[i] for i in self._index[field].get(value, ())]
+
+    def count(self, field=None, value=None):
+        if field is None:
+            return len(self._pending)
+        return len(self._index[field].get(value, ()))
+
+    def values(self, field):
+        """Distinct values of an indexed field with their pending counts."""
+        return {value: len(bucket) for value, bucket in self._index[field].items()}
+
+    def summary(self, field, value):
+        """(count, total diff) of one index bucket, maintained incrementally."""
+        return len(self._index[field].get(value, ())), self._diff_sum[field].get(value, 0)
+
+    def completed(self, start=0, stop=None):
+        """Completed issues, newest first; start/stop select one page."""
+        return list(itertools.islice(self._completed, start, stop))
+
+    def completed_count(self):
+        return len(self._completed)
+
+    def decisions(self):
+        """issue_id -> status of the latest decision still in the history."""
+        return {item['issue_id']: item['status'] for item in reversed(self._completed)}
+
+    def batch(self):
+        """Context manager: journal rows recorded inside the block are written in one transaction."""
+        return self._journal.group() if self._journal is not None else contextlib.nullcontext()
+
+    # --- Transitions ---
+    def transition(self, issue_id, status, action_taken):
+        """Moves one pending issue to the completed history. Returns the completed copy (or None)."""
+        done = self._transition(issue_id, status, action_taken)
+        if done is not None and self._journal is not None:
+            self._journal.record([done])
+        return done
+
+    def _transition(self, issue_id, status, action_taken):
+        issue = self._pending.pop(issue_id, None)
+        if issue is None:
+            return None
+        self._index_remove(issue)
+        for listener in self._listeners:
+            listener.issue_removed(issue)
+        done = issue_record.replace(issue, status=status, action_taken=action_taken)
+        if len(self._completed) == self._completed.maxlen:
+            # The oldest entry falls out of the history; its decision goes with it
+            key = decision_key(self._completed[-1])
+            self._decided[key] -= 1
+            if not self._decided[key]:
+                del self._decided[key]
+        self._completed.appendleft(done)
+        self._decided[decision_key(done)] += 1
+        return done
+
+    def transition_many(self, issue_ids, status, action_taken):
+        """Batch transition; ids that are no longer pending are skipped. Returns the completed copies."""
+        done = []
+        for issue_id in issue_ids:
+            item = self._transition(issue_id, status, action_taken)
+            if item is not None:
+                done.append(item)
+        if self._journal is not None:
+            self._journal.record(done)  # group commit: one transaction for the batch
+        return done
+
+    def restore(self, state):
+        """
+        Loads journaled decisions, history and local issues (decision_journal.JournalState).
+        Call before the first rebase(); decided issues are then skipped and local ones re-added.
+        """
+        self._local.update(state.local)
+        self._completed.extendleft(state.completed[-HISTORY_LIMIT:])
+        self._decided = Counter(decision_key(item) for item in self._completed)
+        for issue_id in [i for i, issue in self._pending.items() if decision_key(issue) in self._decided]:
+            issue = self._pending.pop(issue_id)
+            self._index_remove(issue)
+            for listener in self._listeners:
+                listener.issue_removed(issue)
@@ -1,34 +1,62 @@
+import numpy as np
 import pandas as pd
 
-def get_auditor_issues(shadow_ledger_df, hr_master_df):
+from modules import employee_index, instrumentation
+
+def build_auditor_issues(shadow_ledger_df, hr_master_df, name_index=None):
     """
-    Retrieves payroll issues (The Auditor) from the Shadow Ledger.
+    Batched Auditor engine.
+    Joins the pending ledger lines to hr_master once and builds the issue records column-wise.
+    A line re-sent with a known issue_id corrects it: the last line wins, in the first one's place.
+    Pass a prebuilt `name_index` (employee_index.build_name_index) to reuse it across detectors.
     """
-    issues = []
-    
+    if shadow_ledger_df.empty:
+        return []
+    codes, uniques = pd.factorize(shadow_ledger_df['issue_id'])
+    if len(uniques) < len(shadow_ledger_df):
+        last = np.empty(len(uniques), dtype=np.int64)
+        last[codes] = np.arange(len(codes))
+        shadow_ledger_df = shadow_ledger_df.iloc[last]
+
     # Filter for Pending issues
-    pending_issues = shadow_ledger_df[shadow_ledger_df['status'] == 'Pending']
-    
-    for _, row in pending_issues.iterrows():
-        emp_id = row['employee_id']
-        
-        # Get employee name
-        emp_info = hr_master_df[hr_master_df['employee_id'] == emp_id]
-        name = emp_info['name'].values[0] if not emp_info.empty else "Unknown"
-        
-        # Determine color based on diff
-        diff = row['diff']
-        
-        issues.append({
-            'issue_id': row['issue_id'],
+    pending = shadow_ledger_df[shadow_ledger_df['status'] == 'Pending']
+    if pending.empty:
+        return []
+
+    # Single indexed lookup instead of one hr_master scan per ledger line
+    if name_index is None:
+        name_index = employee_index.build_name_index(hr_master_df)
+    names = employee_index.lookup_names(pending['employee_id'], name_index)
+
+    # Column-wise build: one .tolist() per column, then a single zip over rows
+    columns = zip(
+        pending['issue_id'].tolist(),
+        pending['employee_id'].tolist(),
+        names.tolist(),
+        pending['issue_type'].tolist(), # e.g., 소급, 일할
+        pending['diff'].tolist(),
+        pending['logic_text'].tolist()
+    )
+
+    return [
+        {
+            'issue_id': issue_id,
             'type': 'Auditor',
             'employee_id': emp_id,
             'name': name,
-            'title': row['issue_type'], # e.g., 소급, 일할
+            'title': title,
             'diff': diff,
-            'logic_text': row['logic_text'],
+            'logic_text': logic_text,
             'action_label': '다빈치 적용',
             'status': 'Pending'
-        })
-        
-    return issues
+        }
+        for issue_id, emp_id, name, title, diff, logic_text in columns
+    ]
+
+@instrumentation.traced('detect.auditor', count_result=True)
+def get_auditor_issues(shadow_ledger_df, hr_master_df, name_index=None):
+    """
+    Retrieves payroll issues (The Auditor) from the Shadow Ledger.
+    Compatibility wrapper around build_auditor_issues.
+    """
+    return build_auditor_issues(shadow_ledger_df, hr_master_df, name_index)
@@ -1,39 +1,74 @@
-def get_chaser_issues(tna_df, hr_master_df):
+import numpy as np
+import pandas as pd
+
+from modules import employee_index, instrumentation
+
+def format_date_labels(dates):
+    """
+    Formats unique dates as '11월 28일' labels in one bulk call.
+    Accepts datetime64 values or 'YYYY-MM-DD' strings; unparseable values are kept as-is.
+    """
+    parsed = pd.DatetimeIndex(pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce'))
+    labels = parsed.strftime('%m월 %d일')
+    return [label if isinstance(label, str) else str(raw) for label, raw in zip(labels, dates)]
+
+@instrumentation.traced('detect.chaser', count_result=True)
+def get_chaser_issues(tna_df, hr_master_df, name_index=None):
     """
     Identifies attendance issues (The Chaser).
     Logic: Status != 'Approved' (In this mock, we just check for '미마감')
+    Vectorized: dates are factorized and formatted once per distinct day, employees are
+    grouped with a stable sort, and names come from a reusable employee-id index.
     """
+    if tna_df.empty:
+        return []
+
+    # Filter for unapproved records. A re-sent (employee, date) row corrects the earlier one:
+    # its status counts, in the place the day first appeared (as delta_sync applies it).
+    status = tna_df['status']
+    repeated = tna_df.duplicated(['employee_id', 'date'])
+    if repeated.any():
+        status = tna_df.groupby(['employee_id', 'date'], sort=False, observed=True)['status'].transform('last')
+        status = status.where(~repeated)
+    mask = (status == '미마감').to_numpy()
+    if not mask.any():
+        return []
+
+    emp_ids = tna_df['employee_id'].to_numpy()[mask]
+    date_codes, unique_dates = pd.factorize(tna_df['date'].to_numpy()[mask])
+    date_labels = format_date_labels(unique_dates)
+
+    # Group by employee: stable sort keeps the original date order inside each group
+    order = np.argsort(emp_ids, kind='stable')
+    emp_sorted = emp_ids[order]
+    codes_sorted = date_codes[order]
+    starts = np.flatnonzero(np.r_[True, emp_sorted[1:] != emp_sorted[:-1]])
+    ends = np.r_[starts[1:], len(emp_sorted)]
+    group_emp = pd.Series(emp_sorted[starts])
+
+    if name_index is None:
+        name_index = employee_index.build_name_index(hr_master_df)
+    names = employee_index.lookup_names(group_emp, name_index).tolist()
+
     issues = []
-    
-    # Filter for unapproved records
-    unapproved = tna_df[tna_df['status'] == '미마감']
-    
-    # Group by employee to count missing days
-    if not unapproved.empty:
-        # Group by employee and aggregate dates
-        grouped = unapproved.groupby('employee_id')['date'].apply(list).reset_index(name='dates')
-        
-        for _, row in grouped.iterrows():
-            emp_id = row['employee_id']
-            dates = row['dates']
-            count = len(dates)
-            
-            # Format dates (e.g., "11월 28일, 11월 29일")
-            formatted_dates = ", ".join([d.split('-')[1] + "월 " + d.split('-')[2] + "일" for d in dates])
-            
-            # Get employee name
-            emp_info = hr_master_df[hr_master_df['employee_id'] == emp_id]
-            name = emp_info['name'].values[0] if not emp_info.empty else "Unknown"
-            
-            issues.append({
-                'issue_id': f"CHASER-{emp_id}",
-                'type': 'Chaser',
-                'employee_id': emp_id,
-                'name': name,
-                'title': '근태 미마감',
-                'description': f"{formatted_dates} ({count}건) 미마감",
-                'action_label': '발송 승인',
-                'status': 'Pending'
-            })
-            
+    for emp_id, name, start, end in zip(group_emp.tolist(), names, starts.tolist(), ends.tolist()):
+        issues.append(make_chaser_issue(emp_id, name, [date_labels[c] for c in codes_sorted[start:end].tolist()]))
+
     return issues
+
+def make_chaser_issue(emp_id, name, labels):
+    """Builds one Chaser issue from the employee's unapproved date labels."""
+    # Format dates (e.g., "11월 28일, 11월 29일")
+    formatted_dates = ", ".join(labels)
+    count = len(labels)
+
+    return {
+        'issue_id': f"CHASER-{emp_id}",
+        'type': 'Chaser',
+        'employee_id': emp_id,
+        'name': name,
+        'title': '근태 미마감',
+        'description': f"{formatted_dates} ({count}건) 미마감",
+        'action_label': '발송 승인',
+        'status': 'Pending'
+    }
@@ -0,0 +1,148 @@
+"""
+Ghost-shift detection: recorded TNA hours vs. a second time source.
+
+The gate log (access-gate or PC-on swipes: employee_id, event_time, direction
+IN/OUT) is turned into presence intervals: each IN paired with the next OUT
+of the same employee after one sort by (employee, time). Intervals crossing
+midnight are split per day, and presence minutes are summed per
+(employee, day) under a composite int64 key. tna_record rows are then
+matched to those keys with one np.searchsorted (a sorted join, no Python
+loop), and days whose recorded work exceeds the observed presence by more
+than `ghost_shift_tolerance` minutes are flagged.
+
+Employees that never appear in the gate log have no second source and are
+not checked. The gate log is optional: without data/gate_log.csv nothing is
+flagged.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules import config_manager, employee_index, instrumentation
+
+GATE_LOG_FILE = 'gate_log.csv'
+GATE_TIME_FORMAT = '%Y-%m-%d %H:%M'
+GHOST_TITLE = '유령 근무 의심'
+MINUTES_PER_DAY = 24 * 60
+# Composite (employee code, day) key
+DAY_SPAN = 1 << 17
+# Epoch minutes stay below 2^26 until 2097
+MINUTE_BITS = 26
+
+def load_gate_log(data_dir):
+    """The gate log of a data directory, or None when the export has none."""
+    path = os.path.join(data_dir, GATE_LOG_FILE)
+    if not os.path.exists(path):
+        return None
+    gate_log = pd.read_csv(path, dtype={'employee_id': 'int32', 'direction': 'category'})
+    gate_log['event_time'] = pd.to_datetime(gate_log['event_time'], format=GATE_TIME_FORMAT)
+    return gate_log
+
+def presence_intervals(gate_log):
+    """(employee_id, start, end) arrays of IN->OUT intervals sorted by (employee, start), in epoch minutes."""
+    minutes = gate_log['event_time'].to_numpy().astype('datetime64[m]').astype(np.int64)
+    employees = gate_log['employee_id'].to_numpy().astype(np.int64)
+    # One int64 sort key: employee id in the high bits, minute (< 2^MINUTE_BITS) in the low bits
+    order = np.argsort((employees << MINUTE_BITS) + minutes, kind='stable')
+    employees, minutes = employees[order], minutes[order]
+    is_in = (gate_log['direction'] == 'IN').to_numpy()[order]
+    # An interval is an IN immediately followed by an OUT of the same employee
+    opens = np.flatnonzero(is_in[:-1] & ~is_in[1:] & (employees[:-1] == employees[1:]))
+    return employees[opens], minutes[opens], minutes[opens + 1]
+
+def presence_minutes(gate_log):
+    """
+    Presence per (employee, day): (employee ids, sorted keys, minutes). Keys are
+    employee code * DAY_SPAN + day, with codes indexing the returned employee ids.
+    """
+    employees, start, end = presence_intervals(gate_log)
+    # Split intervals at midnight: one piece per calendar day they touch
+    first_day = start // MINUTES_PER_DAY
+    pieces = (end - 1) // MINUTES_PER_DAY - first_day + 1
+    repeat = np.repeat(np.arange(len(start)), pieces)
+    offset = np.arange(len(repeat)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    day = first_day[repeat] + offset
+    overlap = (np.minimum(end[repeat], (day + 1) * MINUTES_PER_DAY)
+               - np.maximum(start[repeat], day * MINUTES_PER_DAY))
+    # Intervals are sorted by (employee, start), so the pieces' keys already come out sorted
+    employees = employees[repeat]
+    new_employee = np.r_[True, employees[1:] != employees[:-1]] if len(employees) else np.zeros(0, dtype=bool)
+    ids = employees[new_employee]
+    keys = (np.cumsum(new_employee) - 1) * DAY_SPAN + day
+    new_key = np.r_[True, keys[1:] != keys[:-1]] if len(keys) else new_employee
+    groups = np.cumsum(new_key) - 1
+    return ids, keys[new_key], np.bincount(groups, weights=overlap, minlength=int(new_key.sum())).astype(np.int64)
+
+def find_ghost_shifts(tna_df, gate_log, tolerance):
+    """
+    TNA days whose recorded minutes exceed gate presence by more than `tolerance` minutes.
+    Returns employee_id, date, recorded_minutes, present_minutes, gap_minutes (TNA row order).
+    """
+    columns = ['employee_id', 'date', 'recorded_minutes', 'present_minutes', 'gap_minutes']
+    if gate_log is None or gate_log.empty or tna_df.empty:
+        return pd.DataFrame(columns=columns)
+    ids, keys, present = presence_minutes(gate_log)
+
+    codes = pd.Index(ids).get_indexer(tna_df['employee_id'].to_numpy())
+    covered = np.flatnonzero(codes >= 0)
+    days = tna_df['date'].to_numpy()[covered].astype('datetime64[D]').astype(np.int64)
+    wanted = codes[covered] * DAY_SPAN + days
+    pos = np.minimum(np.searchsorted(keys, wanted), max(len(keys) - 1, 0))
+    found = keys[pos] == wanted if len(keys) else np.zeros(len(wanted), dtype=bool)
+    present_tna = np.where(found, present[pos], 0)
+
+    recorded = np.round(tna_df['work_hours'].to_numpy(np.float64)[covered] * 60).astype(np.int64)
+    gap = recorded - present_tna
+    flagged = gap > tolerance
+    rows = covered[flagged]
+    return pd.DataFrame({
+        'employee_id': tna_df['employee_id'].to_numpy()[rows],
+        'date': tna_df['date'].to_numpy()[rows],
+        'recorded_minutes': recorded[flagged],
+        'present_minutes': present_tna[flagged],
+        'gap_minutes': gap[flagged]
+    }, columns=columns)
+
+def build_ghost_shift_issues(ghosts, hr_master_df, name_index=None):
+    """One Chaser issue per employee listing the flagged days (employee id order)."""
+    if ghosts.empty:
+        return []
+    ghosts = ghosts.sort_values(['employee_id', 'date'], kind='stable')
+    if name_index is None:
+        name_index = employee_index.build_name_index(hr_master_df)
+    dates = pd.DatetimeIndex(ghosts['date'])
+    details = [f"{month:02d}월 {day:02d}일 (기록 {rec / 60:g}h / 출입 {pre / 60:.1f}h)"
+               for month, day, rec, pre in zip(dates.month.tolist(), dates.day.tolist(),
+                                                ghosts['recorded_minutes'].tolist(), ghosts['present_minutes'].tolist())]
+    emp_ids = ghosts['employee_id'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, emp_ids[1:] != emp_ids[:-1]])
+    ends = np.r_[starts[1:], len(emp_ids)]
+    group_emp = pd.Series(emp_ids[starts])
+    names = employee_index.lookup_names(group_emp, name_index).tolist()
+    return [
+        {
+            'issue_id': f"GHOST-{emp_id}",
+            'type': 'Chaser',
+            'employee_id': emp_id,
+            'name': name,
+            'title': GHOST_TITLE,
+            'description': f"{', '.join(details[start:end])} ({end - start}건) 출입 기록 불일치",
+            'action_label': '발송 승인',
+            'status': 'Pending'
+        }
+        for emp_id, name, start, end in zip(group_emp.tolist(), names, starts.tolist(), ends.tolist())
+    ]
+
+@instrumentation.traced('detect.ghost_shift', count_result=True)
+def get_ghost_shift_issues(tna_df, hr_master_df, data_dir, tolerance=None, name_index=None):
+    """Ghost-shift issues for a data directory's gate log (tolerance defaults to the config value)."""
+    if tolerance is None:
+        tolerance = config_manager.load_config().get('ghost_shift_tolerance',
+                                                     config_manager.DEFAULT_CONFIG['ghost_shift_tolerance'])
+    try:
+        gate_log = load_gate_log(data_dir)
+    except Exception as e:
+        print(f"Error loading gate log: {e}")
+        return []
+    return build_ghost_shift_issues(find_ghost_shifts(tna_df, gate_log, tolerance), hr_master_df, name_index)
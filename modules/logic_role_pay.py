@@ -0,0 +1,100 @@
+"""
+Role-pay mismatch detection: role-bound allowances still paid after a role change.
+
+Every shadow_ledger line that pays a role-bound allowance (ROLE_ALLOWANCES,
+named in its reason or logic_text) is as-of joined against hr_event_log: the
+latest job / position change (ROLE_CHANGE_EVENTS) in force at the end of the
+payroll month is looked up with one np.searchsorted over the event timeline
+(event_timeline.EventTimeline.last_event_rows). The months between that
+change and the payroll month are kept per line, so `zombie_months` is only
+applied at query time (insight_engine.InsightEngine) and a config change
+needs no new join:
+
+    candidates = logic_role_pay.role_pay_candidates(data, timeline)
+    engine = insight_engine.InsightEngine(logic_role_pay.index_by_employee(candidates))
+
+Only lines adding pay (diff > 0) count as "still paid"; a negative line is the
+allowance being stopped. A line is a mismatch once more than `zombie_months`
+months have passed since the change.
+
+The Auditor issues of candidate lines keep their ledger ids through mock
+enrichment (pipeline.build_issues), so the Role-Pay insight's action resolves
+them. The demo data carries one case: employee 1003, moved to an office role
+on 2025-07-01 and still paid 위험수당 in the November ledger (ISSUE-005).
+"""
+import numpy as np
+import pandas as pd
+
+from modules import employee_index, event_timeline, instrumentation, shadow_payroll
+
+# Allowances that belong to a role and should stop when the role changes
+ROLE_ALLOWANCES = ('위험수당', '현장수당', '교대수당', '야간수당', '직책수당', '자격수당')
+# hr_event_log event types that change an employee's job or position
+ROLE_CHANGE_EVENTS = ('직무변경', '보직변경', '근무조 변경')
+ALLOWANCE_PATTERN = f"({'|'.join(ROLE_ALLOWANCES)})"
+
+CANDIDATE_COLUMNS = ['issue_id', 'employee_id', 'name', 'allowance', 'amount', 'change_date', 'change',
+                     'months_since_change']
+
+def _allowance_names(texts):
+    """Role allowance named in each text (object array, NaN if none)."""
+    # Ledger texts repeat heavily: match each distinct text once, then broadcast by code
+    codes, uniques = pd.factorize(texts)
+    names = pd.Series(uniques, dtype=object).astype(str).str.extract(ALLOWANCE_PATTERN, expand=False).to_numpy()
+    return np.where(codes >= 0, names[np.maximum(codes, 0)] if len(names) else np.nan, np.nan).astype(object)
+
+@instrumentation.traced('detect.role_pay', count_result=True)
+def role_pay_candidates(data, timeline=None):
+    """
+    Role-allowance ledger lines of employees with a role change in force by the payroll month end,
+    one row per line: issue_id, employee_id, name, allowance, amount, change_date, change,
+    months_since_change. Pass a prebuilt event_timeline.EventTimeline to reuse it.
+    """
+    ledger = data.get('shadow_ledger', pd.DataFrame())
+    events = data.get('hr_event_log', pd.DataFrame())
+    hr_master = data.get('hr_master', pd.DataFrame())
+    if ledger.empty or events.empty or hr_master.empty:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+
+    # All allowance types in one regex pass; named in reason, else in logic_text
+    allowance = _allowance_names(ledger['reason'])
+    missing = pd.isna(allowance)
+    allowance[missing] = _allowance_names(ledger['logic_text'])[missing]
+    rows = employee_index.employee_rows(hr_master['employee_id'], ledger['employee_id'].to_numpy())
+    lines = np.flatnonzero(pd.notna(allowance) & (ledger['diff'].to_numpy() > 0) & (rows >= 0))
+    if not len(lines):
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+
+    timeline = timeline or event_timeline.build_timeline(data)
+    month_start = shadow_payroll.payroll_month(data)
+    month_end = event_timeline.to_days([month_start + pd.offsets.MonthEnd(0)])[0]
+    pos = timeline.last_event_rows(rows[lines], np.full(len(lines), month_end), ROLE_CHANGE_EVENTS)
+    changed = pos >= 0
+    lines, pos = lines[changed], pos[changed]
+
+    change_date = timeline.effective[pos].astype('datetime64[D]')
+    months = shadow_payroll.month_number([month_start])[0] - shadow_payroll.month_number(change_date)
+    employee_ids = ledger['employee_id'].to_numpy()[lines]
+    names = employee_index.lookup_names(pd.Series(employee_ids), employee_index.build_name_index(hr_master))
+    return pd.DataFrame({
+        'issue_id': ledger['issue_id'].to_numpy()[lines],
+        'employee_id': employee_ids,
+        'name': names.to_numpy(),
+        'allowance': allowance[lines],
+        'amount': ledger['diff'].to_numpy()[lines],
+        'change_date': change_date,
+        'change': events['description'].to_numpy()[timeline.source[pos]],
+        'months_since_change': months
+    }, columns=CANDIDATE_COLUMNS)
+
+def index_by_employee(candidates):
+    """{employee_id: [candidate dict, ...]} in ledger order, for per-employee lookups in the insight panel."""
+    index = {}
+    if candidates.empty:
+        return index
+    keys = [column for column in CANDIDATE_COLUMNS if column != 'employee_id']
+    change_dates = pd.DatetimeIndex(candidates['change_date']).strftime('%Y-%m-%d').tolist()
+    columns = [candidates[key].tolist() if key != 'change_date' else change_dates for key in keys]
+    for emp_id, values in zip(candidates['employee_id'].tolist(), zip(*columns)):
+        index.setdefault(emp_id, []).append(dict(zip(keys, values)))
+    return index
@@ -0,0 +1,207 @@
+"""
+Headless detection pipeline.
+
+Runs the whole detection pass without Streamlit (load tables, Chaser / Auditor /
+Welfare / ghost-shift detection, mock enrichment and insights) and writes the result to a
+snapshot file, so a batch job (e.g. the nightly 3am sync) can precompute it
+and the UI only has to load it:
+
+    python -m modules.pipeline                    # data/ -> data/.cache/issue_snapshot.pkl
+    python -m modules.pipeline --data-dir /tmp/w1k --out /tmp/w1k.pkl
+    python -m modules.pipeline --partition-by workplace --workers 8   # see partitioned
+    python -m modules.pipeline --check-insights   # also verify every insight's action clears it
+
+A snapshot records the fingerprint of the CSVs (and detection config) it was
+built from; load_snapshot() ignores it once any of them change (see
+dataset_cache.acquire).
+"""
+import os
+import pickle
+import time
+
+from modules import (config_manager, data_loader, data_store, employee_index, insight_engine, instrumentation,
+                     issue_record, logic_chaser, logic_auditor, logic_ghost_shift, logic_role_pay, logic_welfare,
+                     issue_store, mock_generator, partitioned)
+
+DATA_DIR = data_loader.DATA_DIR
+SNAPSHOT_FILE = 'issue_snapshot.pkl'
+# Bump when the snapshot layout or issue dict shape changes
+SNAPSHOT_FORMAT = 4
+
+# Config keys read at detection time: changing one makes existing snapshots stale
+DETECTION_CONFIG_KEYS = ('ghost_shift_tolerance',)
+
+# Optimized for Demo: Reduced scale to 50 issues (approx 400 employees) for speed
+MOCK_TARGET_COUNT = 50
+# Fixed so a rebuild from unchanged data yields the same issues (journaled decisions match on content)
+MOCK_SEED = 0
+
+def snapshot_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, data_store.CACHE_DIR_NAME, SNAPSHOT_FILE)
+
+def detection_config():
+    """Config values detection depends on, as a hashable tuple (part of the data fingerprint)."""
+    config = config_manager.load_config()
+    return tuple((key, config.get(key, config_manager.DEFAULT_CONFIG[key])) for key in DETECTION_CONFIG_KEYS)
+
+def data_fingerprint(data_dir=DATA_DIR):
+    """
+    (name, mtime_ns, size) for every source CSV in data/, plus the detection config.
+    Cheap enough to check every rerun.
+    """
+    entries = []
+    try:
+        for entry in os.scandir(data_dir):
+            if entry.is_file() and entry.name.endswith('.csv'):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        pass
+    return (('config',) + detection_config(),) + tuple(sorted(entries))
+
+@instrumentation.traced('dataset.build_issues', count_result=True)
+def build_issues(data, data_dir=DATA_DIR, target_count=MOCK_TARGET_COUNT, partition_by=None, max_workers=None,
+                 role_pay=None, detected=None):
+    """
+    Runs Chaser, Auditor, Welfare and ghost-shift detection plus mock enrichment on loaded tables.
+    With `partition_by` ('company' or 'workplace'), detection runs per shard on a process
+    pool (see partitioned); the merged issue list is identical to the single-process one.
+    `role_pay` (logic_role_pay.role_pay_candidates) is computed here when not given.
+    `detected` (Chaser + Auditor issues kept up to date by delta_sync) replaces those two detectors.
+    """
+    if detected is not None:
+        all_issues = list(detected) + logic_welfare.get_welfare_issues(data_dir)
+    elif partition_by:
+        try:
+            welfare_df = logic_welfare.load_welfare_claims(data_dir)
+        except Exception as e:
+            print(f"Error loading welfare claims: {e}")
+            welfare_df = None
+        all_issues = partitioned.detect_issues(data, welfare_df, partition_by, max_workers)
+    else:
+        # Generate initial issues (one employee-id index shared by both detectors)
+        name_index = employee_index.build_name_index(data['hr_master'])
+        chaser_issues = logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'], name_index)
+        auditor_issues = logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'], name_index)
+        welfare_issues = logic_welfare.get_welfare_issues(data_dir)
+
+        all_issues = chaser_issues + auditor_issues + welfare_issues
+
+    # Ghost shifts join TNA against the whole gate log (optional file), outside the partitions.
+    # They point at the employee whose gate log / TNA rows triggered them, so enrichment keeps them as detected.
+    ghost_issues = logic_ghost_shift.get_ghost_shift_issues(data['tna_record'], data['hr_master'], data_dir)
+
+    # The Auditor issues of role-pay ledger lines keep their ledger ids: the Role-Pay insight acts on them
+    if role_pay is None:
+        role_pay = logic_role_pay.role_pay_candidates(data)
+    role_pay_ids = set(role_pay['issue_id'].tolist())
+    role_pay_issues = [issue for issue in all_issues if issue['issue_id'] in role_pay_ids]
+    if role_pay_issues:
+        all_issues = [issue for issue in all_issues if issue['issue_id'] not in role_pay_ids]
+
+    # --- Mock Data Enrichment for Melzi 2.0 (Refactored) ---
+    issues = mock_generator.generate_mock_data(all_issues, target_count=target_count, seed=MOCK_SEED,
+                                               preserved=role_pay_issues + ghost_issues)
+    # Shared snapshot issues are kept as compact records (see issue_record)
+    return issue_record.compact_all(issues)
+
+def run_pipeline(data_dir=DATA_DIR, target_count=MOCK_TARGET_COUNT, partition_by=None, max_workers=None):
+    """
+    Full detection pass. Returns the snapshot dict:
+    {'format', 'fingerprint', 'created_at', 'build_seconds', 'issues', 'insights'}.
+    The fingerprint is taken before loading, so a CSV rewritten mid-run makes the snapshot stale.
+    """
+    start = time.perf_counter()
+    fingerprint = data_fingerprint(data_dir)
+    data = data_loader.load_data(data_dir=data_dir)
+    role_pay = logic_role_pay.role_pay_candidates(data)
+    issues = build_issues(data, data_dir, target_count, partition_by, max_workers, role_pay)
+    insights = insight_engine.detect_insights(issues, logic_role_pay.index_by_employee(role_pay))
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'fingerprint': fingerprint,
+        'created_at': time.time(),
+        'build_seconds': time.perf_counter() - start,
+        'issues': issues,
+        'insights': insights
+    }
+
+def check_insight_actions(issues, role_pay=None):
+    """
+    Runs every insight's action on a fresh IssueStore (its issue_ids moved to completed) and
+    returns the titles of insights the action does not clear: nothing was transitioned, or an
+    insight still lists one of the acted-on ids afterwards.
+    """
+    store = issue_store.IssueStore(issues)
+    engine = insight_engine.InsightEngine(role_pay)
+    store.subscribe(engine)
+    stuck = []
+    for insight in engine.insights():
+        acted = set(insight['issue_ids'])
+        done = store.transition_many(insight['issue_ids'], 'Resolved', insight['action'])
+        if not done or any(acted.intersection(other['issue_ids']) for other in engine.insights()):
+            stuck.append(insight['title'])
+    return stuck
+
+def write_snapshot(snapshot, path):
+    """Writes atomically (temp file + rename) so readers never see a partial snapshot."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+def load_snapshot(data_dir=DATA_DIR, path=None, fingerprint=None):
+    """
+    Returns the precomputed snapshot dict if it exists and matches the current CSVs
+    (or the given `fingerprint`), else None.
+    """
+    path = path or snapshot_path(data_dir)
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        print(f"Error loading issue snapshot: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    if fingerprint is None:
+        fingerprint = data_fingerprint(data_dir)
+    if snapshot.get('fingerprint') != fingerprint:
+        return None
+    return snapshot
+
+if __name__ == '__main__':
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="Headless detection pipeline (writes an issue/insight snapshot)")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--out', default=None, help="Snapshot path (default: <data-dir>/.cache/issue_snapshot.pkl)")
+    parser.add_argument('--target-count', type=int, default=MOCK_TARGET_COUNT)
+    parser.add_argument('--partition-by', choices=partitioned.PARTITION_FIELDS, default=None,
+                        help="Detect per company/workplace shard on a process pool")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument('--check-insights', action='store_true',
+                        help="Exit 1 unless every insight's action clears it on the built issues")
+    args = parser.parse_args()
+
+    snapshot = run_pipeline(args.data_dir, args.target_count, args.partition_by, args.workers)
+    path = write_snapshot(snapshot, args.out or snapshot_path(args.data_dir))
+    by_type = Counter(issue['type'] for issue in snapshot['issues'])
+    print(f"issues: {len(snapshot['issues']):,} ({', '.join(f'{t} {n:,}' for t, n in sorted(by_type.items()))})")
+    for insight in snapshot['insights']:
+        print(f"insight: {insight['title']}")
+    print(f"wrote {path} ({snapshot['build_seconds']:.3f}s)")
+    if args.check_insights:
+        data = data_loader.load_data(data_dir=args.data_dir)
+        role_pay = logic_role_pay.index_by_employee(logic_role_pay.role_pay_candidates(data))
+        stuck = check_insight_actions(snapshot['issues'], role_pay)
+        for title in stuck:
+            print(f"insight action does not clear: {title}")
+        if stuck:
+            raise SystemExit(1)
+        print(f"insight actions: {len(snapshot['insights'])} checked, all clear")
@@ -0,0 +1,255 @@
+"""
+Shadow payroll engine: recomputes Melzi's side of the shadow ledger and
+checks it against what Davinci actually calculated.
+
+shadow_ledger.csv carries Davinci's figure per employee and item
+(davinci_calc, on the base_salary basis). This engine recomputes Melzi's
+figure for the same items, column-wise for the whole company:
+
+    Melzi (per item)        base_salary + the item's adjustment for the payroll month
+                            일할  proration: days not active this month (입사/퇴사/휴직/복직)
+                            소급  promotion raise for the months before it was entered
+                            (both are as-of joins on event_timeline.EventTimeline)
+                            수당  family allowance for 가족수당 events
+                            근태  overtime: hours over DAILY_HOURS in tna_record
+
+Each adjustment is joined to the ledger row of the same employee and item
+(the n-th 소급 line of an employee to its n-th 소급 ledger row), so
+diff = melzi_calc - davinci_calc is measured against Davinci's real number.
+Items Davinci has no row for count as paid at base_salary; ledger rows
+Melzi has no adjustment for are checked against base_salary. Only non-zero
+diffs become ledger lines, in the shadow_ledger.csv schema, so
+build_ledger() output can replace the precomputed file in the nightly run:
+
+    python -m modules.shadow_payroll                          # summary for data/
+    python -m modules.shadow_payroll --data-dir /tmp/melzi_30k --out /tmp/shadow_ledger.csv
+
+Allowances without a rate table (shift / role allowances) are not priced.
+"""
+import numpy as np
+import pandas as pd
+
+from modules import config_manager, employee_index, event_timeline, instrumentation
+
+# Statutory monthly hours (40h/week incl. paid weekly holiday) for min wage and hourly rate
+STANDARD_MONTHLY_HOURS = 209
+DAILY_HOURS = 8
+FAMILY_EVENT = '가족수당'
+
+LEDGER_COLUMNS = ['issue_id', 'employee_id', 'issue_type', 'melzi_calc', 'davinci_calc', 'diff', 'logic_text',
+                  'status', 'reason']
+# Ledger line kind -> (issue_type, issue id suffix)
+LINE_KINDS = {'proration': ('일할', 'P'), 'retro': ('소급', 'R'), 'family': ('수당', 'F'), 'overtime': ('근태', 'O')}
+ISSUE_SUFFIX = {issue_type: suffix for issue_type, suffix in LINE_KINDS.values()}
+# Join key between recomputed lines and Davinci's ledger rows
+LEDGER_KEY = ['employee_id', 'issue_type', 'ordinal']
+
+def payroll_month(data):
+    """First day of the month being paid: the TNA month, else the latest HR event's month."""
+    tna = data.get('tna_record', pd.DataFrame())
+    events = data.get('hr_event_log', pd.DataFrame())
+    if not tna.empty:
+        latest = pd.Timestamp(tna['date'].max())
+    elif not events.empty:
+        latest = pd.Timestamp(events['event_date'].max())
+    else:
+        latest = pd.Timestamp.today()
+    return latest.normalize().replace(day=1)
+
+def month_number(dates):
+    """year * 12 + month, for month arithmetic on arrays of dates."""
+    dates = pd.DatetimeIndex(dates)
+    return dates.year.to_numpy(np.int64) * 12 + dates.month.to_numpy(np.int64)
+
+def overtime_hours(hr_master, tna):
+    """Overtime hours per hr_master row (0 for employees without TNA rows)."""
+    hours = np.zeros(len(hr_master))
+    if tna.empty or 'work_hours' not in tna.columns:
+        return hours
+    over = np.clip(tna['work_hours'].to_numpy(np.float64) - DAILY_HOURS, 0, None)
+    rows = employee_index.employee_rows(hr_master['employee_id'], tna['employee_id'].to_numpy())
+    known = rows >= 0
+    return np.bincount(rows[known], weights=over[known], minlength=len(hr_master))
+
+def _event_rows(events, hr_master):
+    """hr_master row of every event (-1 for unknown employees)."""
+    return employee_index.employee_rows(hr_master['employee_id'], events['employee_id'].to_numpy())
+
+def _proration(timeline, base_salary, month_start):
+    """(row, diff, description) for employees not active the whole payroll month (timeline as-of join)."""
+    paid, days, last_event = timeline.paid_days(month_start)
+    rows = np.flatnonzero(paid != days)
+    salary = base_salary[rows]
+    diff = np.round(salary * paid[rows] / days).astype(np.int64) - salary
+    pos = last_event[rows]
+    safe = np.maximum(pos, 0)
+    changed = pd.DatetimeIndex(timeline.effective[safe].astype('datetime64[D]'))
+    # No status event in force yet (hired after the month): label with the status instead
+    _, status = timeline.as_of_rows(rows, np.full(len(rows), event_timeline.to_days([month_start])[0]))
+    labels = [f"{kind} {m}/{d} 기준 일할 계산 ({n}/{days}일)" if p >= 0
+              else f"{event_timeline.STATUS_LABELS[st]} 기간 일할 계산 ({n}/{days}일)"
+              for p, kind, m, d, n, st in zip(pos.tolist(), timeline.event_type[safe].tolist(), changed.month.tolist(),
+                                              changed.day.tolist(), paid[rows].tolist(), status.tolist())]
+    return rows, diff, labels
+
+def _retro(timeline, month_start):
+    """(row, diff, description) of salary changes entered this month for periods already paid."""
+    pos, rows, delta, periods = timeline.retro_deltas(month_start)
+    effective = pd.DatetimeIndex(timeline.effective[pos].astype('datetime64[D]'))
+    labels = [f"{m}월 {d}일부 승진 인상분 소급 ({n}개월)"
+              for m, d, n in zip(effective.month.tolist(), effective.day.tolist(), periods.tolist())]
+    return rows, delta * periods, labels
+
+def _family(events, rows, per_person, month_start):
+    """(row, diff, description) of family allowance additions effective in the payroll month."""
+    effective = pd.DatetimeIndex(events['effective_date'])
+    mask = ((events['event_type'] == FAMILY_EVENT).to_numpy() & (rows >= 0)
+            & (month_number(effective) == month_number([month_start])[0]))
+    labels = [f"{description}에 따른 가족수당 추가" for description in events['description'].to_numpy()[mask].tolist()]
+    return rows[mask], np.full(int(mask.sum()), per_person, dtype=np.int64), labels
+
+@instrumentation.traced('payroll.calculate')
+def calculate(data, config=None, timeline=None):
+    """
+    Per-employee base salary and Melzi adjustment lines for the payroll month.
+    Returns (employees, lines): employees has one row per hr_master row with base_salary and
+    the summed adjustment; lines has one row per non-zero adjustment (row, kind, diff, logic_text).
+    Pass a prebuilt event_timeline.EventTimeline to reuse it.
+    """
+    config = config or config_manager.load_config()
+    defaults = config_manager.DEFAULT_CONFIG
+    per_person = config.get('family_allowance_per_person', defaults['family_allowance_per_person'])
+    overtime_rate = config.get('overtime_rate', defaults['overtime_rate'])
+    raise_rate = config.get('promotion_raise_rate', defaults['promotion_raise_rate'])
+
+    hr_master = data.get('hr_master', pd.DataFrame())
+    if hr_master.empty:
+        return pd.DataFrame(columns=['employee_id', 'base_salary', 'adjustment']), \
+            pd.DataFrame(columns=['row', 'kind', 'diff', 'logic_text'])
+    month_start = payroll_month(data)
+    base_salary = hr_master['base_salary'].to_numpy(np.int64, na_value=0)
+
+    parts = []
+    events = data.get('hr_event_log', pd.DataFrame())
+    if not events.empty:
+        timeline = timeline or event_timeline.build_timeline(data, raise_rate)
+        parts.append(('proration',) + _proration(timeline, base_salary, month_start))
+        parts.append(('retro',) + _retro(timeline, month_start))
+        parts.append(('family',) + _family(events, _event_rows(events, hr_master), per_person, month_start))
+
+    ot_hours = overtime_hours(hr_master, data.get('tna_record', pd.DataFrame()))
+    ot_rows = np.flatnonzero(ot_hours > 0)
+    ot_pay = np.round(ot_hours[ot_rows] * base_salary[ot_rows] / STANDARD_MONTHLY_HOURS * overtime_rate).astype(np.int64)
+    parts.append(('overtime', ot_rows, ot_pay,
+                  [f"초과근무 {h:g}시간 × 통상시급 × {overtime_rate:g}배" for h in ot_hours[ot_rows].tolist()]))
+
+    lines = pd.DataFrame({
+        'row': np.concatenate([part[1] for part in parts]).astype(np.int64),
+        'kind': np.concatenate([np.full(len(part[1]), part[0], dtype=object) for part in parts]),
+        'diff': np.concatenate([part[2] for part in parts]).astype(np.int64),
+        'logic_text': [label for part in parts for label in part[3]]
+    })
+    lines = lines[lines['diff'].to_numpy() != 0].reset_index(drop=True)
+
+    adjustment = np.bincount(lines['row'].to_numpy(), weights=lines['diff'].to_numpy(), minlength=len(hr_master))
+    employees = pd.DataFrame({
+        'employee_id': hr_master['employee_id'].to_numpy(),
+        'base_salary': base_salary,
+        'adjustment': adjustment.astype(np.int64)
+    })
+    return employees, lines
+
+def _with_ordinal(frame):
+    """frame plus the running number of each (employee_id, issue_type) pair, in row order."""
+    frame = frame.copy()
+    frame['ordinal'] = frame.groupby(['employee_id', 'issue_type'], sort=False).cumcount().to_numpy()
+    return frame
+
+def _davinci_rows(ledger, employees):
+    """Davinci's figure per (employee_id, issue_type, ordinal) for employees in hr_master."""
+    if ledger.empty:
+        return pd.DataFrame({'employee_id': employees['employee_id'].iloc[:0], 'issue_type': pd.Series(dtype=object),
+                             'ordinal': pd.Series(dtype=np.int64), 'davinci_calc': pd.Series(dtype=np.int64),
+                             'base_salary': pd.Series(dtype=np.int64)})
+    rows = employee_index.employee_rows(employees['employee_id'], ledger['employee_id'].to_numpy())
+    known = rows >= 0
+    davinci = _with_ordinal(pd.DataFrame({
+        'employee_id': ledger['employee_id'].to_numpy()[known],
+        'issue_type': ledger['issue_type'].astype(object).to_numpy()[known],
+        'davinci_calc': ledger['davinci_calc'].to_numpy(np.int64)[known]
+    }))
+    davinci['base_salary'] = employees['base_salary'].to_numpy()[rows[known]]
+    return davinci
+
+def build_ledger(data, config=None):
+    """
+    Shadow ledger lines (shadow_ledger.csv schema, all Pending) wherever Melzi's recomputed
+    figure differs from the davinci_calc of the matching shadow_ledger row.
+    """
+    employees, lines = calculate(data, config)
+    rows = lines['row'].to_numpy()
+    kinds = lines['kind'].map(lambda kind: LINE_KINDS[kind])
+    computed = _with_ordinal(pd.DataFrame({
+        'employee_id': employees['employee_id'].to_numpy()[rows],
+        'issue_type': np.array([issue_type for issue_type, _ in kinds], dtype=object),
+        'adjustment': lines['diff'].to_numpy(),
+        'logic_text': lines['logic_text'].to_numpy(),
+        'base_salary': employees['base_salary'].to_numpy()[rows]
+    }))
+    davinci = _davinci_rows(data.get('shadow_ledger', pd.DataFrame()), employees)
+
+    # Recomputed items against Davinci's row for the same item (none: Davinci paid base_salary) ...
+    matched = computed.merge(davinci[LEDGER_KEY + ['davinci_calc']], on=LEDGER_KEY, how='left')
+    matched['davinci_calc'] = matched['davinci_calc'].fillna(matched['base_salary']).astype(np.int64)
+    # ... then Davinci's items Melzi computed no adjustment for
+    unmatched = davinci.merge(computed[LEDGER_KEY], on=LEDGER_KEY, how='left', indicator=True)
+    unmatched = unmatched[unmatched['_merge'].to_numpy() == 'left_only'].drop(columns='_merge')
+    unmatched['adjustment'] = np.zeros(len(unmatched), dtype=np.int64)
+    unmatched['logic_text'] = [f"재계산 기준 {issue_type} 조정 없음 (기본급 기준)"
+                               for issue_type in unmatched['issue_type'].tolist()]
+
+    joined = pd.concat([matched, unmatched[matched.columns]], ignore_index=True)
+    melzi = joined['base_salary'].to_numpy(np.int64) + joined['adjustment'].to_numpy(np.int64)
+    davinci_calc = joined['davinci_calc'].to_numpy(np.int64)
+    differs = melzi != davinci_calc
+    if not differs.any():
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+    joined = joined[differs]
+    employee_id = joined['employee_id'].to_numpy()
+    issue_type = joined['issue_type'].tolist()
+    # Deterministic ids: the same month recomputed tomorrow yields the same issue ids
+    return pd.DataFrame({
+        'issue_id': [f"CALC-{emp}-{ISSUE_SUFFIX.get(kind, 'L')}{n}"
+                     for emp, kind, n in zip(employee_id.tolist(), issue_type, joined['ordinal'].tolist())],
+        'employee_id': employee_id,
+        'issue_type': issue_type,
+        'melzi_calc': melzi[differs],
+        'davinci_calc': davinci_calc[differs],
+        'diff': melzi[differs] - davinci_calc[differs],
+        'logic_text': joined['logic_text'].to_numpy(),
+        'status': 'Pending',
+        'reason': ''
+    })[LEDGER_COLUMNS]
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from modules import data_loader
+
+    parser = argparse.ArgumentParser(description="Recompute the shadow ledger from hr_master, hr_event_log and tna_record")
+    parser.add_argument('--data-dir', default=data_loader.DATA_DIR)
+    parser.add_argument('--out', default=None, help="Write the recomputed ledger CSV here")
+    args = parser.parse_args()
+
+    data = data_loader.load_data(data_dir=args.data_dir)
+    start = time.perf_counter()
+    ledger = build_ledger(data)
+    seconds = time.perf_counter() - start
+    print(f"{len(data['hr_master']):,} employees, payroll month {payroll_month(data):%Y-%m}: "
+          f"{len(ledger):,} ledger lines in {seconds:.2f}s")
+    for issue_type, group in ledger.groupby('issue_type', observed=True):
+        print(f"  {issue_type:<6}{len(group):>10,} lines {group['diff'].sum():>+18,} won")
+    if args.out:
+        ledger.to_csv(args.out, index=False)
+        print(f"ledger -> {args.out}")
@@ -0,0 +1,121 @@
+"""
+What-if impact simulation for the admin config (no Streamlit imports).
+
+prepare() reduces the loaded tables to one row per employee (base salary,
+family count, overtime hours) plus the role changes and per-manager Chaser
+counts the thresholds apply to. evaluate() then applies a config to the
+whole population with numpy array arithmetic only, so comparing a draft
+with the current config takes milliseconds and can run on every slider
+change; prepare() is the only pass over the raw tables.
+
+Payroll model (per employee, per month):
+    base pay    = max(base_salary, min_wage * STANDARD_MONTHLY_HOURS)
+    overtime    = hours over DAILY_HOURS * (base pay / STANDARD_MONTHLY_HOURS) * overtime_rate
+    family      = family_count * family_allowance_per_person
+    meal        = MEAL_ALLOWANCE, of which the part over meal_tax_free_limit is taxable
+
+    base = simulation.prepare(data, store.by('type', 'Chaser'), pending=store)
+    result = simulation.simulate(base, current_config, draft_config)
+"""
+import numpy as np
+import pandas as pd
+
+from modules import config_manager, instrumentation, logic_role_pay, shadow_payroll
+
+STANDARD_MONTHLY_HOURS = shadow_payroll.STANDARD_MONTHLY_HOURS
+DAILY_HOURS = shadow_payroll.DAILY_HOURS
+# Flat monthly meal allowance paid to every employee
+MEAL_ALLOWANCE = 200000
+
+# Config keys the simulation reads (others, e.g. the message template, have no payroll impact)
+SIMULATED_KEYS = ('min_wage', 'overtime_rate', 'meal_tax_free_limit', 'family_allowance_per_person',
+                  'bottleneck_limit', 'zombie_months')
+
+class SimulationBase:
+    """Per-employee arrays evaluate() works on. Treat as read-only."""
+    __slots__ = ('employees', 'base_salary', 'family_count', 'ot_hours', 'role_change_months', 'manager_chasers')
+
+    def __init__(self, base_salary, family_count, ot_hours, role_change_months, manager_chasers):
+        self.employees = len(base_salary)
+        self.base_salary = base_salary              # int64, won
+        self.family_count = family_count            # int64
+        self.ot_hours = ot_hours                    # float64, hours over DAILY_HOURS this month
+        self.role_change_months = role_change_months  # int64, months since the role change, per role allowance line
+        self.manager_chasers = manager_chasers      # int64, pending Chaser issues per manager
+
+def _role_change_months(data, timeline=None, pending=None):
+    """
+    Months since the role change behind each role allowance still paid (see logic_role_pay).
+    With `pending` (issue ids, e.g. the IssueStore), only lines whose issue is still pending
+    count, the same lines the insight engine flags.
+    """
+    candidates = logic_role_pay.role_pay_candidates(data, timeline)
+    if pending is not None:
+        candidates = candidates[[issue_id in pending for issue_id in candidates['issue_id'].tolist()]]
+    return candidates['months_since_change'].to_numpy(np.int64)
+
+def manager_chaser_counts(chaser_issues):
+    """Pending Chaser issues per manager (the input of the bottleneck threshold)."""
+    managers = pd.Series([issue.get('manager_id', 'Unknown') for issue in chaser_issues], dtype=object)
+    return managers.value_counts().to_numpy(np.int64)
+
+@instrumentation.traced('simulation.prepare')
+def prepare(data, chaser_issues=(), timeline=None, pending=None):
+    """
+    SimulationBase for the loaded tables and the currently pending Chaser issues.
+    Pass the IssueStore as `pending` so decided role-pay lines are not counted, and a
+    prebuilt event_timeline.EventTimeline to reuse it.
+    """
+    hr_master = data.get('hr_master', pd.DataFrame())
+    if hr_master.empty:
+        empty = np.zeros(0, dtype=np.int64)
+        return SimulationBase(empty, empty, np.zeros(0), _role_change_months(data, timeline, pending),
+                              manager_chaser_counts(chaser_issues))
+    return SimulationBase(
+        hr_master['base_salary'].to_numpy(np.int64, na_value=0),
+        hr_master['family_count'].to_numpy(np.int64, na_value=0),
+        shadow_payroll.overtime_hours(hr_master, data.get('tna_record', pd.DataFrame())),
+        _role_change_months(data, timeline, pending),
+        manager_chaser_counts(chaser_issues)
+    )
+
+def evaluate(base, config):
+    """Payroll totals (won) and config-driven issue counts for one config."""
+    defaults = config_manager.DEFAULT_CONFIG
+    get = lambda key: config.get(key, defaults[key])
+
+    min_monthly = get('min_wage') * STANDARD_MONTHLY_HOURS
+    base_pay = np.maximum(base.base_salary, min_monthly)
+    overtime = base.ot_hours * (base_pay / STANDARD_MONTHLY_HOURS) * get('overtime_rate')
+    family = base.family_count * get('family_allowance_per_person')
+    meal_taxable = max(MEAL_ALLOWANCE - get('meal_tax_free_limit'), 0) * base.employees
+
+    totals = {
+        'base_pay': int(base_pay.sum()),
+        'overtime_pay': int(round(overtime.sum())),
+        'family_allowance': int(family.sum()),
+        'meal_allowance': MEAL_ALLOWANCE * base.employees,
+    }
+    payroll = sum(totals.values())
+    return dict(totals, payroll=payroll, taxable_meal=meal_taxable, issues={
+        'min_wage': int(np.count_nonzero(base.base_salary < min_monthly)),
+        'role_pay_mismatch': int(np.count_nonzero(base.role_change_months > get('zombie_months'))),
+        'bottleneck': int(np.count_nonzero(base.manager_chasers >= get('bottleneck_limit')))
+    })
+
+@instrumentation.traced('simulation.simulate')
+def simulate(base, current_config, draft_config):
+    """Draft vs current: both evaluations plus the payroll and issue-count deltas."""
+    current = evaluate(base, current_config)
+    draft = evaluate(base, draft_config)
+    delta = draft['payroll'] - current['payroll']
+    return {
+        'employees': base.employees,
+        'current': current,
+        'draft': draft,
+        'payroll_delta': delta,
+        'payroll_delta_pct': delta / current['payroll'] if current['payroll'] else 0.0,
+        'issues_current': sum(current['issues'].values()),
+        'issues_draft': sum(draft['issues'].values()),
+        'issue_deltas': {kind: draft['issues'][kind] - current['issues'][kind] for kind in current['issues']}
+    }
@@ -0,0 +1,342 @@
+"""
+SQLite-backed issue store (optional backend, MELZI_ISSUE_BACKEND=sqlite).
+
+Same interface as issue_store.IssueStore, plus grouped summaries and
+impact-ordered pages for the Pivot View (wrapped by grouping.SqlPivot). Issues
+and completed actions live in an embedded SQLite database with indexes on
+(status, type / title / workplace / manager_id / special_status / event_id)
+and on impact order, so tab counts, metric cards, group summaries and every
+page of a group or of the completed history are indexed queries instead of
+scans over the full Python list.
+
+Each issue row keeps its indexed fields as columns and the full dict as a
+pickled payload; only the rows of the visible page are unpickled. Listeners
+and the decision journal are notified exactly as with IssueStore, and
+decisions hide issues by issue_store.decision_key() with the completed
+history capped at issue_store.HISTORY_LIMIT rows.
+"""
+import contextlib
+import itertools
+import pickle
+import sqlite3
+
+from modules import instrumentation, issue_record
+from modules.issue_store import HISTORY_LIMIT, INDEX_FIELDS, decision_key
+
+SCHEMA = """
+CREATE TABLE issues (
+    seq INTEGER PRIMARY KEY,         -- arrival order
+    issue_id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,            -- 'Pending' until a decision moves it to completed
+    type TEXT, title TEXT, workplace TEXT, manager_id TEXT, special_status TEXT, event_id TEXT,
+    diff INTEGER NOT NULL,
+    abs_diff INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+-- Arrival order of each group's first issue (the Pivot View group order)
+CREATE TABLE group_order (
+    field TEXT NOT NULL,
+    value TEXT,
+    first_seq INTEGER NOT NULL,
+    UNIQUE (field, value)
+);
+CREATE TABLE completed (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,   -- newest = highest
+    issue_id TEXT NOT NULL,
+    decision_key TEXT NOT NULL,              -- issue_store.decision_key(): what a rebase hides
+    type TEXT,
+    status TEXT NOT NULL,
+    action_taken TEXT,
+    payload BLOB NOT NULL
+);
+CREATE INDEX completed_issue_id ON completed (issue_id);
+CREATE INDEX completed_decision_key ON completed (decision_key);
+CREATE TABLE local (
+    issue_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL
+);
+"""
+
+# (status, field) first for counts and filters, then impact order for pages;
+# diff makes group summaries index-only scans
+ISSUE_INDEXES = {
+    'issues_type': "(status, type, abs_diff DESC, seq, diff)",
+    'issues_title': "(status, title)",
+    'issues_workplace': "(status, workplace, abs_diff DESC, seq, diff)",
+    'issues_manager_id': "(status, manager_id)",
+    'issues_special_status': "(status, special_status, abs_diff DESC, seq, diff)",
+    'issues_event_id': "(status, event_id, abs_diff DESC, seq, diff)"
+}
+
+PENDING = 'Pending'
+# SQLite's default limit on bound parameters per statement is 999
+_CHUNK = 500
+
+def _dumps(issue):
+    return pickle.dumps(issue, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _column(value):
+    """Indexed column value: None stays NULL, everything else is stored as text."""
+    return None if value is None else str(value)
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), _CHUNK):
+        yield items[start:start + _CHUNK]
+
+class SqlIssueStore:
+    def __init__(self, issues=(), journal=None, path=':memory:'):
+        # One connection per session store; Streamlit may run successive reruns on different threads
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self._create_indexes()
+        self._arrival = itertools.count(1)
+        self._listeners = []
+        self._journal = journal
+        self.add_many(issues)
+
+    # --- Listeners ---
+    def subscribe(self, listener):
+        """Registers a listener and replays the current pending issues to it."""
+        self._listeners.append(listener)
+        listener.store_reset()
+        for issue in self.pending():
+            listener.issue_added(issue)
+
+    def _create_indexes(self):
+        for name, columns in ISSUE_INDEXES.items():
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON issues {columns}")
+
+    def _drop_indexes(self):
+        for name in ISSUE_INDEXES:
+            self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # --- Adding ---
+    def _row(self, issue):
+        diff = int(issue.get('diff', 0) or 0)
+        return (next(self._arrival), str(issue['issue_id']), PENDING,
+                *(_column(issue.get(field)) for field in INDEX_FIELDS), diff, abs(diff), _dumps(issue))
+
+    def _insert(self, issues):
+        """Adds or replaces issues (pending again) in one transaction, then notifies listeners."""
+        if not issues:
+            return
+        # Bulk load into an empty table: building the indexes afterwards is about twice as fast
+        bulk = len(issues) > _CHUNK and self._conn.execute("SELECT 1 FROM issues LIMIT 1").fetchone() is None
+        replaced = {} if bulk else self._fetch_pending([issue['issue_id'] for issue in issues])
+        self._conn.execute("BEGIN")
+        if bulk:
+            self._drop_indexes()
+        rows = [self._row(issue) for issue in issues]
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO issues (seq, issue_id, status, {', '.join(INDEX_FIELDS)}, diff, abs_diff, payload) "
+            f"VALUES ({', '.join('?' * (6 + len(INDEX_FIELDS)))})", rows)
+        if bulk:
+            self._create_indexes()
+        # First arrival per (field, value); NULLs are distinct in UNIQUE, so they are checked explicitly
+        firsts = {}
+        for row in rows:
+            for position, field in enumerate(INDEX_FIELDS, start=3):
+                firsts.setdefault((field, row[position]), row[0])
+        self._conn.executemany(
+            "INSERT INTO group_order (field, value, first_seq) SELECT ?, ?, ? "
+            "WHERE NOT EXISTS (SELECT 1 FROM group_order WHERE field = ? AND value IS ?)",
+            [(field, value, seq, field, value) for (field, value), seq in firsts.items()])
+        self._conn.execute("COMMIT")
+        for listener in self._listeners:
+            for old in replaced.values():
+                listener.issue_removed(old)
+            for issue in issues:
+                listener.issue_added(issue)
+
+    def add(self, issue, local=False):
+        """Adds (or replaces) a pending issue. local=True marks issues created by this session."""
+        self._insert([issue])
+        if local:
+            self._conn.execute("INSERT OR REPLACE INTO local (issue_id, payload) VALUES (?, ?)",
+                               (str(issue['issue_id']), _dumps(issue)))
+            if self._journal is not None:
+                self._journal.record_local(issue)
+
+    def add_many(self, issues):
+        # Duplicate ids inside one batch: the last one wins, as with repeated add()
+        self._insert(list({issue['issue_id']: issue for issue in issues}.values()))
+
+    @instrumentation.traced('store.rebase')
+    def rebase(self, issues):
+        """
+        Swaps in a new shared issue set (e.g. a new dataset snapshot) and re-applies
+        this session's decisions and locally created issues. History is kept.
+        """
+        self._conn.execute("DELETE FROM issues")
+        self._conn.execute("DELETE FROM group_order")
+        for listener in self._listeners:
+            listener.store_reset()
+        decided = {row[0] for row in self._conn.execute("SELECT DISTINCT decision_key FROM completed")}
+        local = [pickle.loads(row[0]) for row in self._conn.execute("SELECT payload FROM local ORDER BY rowid")]
+        self.add_many([issue for issue in itertools.chain(issues, local) if decision_key(issue) not in decided])
+
+    # --- Reading ---
+    def _fetch_pending(self, issue_ids):
+        """issue_id -> pending issue for the given ids (missing ids are left out)."""
+        found = {}
+        for chunk in _chunks(str(i) for i in issue_ids):
+            rows = self._conn.execute(
+                f"SELECT payload FROM issues WHERE status = ? AND issue_id IN ({', '.join('?' * len(chunk))})",
+                (PENDING, *chunk))
+            for (payload,) in rows:
+                issue = pickle.loads(payload)
+                found[issue['issue_id']] = issue
+        return found
+
+    def _load(self, sql, params=()):
+        return [pickle.loads(row[0]) for row in self._conn.execute(sql, params)]
+
+    def __len__(self):
+        return self.count()
+
+    def __contains__(self, issue_id):
+        return self._conn.execute("SELECT 1 FROM issues WHERE status = ? AND issue_id = ?",
+                                  (PENDING, str(issue_id))).fetchone() is not None
+
+    def __iter__(self):
+        return iter(self.pending())
+
+    def get(self, issue_id, default=None):
+        return self._fetch_pending([issue_id]).get(issue_id, default)
+
+    def pending(self):
+        """All pending issues in insertion order."""
+        return self._load("SELECT payload FROM issues WHERE status = ? ORDER BY seq", (PENDING,))
+
+    def ids_by(self, field, value):
+        self._check_field(field)
+        return [row[0] for row in self._conn.execute(
+            f"SELECT issue_id FROM issues WHERE status = ? AND {field} IS ? ORDER BY seq", (PENDING, _column(value)))]
+
+    def by(self, field, value):
+        """Pending issues whose `field` equals `value` (indexed lookup)."""
+        self._check_field(field)
+        return self._load(f"SELECT payload FROM issues WHERE status = ? AND {field} IS ? ORDER BY seq",
+                          (PENDING, _column(value)))
+
+    def count(self, field=None, value=None):
+        if field is None:
+            return self._conn.execute("SELECT COUNT(*) FROM issues WHERE status = ?", (PENDING,)).fetchone()[0]
+        self._check_field(field)
+        return self._conn.execute(f"SELECT COUNT(*) FROM issues WHERE status = ? AND {field} IS ?",
+                                  (PENDING, _column(value))).fetchone()[0]
+
+    def values(self, field):
+        """Distinct values of an indexed field with their pending counts."""
+        self._check_field(field)
+        return dict(self._conn.execute(
+            f"SELECT {field}, COUNT(*) FROM issues WHERE status = ? GROUP BY {field} ORDER BY MIN(seq)", (PENDING,)))
+
+    def summary(self, field, value):
+        """(count, total diff) of one index bucket."""
+        self._check_field(field)
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(diff), 0) FROM issues WHERE status = ? AND {field} IS ?",
+            (PENDING, _column(value))).fetchone()
+        return count, total
+
+    def completed(self, start=0, stop=None):
+        """Completed issues, newest first; start/stop select one page."""
+        limit = -1 if stop is None else max(0, stop - start)
+        return self._load("SELECT payload FROM completed ORDER BY seq DESC LIMIT ? OFFSET ?", (limit, start))
+
+    def completed_count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+    def decisions(self):
+        return dict(self._conn.execute("SELECT issue_id, status FROM completed ORDER BY seq"))
+
+    def batch(self):
+        """Context manager: journal rows recorded inside the block are written in one transaction."""
+        return self._journal.group() if self._journal is not None else contextlib.nullcontext()
+
+    @staticmethod
+    def _check_field(field):
+        # Field names are interpolated into SQL, so only the known columns are accepted
+        if field not in INDEX_FIELDS:
+            raise KeyError(field)
+
+    # --- Pivot View (see grouping.SqlPivot) ---
+    def group_summaries(self, field):
+        """
+        (value, count, total diff) per value of `field` with pending issues. Groups keep the
+        order in which their first issue arrived, even after that issue is decided.
+        """
+        self._check_field(field)
+        summaries = self._conn.execute(
+            f"SELECT {field}, COUNT(*), COALESCE(SUM(diff), 0) FROM issues WHERE status = ? GROUP BY {field}",
+            (PENDING,)).fetchall()
+        order = {value: seq for value, seq in self._conn.execute(
+            "SELECT value, first_seq FROM group_order WHERE field = ?", (field,))}
+        return sorted(summaries, key=lambda row: order.get(row[0], 0))
+
+    def by_impact(self, field, values, start=0, stop=None):
+        """Pending issues with `field` in `values`, largest |diff| first; start/stop become LIMIT/OFFSET."""
+        self._check_field(field)
+        values = list(values)
+        if not values:
+            return []
+        clauses = ' OR '.join(f"{field} IS ?" for _ in values)
+        limit = -1 if stop is None else max(0, stop - start)
+        return self._load(
+            f"SELECT payload FROM issues WHERE status = ? AND ({clauses}) "
+            f"ORDER BY abs_diff DESC, seq LIMIT ? OFFSET ?", (PENDING, *[_column(v) for v in values], limit, start))
+
+    # --- Transitions ---
+    def transition(self, issue_id, status, action_taken):
+        """Moves one pending issue to the completed history. Returns the completed copy (or None)."""
+        done = self.transition_many([issue_id], status, action_taken)
+        return done[0] if done else None
+
+    def transition_many(self, issue_ids, status, action_taken):
+        """Batch transition in one transaction; ids that are no longer pending are skipped."""
+        found = self._fetch_pending(issue_ids)
+        issues = [found[i] for i in dict.fromkeys(issue_ids) if i in found]
+        if not issues:
+            return []
+        done = [issue_record.replace(issue, status=status, action_taken=action_taken) for issue in issues]
+        self._conn.execute("BEGIN")
+        self._conn.executemany("UPDATE issues SET status = ? WHERE issue_id = ?",
+                               [(status, str(issue['issue_id'])) for issue in issues])
+        self._insert_completed(done)
+        self._conn.execute("COMMIT")
+        for listener in self._listeners:
+            for issue in issues:
+                listener.issue_removed(issue)
+        if self._journal is not None:
+            self._journal.record(done)  # group commit: one transaction for the batch
+        return done
+
+    def _insert_completed(self, done):
+        """Appends completed copies and drops history beyond HISTORY_LIMIT. Caller holds a transaction."""
+        self._conn.executemany(
+            "INSERT INTO completed (issue_id, decision_key, type, status, action_taken, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            [(str(item['issue_id']), decision_key(item), _column(item.get('type')), item.get('status'),
+              item.get('action_taken'), _dumps(item)) for item in done])
+        self._conn.execute("DELETE FROM completed WHERE seq <= (SELECT MAX(seq) FROM completed) - ?", (HISTORY_LIMIT,))
+
+    def restore(self, state):
+        """
+        Loads journaled decisions, history and local issues (decision_journal.JournalState).
+        Call before the first rebase(); decided issues are then skipped and local ones re-added.
+        """
+        completed = state.completed[-HISTORY_LIMIT:]
+        self._conn.execute("BEGIN")
+        self._insert_completed(completed)
+        self._conn.executemany("INSERT OR REPLACE INTO local (issue_id, payload) VALUES (?, ?)",
+                               [(str(issue_id), _dumps(issue)) for issue_id, issue in state.local.items()])
+        self._conn.execute("COMMIT")
+        keys = {decision_key(item) for item in completed}
+        decided = {issue_id: issue for issue_id, issue in self._fetch_pending({item['issue_id'] for item in completed}).items()
+                   if decision_key(issue) in keys}
+        if decided:
+            self._conn.executemany("DELETE FROM issues WHERE issue_id = ?", [(str(i),) for i in decided])
+            for listener in self._listeners:
+                for issue in decided.values():
+                    listener.issue_removed(issue)
@@ -0,0 +1,165 @@
+"""
+Streaming chunked ingestion for HRIS exports larger than RAM.
+
+tna_record.csv and shadow_ledger.csv are read in bounded chunks. Each chunk
+goes through the same filter the detectors apply (Chaser: status == '미마감',
+Auditor: status == 'Pending') and only the pending subset is kept, already
+in its categorical dtypes. Chunk size is derived from a memory ceiling: a
+parsed chunk gets CHUNK_BUDGET_SHARE of it and the retained rows of both
+tables share the rest (RetainedBudget); exceeding it raises MemoryError
+instead of swapping the server to death.
+
+This is the CLI / batch path (and data_loader.load_data(streaming=True)).
+The app does not use it: its snapshot tables come from delta_sync, and the
+timeline, ghost-shift and role-pay detectors need the full tables, not just
+the pending rows.
+
+Usage:
+    python -m modules.stream_ingest --memory-limit-mb 256
+"""
+import os
+
+import pandas as pd
+
+from modules import data_store
+
+DATA_DIR = data_store.DATA_DIR
+
+# table -> status value the detector keeps
+PENDING_FILTERS = {
+    'tna_record': '미마감',
+    'shadow_ledger': 'Pending'
+}
+
+DEFAULT_MEMORY_LIMIT_MB = 512
+SAMPLE_ROWS = 2000
+
+# Share of the ceiling a single parsed chunk may use; the rest holds retained rows
+CHUNK_BUDGET_SHARE = 0.25
+
+def _stream_dtypes(table):
+    """Schema dtypes with categoricals read as plain values; categories are set per retained chunk."""
+    return {col: ('object' if dtype == 'category' else dtype)
+            for col, dtype in data_store.SCHEMAS[table]['dtypes'].items()}
+
+def estimate_row_bytes(path, table, sample_rows=SAMPLE_ROWS):
+    """In-memory bytes per parsed row, measured on the head of the file."""
+    sample = pd.read_csv(path, nrows=sample_rows, dtype=_stream_dtypes(table))
+    if sample.empty:
+        return 1
+    return max(1, int(sample.memory_usage(deep=True).sum() / len(sample)))
+
+def chunk_budget_bytes(memory_limit_mb):
+    return int(memory_limit_mb * 1024 * 1024 * CHUNK_BUDGET_SHARE)
+
+def chunk_rows_for(path, table, memory_limit_mb):
+    return max(1000, int(chunk_budget_bytes(memory_limit_mb) / estimate_row_bytes(path, table)))
+
+class RetainedBudget:
+    """
+    Bytes of retained rows every streamed table of one load may hold together: the ceiling
+    minus one chunk. The final concat of a table may also use the chunk's share (no chunk is
+    parsed by then), so retained rows plus that copy stay under the ceiling.
+    """
+
+    def __init__(self, memory_limit_mb):
+        self.memory_limit_mb = memory_limit_mb
+        self.limit_bytes = memory_limit_mb * 1024 * 1024
+        self.retained_limit_bytes = self.limit_bytes - chunk_budget_bytes(memory_limit_mb)
+        self.used_bytes = 0
+
+    def charge(self, table, nbytes, rows_read):
+        self.used_bytes += nbytes
+        if self.used_bytes > self.retained_limit_bytes:
+            raise MemoryError(
+                f"{table}: pending rows ({self.used_bytes / 1024 / 1024:,.1f}MB across tables after "
+                f"{rows_read:,} rows) exceed their {self.retained_limit_bytes / 1024 / 1024:,.1f}MB share "
+                f"of the {self.memory_limit_mb}MB ceiling")
+
+    def check_concat(self, table, nbytes):
+        """The final concat copies `nbytes` of retained rows once more."""
+        if self.used_bytes + nbytes > self.limit_bytes:
+            raise MemoryError(
+                f"{table}: combining {nbytes / 1024 / 1024:,.1f}MB of pending rows would exceed "
+                f"the {self.memory_limit_mb}MB ceiling")
+
+def stream_pending(table, data_dir=DATA_DIR, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                   chunk_rows=None, on_progress=None, budget=None):
+    """
+    Reads `table` chunk by chunk and returns only the rows the detector needs.
+    Retained rows are charged to `budget` (a RetainedBudget shared by every table of one load;
+    a new one for `memory_limit_mb` if not given) and stored with their categorical dtypes.
+    on_progress(table, bytes_read, total_bytes, rows_read, rows_kept) is called after every chunk.
+    """
+    path = os.path.join(data_dir, f"{table}.csv")
+    pending_value = PENDING_FILTERS[table]
+    schema = data_store.SCHEMAS[table]
+    total_bytes = os.path.getsize(path)
+    budget = budget or RetainedBudget(memory_limit_mb)
+    categoricals = [col for col, dtype in schema['dtypes'].items() if dtype == 'category']
+
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for(path, table, memory_limit_mb)
+
+    kept = []
+    kept_bytes = 0
+    rows_read = 0
+    rows_kept = 0
+
+    with open(path, 'rb') as f:
+        reader = pd.read_csv(f, chunksize=chunk_rows, dtype=_stream_dtypes(table),
+                             parse_dates=schema['dates'] or False)
+        for chunk in reader:
+            rows_read += len(chunk)
+            pending = chunk[chunk['status'] == pending_value]
+            if not pending.empty:
+                # Categorical before retaining: repeated labels are stored once per chunk
+                pending = pending.astype({col: 'category' for col in categoricals if col in pending.columns})
+                nbytes = int(pending.memory_usage(deep=True).sum())
+                budget.charge(table, nbytes, rows_read)
+                kept.append(pending)
+                rows_kept += len(pending)
+                kept_bytes += nbytes
+
+            if on_progress:
+                # f.tell() runs slightly ahead of the parser (read buffer), good enough for progress
+                on_progress(table, min(f.tell(), total_bytes), total_bytes, rows_read, rows_kept)
+
+    if not kept:
+        return pd.read_csv(path, nrows=0, dtype=schema['dtypes'], parse_dates=schema['dates'] or False)
+
+    # One category set per column, so the concat stays categorical; chunks are recoded one at a time
+    dtypes = {col: pd.CategoricalDtype(sorted(set().union(*(part[col].cat.categories for part in kept))))
+              for col in categoricals if col in kept[0].columns}
+    for i, part in enumerate(kept):
+        kept[i] = part.astype(dtypes)
+    budget.check_concat(table, kept_bytes)
+    return pd.concat(kept, ignore_index=True)
+
+def load_data_streaming(data_dir=DATA_DIR, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, on_progress=None):
+    """
+    Same shape as data_loader.load_data, but tna_record and shadow_ledger only hold their
+    pending subset, charged to one shared RetainedBudget. The small dimension tables still
+    go through the typed cache.
+    """
+    data = data_store.load_tables(data_dir, tables=['hr_master', 'hr_event_log'])
+    budget = RetainedBudget(memory_limit_mb)
+    for table in PENDING_FILTERS:
+        data[table] = stream_pending(table, data_dir, memory_limit_mb, on_progress=on_progress, budget=budget)
+    return data
+
+def print_progress(table, bytes_read, total_bytes, rows_read, rows_kept):
+    pct = 100.0 * bytes_read / total_bytes if total_bytes else 100.0
+    print(f"{table:<15}{pct:6.1f}%  {rows_read:>14,} rows read  {rows_kept:>12,} kept", flush=True)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream large HRIS exports through the pending filters")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--memory-limit-mb', type=int, default=DEFAULT_MEMORY_LIMIT_MB)
+    args = parser.parse_args()
+
+    data = load_data_streaming(args.data_dir, args.memory_limit_mb, on_progress=print_progress)
+    for name, df in data.items():
+        print(f"{name:<15}{len(df):>12,} rows  {df.memory_usage(deep=True).sum() / 1024 / 1024:>8.1f}MB")
@@ -0,0 +1,277 @@
+"""
+Seeded, vectorized synthetic workload generator.
+
+Builds production-scale hr_master, hr_event_log, tna_record, shadow_ledger
+and welfare_claims tables (1k - 1M employees) with numpy, so fixtures for
+load tests and benchmarks take seconds and the same seed always gives the
+same tables. The demo scenarios are kept:
+
+    - special-status mix (중도입사/중도퇴사/휴직/복직/근무형태 변경, ~30%)
+    - a forced approval bottleneck (대전 / 박지점장 collects the 미마감 days)
+    - role-pay mismatch (사무직 발령 but 위험수당 still paid)
+    - unplanned overtime (OT hours without a work plan)
+    - optional gate log with ghost shifts (generate_gate_log, --gate-log)
+
+Usage:
+    python -m modules.workload_generator --employees 100000 --seed 42 --out /tmp/melzi_100k
+    python -m modules.workload_generator --employees 30000 --gate-log --out /tmp/melzi_30k
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import mock_generator
+
+MONTH = '2025-11'
+
+POSITIONS = np.array(['사원', '대리', '과장', '차장', '부장'])
+POSITION_WEIGHTS = [0.45, 0.25, 0.15, 0.10, 0.05]
+POSITION_BASE = np.array([3000000, 3800000, 4800000, 5800000, 7000000])
+
+COMPANIES = np.array(['PNS', '제지', '홈데코', '로지스틱스'])
+COMPANY_WEIGHTS = [0.4, 0.3, 0.2, 0.1]
+
+# Same distribution as mock_generator: '일반' is most common
+SPECIAL_STATUSES = np.array(['중도입사자', '중도퇴사자', '휴직자', '복직자', '근무형태 변경자', '일반 (특이사항 없음)'])
+SPECIAL_STATUS_WEIGHTS = [0.05, 0.05, 0.05, 0.05, 0.10, 0.70]
+
+# special status -> (event_type, description, effective day, ledger issue_type, diff range in 10k won)
+STATUS_EVENTS = {
+    '중도입사자': ('입사', '신규 입사', 15, '일할', (120, 180)),
+    '중도퇴사자': ('퇴사', '중도 퇴사', 20, '일할', (-80, -30)),
+    '휴직자': ('휴직', '휴직 발령', 1, '일할', (-350, -250)),
+    '복직자': ('복직', '복직 발령', 10, '일할', (200, 280)),
+    '근무형태 변경자': ('근무조 변경', '3교대 -> 주간 근무 변경', 1, '수당', (-20, -10))
+}
+
+WELFARE_TREATMENTS = [
+    # treatment, verdict, reason, policy, amount range in 1k won
+    ('도수치료', 'Reject', '규정 외 항목 (도수치료)', '제12조 3항 (지원제외항목)', (80, 200)),
+    ('내과진료', 'Approve', '적격 항목 (급여성 진료)', '제10조 (의료비 지원)', (20, 80)),
+    ('치과치료', 'Approve', '적격 항목 (보존 치료)', '제10조 (의료비 지원)', (50, 300)),
+    ('피부미용', 'Reject', '규정 외 항목 (미용 목적)', '제12조 2항 (지원제외항목)', (100, 400))
+]
+
+PROMOTION_RATE = 0.03
+FAMILY_EVENT_RATE = 0.02
+ROLE_PAY_RATE = 0.005
+UNPLANNED_OT_RATE = 0.005
+WELFARE_RATE = 0.01
+UNAPPROVED_RATE = 0.005
+BOTTLENECK_UNAPPROVED_RATE = 0.05
+LEDGER_APPLIED_RATE = 0.1
+GHOST_SHIFT_RATE = 0.002
+
+def _at_least_one(mask, rng):
+    """Forces one True so every scenario appears even in tiny workloads."""
+    if not mask.any() and len(mask):
+        mask[rng.integers(len(mask))] = True
+    return mask
+
+def _month_day(day):
+    return f"{MONTH}-{day:02d}"
+
+def generate_workload(employees, seed=0, month=MONTH):
+    """Returns {table_name: DataFrame} for a synthetic company of `employees` people."""
+    rng = np.random.default_rng(seed)
+    n = employees
+    month_start = pd.Timestamp(f"{month}-01")
+
+    # --- hr_master ---
+    emp_ids = np.arange(1000, 1000 + n, dtype=np.int32)
+    names = (pd.Series(np.array(mock_generator.LAST_NAMES)[rng.integers(0, len(mock_generator.LAST_NAMES), n)])
+             + pd.Series(np.array(mock_generator.FIRST_NAMES)[rng.integers(0, len(mock_generator.FIRST_NAMES), n)]))
+    position_idx = rng.choice(len(POSITIONS), n, p=POSITION_WEIGHTS)
+    base_salary = POSITION_BASE[position_idx] + rng.integers(0, 50, n) * 10000
+    workplaces = np.array(mock_generator.WORKPLACES)[rng.integers(0, len(mock_generator.WORKPLACES), n)]
+    special = SPECIAL_STATUSES[rng.choice(len(SPECIAL_STATUSES), n, p=SPECIAL_STATUS_WEIGHTS)]
+
+    hr_master = pd.DataFrame({
+        'employee_id': emp_ids,
+        'name': names.to_numpy(),
+        'position': POSITIONS[position_idx],
+        'base_salary': base_salary,
+        'family_count': rng.integers(0, 5, n),
+        'company': COMPANIES[rng.choice(len(COMPANIES), n, p=COMPANY_WEIGHTS)],
+        'workplace': workplaces,
+        'manager_id': pd.Series(workplaces).map(mock_generator.MANAGERS).to_numpy(),
+        'special_status': special
+    })
+
+    events = []
+    ledger = []
+
+    # --- Special-status events and their ledger lines ---
+    for status, (event_type, description, day, issue_type, (lo, hi)) in STATUS_EVENTS.items():
+        idx = np.flatnonzero(special == status)
+        if not len(idx):
+            continue
+        date = _month_day(day)
+        events.append(pd.DataFrame({
+            'employee_id': emp_ids[idx], 'event_date': date, 'effective_date': date,
+            'event_type': event_type, 'description': description
+        }))
+        diff = rng.integers(lo, hi + 1, len(idx)) * 10000
+        ledger.append(pd.DataFrame({
+            'employee_id': emp_ids[idx], 'issue_type': issue_type,
+            'davinci_calc': base_salary[idx], 'diff': diff,
+            'logic_text': f"{description}({date[5:].replace('-', '/')}) 기준 급여 재계산", 'reason': ''
+        }))
+
+    general = special == '일반 (특이사항 없음)'
+
+    # --- Late-entered promotions (소급): effective 10/1, entered 11/15 ---
+    idx = np.flatnonzero(_at_least_one(general & (rng.random(n) < PROMOTION_RATE), rng))
+    events.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'event_date': _month_day(15), 'effective_date': f"{(month_start - pd.DateOffset(months=1)):%Y-%m}-01",
+        'event_type': '승진', 'description': '정기 승진 (소급)'
+    }))
+    ledger.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'issue_type': '소급', 'davinci_calc': base_salary[idx],
+        'diff': rng.integers(30, 60, len(idx)) * 10000,
+        'logic_text': '10월 1일부 승진으로 인한 기본급 인상분 소급 적용 (10월 급여 차액)', 'reason': ''
+    }))
+
+    # --- Family allowance events ---
+    idx = np.flatnonzero(general & (rng.random(n) < FAMILY_EVENT_RATE))
+    events.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'event_date': _month_day(1), 'effective_date': _month_day(1),
+        'event_type': '가족수당', 'description': '자녀 출산'
+    }))
+    ledger.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'issue_type': '수당', 'davinci_calc': base_salary[idx],
+        'diff': 100000, 'logic_text': '자녀 출산으로 인한 가족수당 추가', 'reason': ''
+    }))
+
+    # --- Role-pay mismatch: moved to an office role months ago, 위험수당 still paid ---
+    idx = np.flatnonzero(_at_least_one(general & (rng.random(n) < ROLE_PAY_RATE), rng))
+    change_date = f"{(month_start - pd.DateOffset(months=4)):%Y-%m}-01"
+    events.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'event_date': change_date, 'effective_date': change_date,
+        'event_type': '직무변경', 'description': '현장직 -> 사무직 발령'
+    }))
+    ledger.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'issue_type': '수당', 'davinci_calc': base_salary[idx],
+        'diff': 150000, 'logic_text': '사무직 발령 후에도 위험수당이 계속 지급되고 있습니다.',
+        'reason': '위험수당 (Role-Pay Mismatch)'
+    }))
+
+    # --- Unplanned OT: overtime recorded without a work plan ---
+    ot_mask = _at_least_one(general & (rng.random(n) < UNPLANNED_OT_RATE), rng)
+    idx = np.flatnonzero(ot_mask)
+    ledger.append(pd.DataFrame({
+        'employee_id': emp_ids[idx], 'issue_type': '근태', 'davinci_calc': base_salary[idx],
+        'diff': 85000, 'logic_text': '사전 업무 계획 없이 4시간의 초과근무가 기록되었습니다.',
+        'reason': '계획되지 않은 초과근무 (Unplanned OT)'
+    }))
+
+    hr_event_log = pd.concat(events, ignore_index=True)
+
+    shadow_ledger = pd.concat(ledger, ignore_index=True)
+    shadow_ledger.insert(0, 'issue_id', [f"ISSUE-{k:07d}" for k in range(1, len(shadow_ledger) + 1)])
+    shadow_ledger['melzi_calc'] = shadow_ledger['davinci_calc'] + shadow_ledger['diff']
+    shadow_ledger['status'] = np.where(rng.random(len(shadow_ledger)) < LEDGER_APPLIED_RATE, 'Applied', 'Pending')
+    shadow_ledger = shadow_ledger[['issue_id', 'employee_id', 'issue_type', 'melzi_calc', 'davinci_calc',
+                                   'diff', 'logic_text', 'status', 'reason']]
+
+    # --- tna_record: employees x business days ---
+    days = pd.bdate_range(month_start, month_start + pd.offsets.MonthEnd(0)).strftime('%Y-%m-%d').to_numpy()
+    rows = n * len(days)
+    # Forced bottleneck: 대전 (박지점장) employees leave far more days unapproved
+    unapproved_rate = np.where(workplaces == '대전', BOTTLENECK_UNAPPROVED_RATE, UNAPPROVED_RATE)
+    unapproved = rng.random(rows) < np.repeat(unapproved_rate, len(days))
+    work_hours = np.full(rows, 8.0, dtype=np.float32)
+    # Unplanned OT employees: 4 extra hours on one day
+    work_hours[np.flatnonzero(ot_mask) * len(days) + rng.integers(0, len(days), ot_mask.sum())] = 12.0
+    # Categorical codes keep the (employees x days) table cheap to build
+    tna_record = pd.DataFrame({
+        'employee_id': np.repeat(emp_ids, len(days)),
+        'date': pd.Categorical.from_codes(np.tile(np.arange(len(days), dtype=np.int8), n), days),
+        'status': pd.Categorical.from_codes(unapproved.astype(np.int8), ['승인', '미마감']),
+        'work_hours': work_hours
+    })
+
+    # --- welfare_claims ---
+    idx = np.flatnonzero(_at_least_one(rng.random(n) < WELFARE_RATE, rng))
+    kind = rng.integers(0, len(WELFARE_TREATMENTS), len(idx))
+    treatments = [WELFARE_TREATMENTS[k] for k in kind.tolist()]
+    amounts = np.array([rng.integers(t[4][0], t[4][1] + 1) * 1000 for t in treatments], dtype=np.int64)
+    welfare_claims = pd.DataFrame({
+        'claim_id': [f"CLM-{k:07d}" for k in range(1, len(idx) + 1)],
+        'employee_id': emp_ids[idx],
+        'name': hr_master['name'].to_numpy()[idx],
+        'treatment_type': [t[0] for t in treatments],
+        'amount': amounts,
+        # Stored with literal "\n" like the source export (logic_welfare unescapes it)
+        'receipt_items': [f"[영수증]\\n- 진찰료: 10,000\\n- {t[0]}: {a - 10000:,}" for t, a in zip(treatments, amounts.tolist())],
+        'ai_verdict': [t[1] for t in treatments],
+        'ai_reason': [t[2] for t in treatments],
+        'policy_ref': [t[3] for t in treatments],
+        'status': 'Pending'
+    })
+
+    return {
+        'hr_master': hr_master,
+        'hr_event_log': hr_event_log,
+        'tna_record': tna_record,
+        'shadow_ledger': shadow_ledger,
+        'welfare_claims': welfare_claims
+    }
+
+def generate_gate_log(tna_record, seed=0, ghost_rate=GHOST_SHIFT_RATE):
+    """
+    Minute-level gate swipes for every TNA day: IN, lunch OUT/IN, OUT around a 09:00-18:00 day.
+    On ghost days (ghost_rate of them) the employee leaves after 1-3 hours while TNA still
+    records the full shift, so logic_ghost_shift flags them.
+    """
+    rng = np.random.default_rng(seed)
+    rows = len(tna_record)
+    day_start = tna_record['date'].to_numpy().astype('datetime64[D]').astype('datetime64[m]')
+    arrive = 9 * 60 + rng.integers(-20, 10, rows)
+    lunch_out = 12 * 60 + rng.integers(0, 10, rows)
+    lunch_in = lunch_out + 50 + rng.integers(0, 15, rows)
+    leave = np.maximum(arrive + np.round(tna_record['work_hours'].to_numpy(np.float64) * 60).astype(np.int64) + 60,
+                       lunch_in + 30) + rng.integers(0, 20, rows)
+    ghost = rng.random(rows) < ghost_rate
+    # Ghost days: one short visit, no lunch swipes
+    lunch_out = np.where(ghost, arrive + rng.integers(60, 180, rows), lunch_out)
+    swipes = np.stack([arrive, lunch_out, lunch_in, leave], axis=1)
+    keep = np.ones((rows, 4), dtype=bool)
+    keep[ghost, 2:] = False
+    kept = keep.ravel()
+    minutes = (day_start[:, None] + swipes.astype('timedelta64[m]')).ravel()[kept]
+    return pd.DataFrame({
+        'employee_id': np.repeat(tna_record['employee_id'].to_numpy(), 4)[kept],
+        'event_time': pd.Series(np.datetime_as_string(minutes, unit='m')).str.replace('T', ' ', regex=False),
+        'direction': np.tile(np.array(['IN', 'OUT', 'IN', 'OUT']), rows)[kept]
+    })
+
+def write_workload(tables, out_dir):
+    """Writes the tables as CSVs in the data/ layout (load_data / load_tables can read them)."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in tables.items():
+        df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic Melzi workload")
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help="Output directory for the CSVs")
+    parser.add_argument('--gate-log', action='store_true', help="Also write gate_log.csv (minute-level swipes)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = generate_workload(args.employees, args.seed)
+    if args.gate_log:
+        tables['gate_log'] = generate_gate_log(tables['tna_record'], args.seed)
+    generated = time.perf_counter() - start
+    write_workload(tables, args.out)
+    written = time.perf_counter() - start - generated
+
+    for name, df in tables.items():
+        print(f"{name:<15}{len(df):>14,} rows")
+    print(f"generated in {generated:.2f}s, written in {written:.2f}s -> {args.out}")
@@ -0,0 +1,36 @@
+import sqlite3
+
+from modules import batch_executor
+
+
+class FlakyBackend:
+    """Fails the first `failures` calls with `error`, then succeeds."""
+
+    def __init__(self, error, failures=1):
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+
+    def update_davinci(self, issue):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return {'issue_id': issue['issue_id']}
+
+
+def _run(backend):
+    return batch_executor.run_batch([{'issue_id': 'ISSUE-1', 'type': 'Auditor'}], backend, backoff=0)[0]
+
+
+def test_transient_errors_are_retried():
+    for error in (batch_executor.BackendError('timeout'), sqlite3.OperationalError('database is locked'),
+                  ConnectionResetError('reset')):
+        result = _run(FlakyBackend(error))
+        assert result['ok'] and result['attempts'] == 2
+
+
+def test_other_errors_fail_without_retry():
+    for error in (KeyError('davinci_calc'), ValueError('bad amount')):
+        backend = FlakyBackend(error)
+        result = _run(backend)
+        assert not result['ok'] and result['attempts'] == 1 and backend.calls == 1
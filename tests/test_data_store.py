@@ -0,0 +1,35 @@
+import os
+import shutil
+
+import pandas as pd
+
+from modules import data_loader, data_store, shadow_payroll, simulation
+
+
+def _copy_with_blank_pay(tmp_path):
+    for table in data_store.TABLES:
+        shutil.copy(os.path.join(data_loader.DATA_DIR, f"{table}.csv"), tmp_path)
+    path = tmp_path / 'hr_master.csv'
+    hr_master = pd.read_csv(path, dtype=str)
+    hr_master.loc[hr_master['employee_id'] == '1002', ['base_salary', 'family_count']] = None
+    hr_master.to_csv(path, index=False)
+    return str(tmp_path)
+
+
+def test_blank_pay_cells_load_as_na_and_are_reported(tmp_path, capsys):
+    data_dir = _copy_with_blank_pay(tmp_path)
+    hr_master = data_store.load_table('hr_master', data_dir)
+    assert hr_master['base_salary'].isna().sum() == 1
+    assert hr_master['family_count'].isna().sum() == 1
+    assert 'blank base_salary (employee_id [1002])' in capsys.readouterr().out
+
+    # Served from the cache the second time, still nullable
+    assert str(data_store.load_table('hr_master', data_dir)['base_salary'].dtype) == 'Int64'
+
+
+def test_blank_pay_cells_do_not_break_payroll(tmp_path):
+    data = data_loader.load_data(data_dir=_copy_with_blank_pay(tmp_path))
+    ledger = shadow_payroll.build_ledger(data)
+    assert 1002 not in ledger['employee_id'].tolist()
+    issues = simulation.evaluate(simulation.prepare(data), {})['issues']
+    assert issues['min_wage'] == 1
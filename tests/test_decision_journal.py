@@ -0,0 +1,89 @@
+from modules import decision_journal, issue_store
+
+
+def _issues(n=10):
+    return [{'issue_id': f"ISSUE-{k}", 'type': 'Auditor', 'title': '소급', 'workplace': '본사',
+             'diff': 10000 * (k + 1), 'status': 'Pending'} for k in range(n)]
+
+
+def _reopen(journal, issues):
+    """A fresh session: restore the journal, then rebase onto the shared issues."""
+    store = issue_store.IssueStore(journal=journal)
+    store.restore(journal.load())
+    store.rebase(issues)
+    return store
+
+
+def test_replay_hides_decided_issues_and_restores_local_ones(tmp_path):
+    path = str(tmp_path / 'decisions.sqlite')
+    issues = _issues()
+    store = _reopen(decision_journal.open_journal('kim', path), issues)
+    store.transition('ISSUE-1', 'Applied', 'DB 반영')
+    store.transition_many(['ISSUE-2', 'ISSUE-3'], 'Ignored', '무시')
+    store.add({'issue_id': 'PAY-1', 'type': 'Auditor', 'title': '복리후생', 'diff': 5000, 'status': 'Pending'},
+              local=True)
+
+    again = _reopen(decision_journal.open_journal('kim', path), issues)
+    expected = ['PAY-1'] + [f"ISSUE-{k}" for k in (0, 4, 5, 6, 7, 8, 9)]
+    assert sorted(issue['issue_id'] for issue in again.pending()) == sorted(expected)
+    assert again.decisions() == {'ISSUE-1': 'Applied', 'ISSUE-2': 'Ignored', 'ISSUE-3': 'Ignored'}
+
+    # Another owner's queue is untouched by kim's decisions
+    assert len(_reopen(decision_journal.open_journal('lee', path), issues)) == len(issues)
+
+
+def test_a_reused_id_with_new_content_is_not_hidden(tmp_path):
+    journal = decision_journal.open_journal(path=str(tmp_path / 'decisions.sqlite'))
+    issues = _issues()
+    _reopen(journal, issues).transition('ISSUE-0', 'Applied', 'DB 반영')
+    changed = [dict(issue, diff=issue['diff'] + 1) if issue['issue_id'] == 'ISSUE-0' else issue for issue in issues]
+    assert 'ISSUE-0' in _reopen(journal, changed)
+    assert 'ISSUE-0' not in _reopen(journal, issues)
+
+
+def test_group_writes_a_bulk_action_in_one_transaction(tmp_path):
+    journal = decision_journal.open_journal(path=str(tmp_path / 'decisions.sqlite'))
+    store = _reopen(journal, _issues())
+    with store.batch():
+        store.transition_many(['ISSUE-0', 'ISSUE-1'], 'Applied', 'DB 반영')
+        store.add({'issue_id': 'PAY-1', 'type': 'Auditor', 'title': '복리후생', 'diff': 1, 'status': 'Pending'},
+                  local=True)
+        assert journal.stats()['rows'] == 0
+    assert journal.stats()['rows'] == 3
+
+
+def test_compaction_keeps_the_replayed_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_journal, 'SNAPSHOT_EVERY', 5)
+    journal = decision_journal.open_journal(path=str(tmp_path / 'decisions.sqlite'))
+    issues = _issues(20)
+    store = _reopen(journal, issues)
+    for k in range(8):
+        store.transition(f"ISSUE-{k}", 'Applied', 'DB 반영')
+    uncompacted = journal.load(compact=False)
+
+    compacted = journal.load()
+    assert journal.stats()['rows'] == 0 and journal.stats()['snapshot_seq'] is not None
+    assert compacted.decisions == uncompacted.decisions
+    assert [item['issue_id'] for item in compacted.completed] == [item['issue_id'] for item in uncompacted.completed]
+
+    # Rows after the snapshot replay on top of it
+    _reopen(journal, issues).transition('ISSUE-10', 'Ignored', '무시')
+    assert journal.stats()['rows'] == 1
+    assert journal.load().decisions == dict(uncompacted.decisions, **{'ISSUE-10': 'Ignored'})
+
+
+def test_expired_history_prunes_its_decisions(tmp_path, monkeypatch):
+    monkeypatch.setattr(issue_store, 'HISTORY_LIMIT', 3)
+    journal = decision_journal.open_journal(path=str(tmp_path / 'decisions.sqlite'))
+    issues = _issues()
+    store = _reopen(journal, issues)
+    for k in range(5):
+        store.transition(f"ISSUE-{k}", 'Applied', 'DB 반영')
+    # Only the newest three decisions are still remembered, in the store and on replay
+    assert sorted(store.decisions()) == ['ISSUE-2', 'ISSUE-3', 'ISSUE-4']
+    store.rebase(issues)
+    assert 'ISSUE-0' in store and 'ISSUE-4' not in store
+
+    state = journal.load(compact=False)
+    state.trim(3)
+    assert sorted(state.decisions) == ['ISSUE-2', 'ISSUE-3', 'ISSUE-4']
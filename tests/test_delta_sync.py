@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pandas as pd
+
+from modules import data_loader, data_store, delta_sync, employee_index, logic_auditor, logic_chaser, pipeline
+
+
+def _copy_demo_data(tmp_path):
+    for name in os.listdir(data_loader.DATA_DIR):
+        if name.endswith('.csv'):
+            shutil.copy(os.path.join(data_loader.DATA_DIR, name), tmp_path)
+    return str(tmp_path)
+
+
+def _append(data_dir, table, lines):
+    with open(os.path.join(data_dir, f"{table}.csv"), 'a', encoding='utf-8') as f:
+        f.write(''.join(line + '\n' for line in lines))
+
+
+def _full_detection(data_dir):
+    data_store.clear_cache(data_dir)
+    data = data_loader.load_data(data_dir=data_dir)
+    names = employee_index.build_name_index(data['hr_master'])
+    issues = (logic_chaser.get_chaser_issues(data['tna_record'], data['hr_master'], names)
+              + logic_auditor.get_auditor_issues(data['shadow_ledger'], data['hr_master'], names))
+    return data, issues
+
+
+def _assert_matches_full_detection(sync, data_dir):
+    data, issues = _full_detection(data_dir)
+    synced = sync.get_issues()
+    assert [issue['issue_id'] for issue in synced] == [issue['issue_id'] for issue in issues]
+    assert synced == issues
+    for table in data:
+        pd.testing.assert_frame_equal(sync.tables[table].astype(object), data[table].astype(object))
+    assert (pipeline.build_issues(dict(sync.tables), data_dir, detected=synced)
+            == pipeline.build_issues(data, data_dir))
+
+
+def test_appends_match_full_detection(tmp_path):
+    data_dir = _copy_demo_data(tmp_path)
+    sync = delta_sync.DeltaSync(data_dir, keep_tables=True)
+    sync.sync()
+    _assert_matches_full_detection(sync, data_dir)
+    idle = sync.sync()
+    assert not idle['added'] | idle['modified'] | idle['retired']
+    assert all(stats['new'] == 0 for stats in idle['rows'].values())
+
+    _append(data_dir, 'tna_record', ['1001,2025-11-17,미마감,9', '1003,2025-11-16,마감,8'])
+    # Ids that sort differently as text and as numbers, plus a correction of an existing line
+    _append(data_dir, 'shadow_ledger', [
+        'ISSUE-10,1004,소급,3400000,3200000,200000,10월 급여 소급,Pending,',
+        'ISSUE-9,1002,일할,3000000,4000000,-1000000,휴직 일할,Pending,',
+        'ISSUE-004,1004,수당,3400000,3200000,200000,자녀 출산으로 인한 가족수당 추가 (정정),Pending,'
+    ])
+    result = sync.sync()
+    # 1003 / 11-16 is not past the date watermark: a correction of a known day
+    assert result['rows']['tna_record'] == {'new': 1, 'changed': 1, 'rescanned': False}
+    assert result['rows']['shadow_ledger'] == {'new': 2, 'changed': 1, 'rescanned': False}
+    assert {'ISSUE-10', 'ISSUE-9'} <= result['added']
+    _assert_matches_full_detection(sync, data_dir)
+
+
+def test_hr_master_change_rescans_dependent_tables(tmp_path):
+    data_dir = _copy_demo_data(tmp_path)
+    sync = delta_sync.DeltaSync(data_dir, keep_tables=True)
+    sync.sync()
+    path = os.path.join(data_dir, 'hr_master.csv')
+    hr_master = pd.read_csv(path)
+    hr_master.loc[hr_master['employee_id'] == 1003, 'name'] = '박민호'
+    hr_master.to_csv(path, index=False)
+
+    sync.sync()
+    assert {issue['name'] for issue in sync.get_issues() if issue['employee_id'] == 1003} == {'박민호'}
+    _assert_matches_full_detection(sync, data_dir)
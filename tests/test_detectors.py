@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from modules import data_loader, logic_ghost_shift, logic_role_pay, shadow_payroll
+
+
+@pytest.fixture(scope='module')
+def demo():
+    return data_loader.load_data(data_dir=data_loader.DATA_DIR)
+
+
+def test_ghost_shift_flags_only_the_short_presence_day(demo):
+    gate_log = logic_ghost_shift.load_gate_log(data_loader.DATA_DIR)
+    ghosts = logic_ghost_shift.find_ghost_shifts(demo['tna_record'], gate_log, tolerance=60)
+    # 11/15: 8h recorded, 8h18m at the gate; 11/16: 8h recorded, 2h28m at the gate
+    assert ghosts['employee_id'].tolist() == [1003]
+    assert pd.Timestamp(ghosts['date'].iloc[0]) == pd.Timestamp('2025-11-16')
+    assert ghosts[['recorded_minutes', 'present_minutes', 'gap_minutes']].iloc[0].tolist() == [480, 148, 332]
+    assert logic_ghost_shift.find_ghost_shifts(demo['tna_record'], gate_log, tolerance=332).empty
+
+    issues = logic_ghost_shift.get_ghost_shift_issues(demo['tna_record'], demo['hr_master'], data_loader.DATA_DIR,
+                                                      tolerance=60)
+    assert [(issue['issue_id'], issue['name']) for issue in issues] == [('GHOST-1003', '박민수')]
+
+
+def test_role_pay_candidate_on_the_demo_ledger(demo):
+    candidates = logic_role_pay.role_pay_candidates(demo)
+    assert candidates[['issue_id', 'employee_id', 'allowance', 'amount', 'change', 'months_since_change']] \
+        .to_dict('records') == [{'issue_id': 'ISSUE-005', 'employee_id': 1003, 'allowance': '위험수당',
+                                 'amount': 150000, 'change': '현장직 -> 사무직 발령', 'months_since_change': 4}]
+
+
+def test_detectors_tolerate_duplicate_hr_master_ids(demo):
+    data = dict(demo, hr_master=pd.concat([demo['hr_master'], demo['hr_master'].iloc[[2]]], ignore_index=True))
+    assert logic_role_pay.role_pay_candidates(data)['issue_id'].tolist() == ['ISSUE-005']
+    assert shadow_payroll.build_ledger(data).equals(shadow_payroll.build_ledger(demo))
+
+
+def test_shadow_ledger_diffs_against_the_ledger_davinci_calc(demo):
+    ledger = shadow_payroll.build_ledger(demo).set_index('issue_id')
+    # 1001's retro raise and 1004's family allowance match ledger rows of the same item
+    assert ledger.loc['CALC-1001-R0', ['davinci_calc', 'melzi_calc', 'diff']].tolist() == [5000000, 5450000, 450000]
+    assert ledger.loc['CALC-1004-F0', ['davinci_calc', 'melzi_calc', 'diff']].tolist() == [3200000, 3300000, 100000]
+    # 1002's 휴직 proration (9 of 30 days) against Davinci's 0 for the 일할 item
+    assert ledger.loc['CALC-1002-P0', ['davinci_calc', 'melzi_calc']].tolist() == [0, 1200000]
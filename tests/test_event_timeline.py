@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from modules import event_timeline
+
+ACTIVE, LEAVE, LEFT, NOT_HIRED = (event_timeline.ACTIVE, event_timeline.LEAVE, event_timeline.LEFT,
+                                  event_timeline.NOT_HIRED)
+
+
+@pytest.fixture
+def timeline():
+    hr_master = pd.DataFrame({'employee_id': [1001, 1002, 1003, 1004],
+                              'base_salary': [5000000, 4000000, 3000000, 2800000]})
+    events = pd.DataFrame([
+        # employee_id, event_date (entered), effective_date, event_type
+        (1001, '2025-11-15', '2025-10-01', '승진'),
+        (1001, '2025-11-20', '2025-11-20', '승진'),
+        (1002, '2025-11-10', '2025-11-10', '휴직'),
+        (1003, '2025-11-20', '2025-11-20', '퇴사'),
+        (1004, '2025-11-03', '2025-11-15', '입사'),
+    ], columns=['employee_id', 'event_date', 'effective_date', 'event_type'])
+    events['description'] = events['event_type']
+    for column in ('event_date', 'effective_date'):
+        events[column] = pd.to_datetime(events[column])
+    return event_timeline.build_timeline({'hr_master': hr_master, 'hr_event_log': events}, raise_rate=0.1)
+
+
+def test_as_of_salary_follows_effective_dates(timeline):
+    salary, status = timeline.as_of([1001] * 4, ['2025-09-30', '2025-10-01', '2025-11-19', '2025-11-20'])
+    assert salary.tolist() == [5000000, 5500000, 5500000, 6050000]
+    assert status.tolist() == [ACTIVE] * 4
+
+
+def test_as_of_status_boundaries(timeline):
+    ids = [1002, 1002, 1003, 1003, 1004, 1004]
+    dates = ['2025-11-09', '2025-11-10', '2025-11-20', '2025-11-21', '2025-11-14', '2025-11-15']
+    _, status = timeline.as_of(ids, dates)
+    # 휴직 stops pay on its day, 퇴사 still pays its day, nobody is active before 입사
+    assert status.tolist() == [ACTIVE, LEAVE, ACTIVE, LEFT, NOT_HIRED, ACTIVE]
+
+
+def test_as_of_unknown_employee_raises(timeline):
+    with pytest.raises(KeyError):
+        timeline.as_of([1001, 9999], '2025-11-01')
+
+
+def test_paid_days_for_the_payroll_month(timeline):
+    paid, days, _ = timeline.paid_days(pd.Timestamp('2025-11-01'))
+    assert days == 30
+    assert paid.tolist() == [30, 9, 20, 16]
+
+
+def test_only_late_promotions_are_retroactive(timeline):
+    late = timeline.late_entries(pd.Timestamp('2025-11-01'))
+    assert late['employee_id'].tolist() == [1001]
+    assert late['periods'].tolist() == [1]
+    _, rows, delta, periods = timeline.retro_deltas(pd.Timestamp('2025-11-01'))
+    assert rows.tolist() == [0] and delta.tolist() == [500000] and periods.tolist() == [1]
+    # Entered in November: nothing is late for October's payroll
+    assert timeline.late_entries(pd.Timestamp('2025-10-01')).empty
+
+
+def test_duplicate_hr_master_ids_use_the_first_row():
+    hr_master = pd.DataFrame({'employee_id': [1001, 1002, 1001], 'base_salary': [5000000, 4000000, 1]})
+    events = pd.DataFrame({'employee_id': [1001], 'event_date': pd.to_datetime(['2025-11-01']),
+                           'effective_date': pd.to_datetime(['2025-11-01']), 'event_type': ['승진'],
+                           'description': ['승진']})
+    timeline = event_timeline.build_timeline({'hr_master': hr_master, 'hr_event_log': events}, raise_rate=0.1)
+    salary, _ = timeline.as_of([1001, 1001], ['2025-10-31', '2025-11-01'])
+    assert salary.tolist() == [5000000, 5500000]
+    assert timeline.events_of(1001).tolist() == [0]
@@ -0,0 +1,36 @@
+import random
+
+from ui import grouping
+
+
+def _issue(n, rng):
+    return {'issue_id': f"ISSUE-{n}", 'type': rng.choice(['Chaser', 'Auditor', 'Welfare']),
+            'workplace': rng.choice(['본사', '대전']), 'special_status': None, 'event_id': None,
+            'diff': rng.randint(-5, 5) * 10000}
+
+
+def test_pivot_pages_match_a_full_sort_under_adds_and_removals():
+    rng = random.Random(7)
+    pivot = grouping.PivotIndex()
+    live = {}
+    for n in range(2000):
+        if live and rng.random() < 0.45:
+            issue = live.pop(rng.choice(list(live)))
+            pivot.issue_removed(issue)
+        else:
+            # Ids are reused now and then, like a decision undone on rebase
+            issue = _issue(rng.randrange(n + 1), rng)
+            if issue['issue_id'] in live:
+                continue
+            live[issue['issue_id']] = issue
+            pivot.issue_added(issue)
+
+        if n % 97 == 0:
+            for group in pivot.groups('workplace'):
+                members = [issue for issue in live.values() if f"🏭 {issue['workplace']}" == group['title']]
+                assert group['count'] == len(members)
+                ranked = [issue['issue_id'] for issue in pivot.issues(group)]
+                assert sorted(ranked) == sorted(issue['issue_id'] for issue in members)
+                assert [abs(issue['diff']) for issue in pivot.issues(group)] == \
+                    sorted((abs(issue['diff']) for issue in members), reverse=True)
+                assert [issue['issue_id'] for issue in pivot.issues(group, 5, 15)] == ranked[5:15]
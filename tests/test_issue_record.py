@@ -0,0 +1,18 @@
+import pickle
+
+from modules import issue_record
+
+
+def test_copy_is_a_mutable_dict_and_leaves_the_record_alone():
+    record = issue_record.IssueRecord({'issue_id': 'ISSUE-1', 'type': 'Auditor', 'diff': 150000, 'extra': 1})
+    copied = record.copy()
+    copied['type'] = 'Chaser'
+    assert copied == {'issue_id': 'ISSUE-1', 'type': 'Chaser', 'diff': 150000, 'extra': 1}
+    assert record['type'] == 'Auditor'
+
+
+def test_record_round_trips_through_pickle_with_absent_fields_absent():
+    record = issue_record.IssueRecord({'issue_id': 'ISSUE-1', 'type': 'Chaser'})
+    restored = pickle.loads(pickle.dumps(record))
+    assert dict(restored) == dict(record)
+    assert 'diff' not in restored and restored.get('diff', 0) == 0
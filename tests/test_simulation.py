@@ -0,0 +1,29 @@
+from modules import config_manager, data_loader, insight_engine, issue_store, logic_role_pay, pipeline, simulation
+
+
+def _role_pay_counts(data, store, engine):
+    """(simulation role-pay count, insight role-pay lines) under the default config."""
+    base = simulation.prepare(data, store.by('type', 'Chaser'), pending=store)
+    simulated = simulation.evaluate(base, config_manager.DEFAULT_CONFIG)['issues']['role_pay_mismatch']
+    flagged = [issue_id for insight in engine.insights() if insight['type'] == 'Role-Pay Mismatch'
+               for issue_id in insight['issue_ids']]
+    return simulated, len(flagged)
+
+
+def test_role_pay_count_matches_insight_after_decision(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_manager, 'CONFIG_PATH', str(tmp_path / 'config.json'))
+    data = data_loader.load_data(data_dir=data_loader.DATA_DIR)
+    candidates = logic_role_pay.role_pay_candidates(data)
+    store = issue_store.IssueStore(pipeline.build_issues(data, role_pay=candidates))
+    engine = insight_engine.InsightEngine(logic_role_pay.index_by_employee(candidates))
+    store.subscribe(engine)
+
+    assert _role_pay_counts(data, store, engine) == (1, 1)
+    store.transition('ISSUE-005', 'Resolved', '환수 제안')
+    assert _role_pay_counts(data, store, engine) == (0, 0)
+
+
+def test_prepare_without_store_counts_every_line():
+    data = data_loader.load_data(data_dir=data_loader.DATA_DIR)
+    base = simulation.prepare(data)
+    assert base.role_change_months.tolist() == [4]
@@ -2,6 +2,7 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from ui import figure_cache
 
 def render_chaser_card(issue, on_approve, on_ignore=None, key_suffix="", read_only=False):
     """Renders a card for Attendance Issues (The Chaser)."""
@@ -46,8 +47,69 @@ def render_chaser_card(issue, on_approve, on_ignore=None, key_suffix="", read_on
             status_color = "#059669" if issue.get('status') == 'Approved' else "#6b7280"
             st.markdown(f"<div style='text-align: right; color: {status_color}; font-weight: bold;'>Status: {issue.get('status', 'Completed')}</div>", unsafe_allow_html=True)
 
-def render_auditor_card(issue, on_apply, on_ignore, on_select, key_suffix="", read_only=False):
-    """Renders a card for Payroll Issues (The Auditor)."""
+def build_retro_figure(issue):
+    """Waterfall chart for a retroactive (소급) issue."""
+    # Waterfall Chart simulated with Bar Chart for full color control
+    fig = go.Figure(go.Bar(
+        x = ["기존 급여", "승진 인상분", "최종 급여"],
+        y = [5000000, 450000, 5450000],
+        base = [0, 5000000, 0], # Start positions for the bars
+        text = ["500만", "+45만", "545만"],
+        textposition = "outside",
+        marker_color = ["#9ca3af", "#10b981", "#3b82f6"], # Gray, Green, Blue
+        width = [0.5, 0.5, 0.5]
+    ))
+
+    fig.update_layout(
+        title = "<b>급여 변동 워터폴 분석</b>",
+        showlegend = False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=350,
+        margin=dict(l=20, r=20, t=50, b=20),
+        yaxis=dict(range=[4000000, 6000000])
+    )
+    return fig
+
+def build_proration_figure(issue):
+    """Gantt chart for a prorated (일할) issue."""
+    # Gantt Chart for Proration
+    df_timeline = pd.DataFrame([
+        dict(Task="근무 (유급)", Start='2025-11-01', Finish='2025-11-09', Resource='Work'),
+        dict(Task="휴직 (무급)", Start='2025-11-10', Finish='2025-11-30', Resource='Leave')
+    ])
+    colors = {'Work': '#3b82f6', 'Leave': '#e5e7eb'}
+    fig = px.timeline(
+        df_timeline, x_start="Start", x_end="Finish", y="Task", color="Resource", 
+        title="<b>일할 계산 기간 시각화</b>", color_discrete_map=colors, height=200
+    )
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(showlegend=True, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', height=250)
+    return fig
+
+# Issue fields each chart builder reads (figure_cache key); both charts are static demo figures for now
+FIGURE_INPUTS = {'retro': (), 'proration': ()}
+
+# Static mode: no zoom/hover/modebar, so the browser draws many cards quickly (bulk views)
+STATIC_CHART_CONFIG = {'staticPlot': True}
+
+def render_issue_chart(issue, kind, build_figure, chart_key, lazy=False, static=False):
+    """
+    Draws an issue chart from the shared figure cache.
+    When lazy, the figure is only looked up after the user toggles it open.
+    """
+    if lazy and not st.toggle("📈 차트 보기", key=f"toggle_{chart_key}"):
+        return
+    figure = figure_cache.get_figure(kind, issue, build_figure, FIGURE_INPUTS[kind])
+    st.plotly_chart(figure, use_container_width=True, key=chart_key, config=STATIC_CHART_CONFIG if static else None)
+
+def render_auditor_card(issue, on_apply, on_ignore, on_select, key_suffix="", read_only=False, lazy_charts=False,
+                        static_charts=False):
+    """
+    Renders a card for Payroll Issues (The Auditor).
+    With lazy_charts=True, charts are only drawn for cards the user opens;
+    static_charts=True draws them without interactivity.
+    """
     diff = issue['diff']
     diff_fmt = f"{diff:+,}"
     diff_class = "positive-diff" if diff > 0 else "negative-diff"
@@ -98,27 +160,8 @@ def render_auditor_card(issue, on_apply, on_ignore, on_select, key_suffix="", re
                     </div>
                     """, unsafe_allow_html=True)
 
-                    # Waterfall Chart simulated with Bar Chart for full color control
-                    fig = go.Figure(go.Bar(
-                        x = ["기존 급여", "승진 인상분", "최종 급여"],
-                        y = [5000000, 450000, 5450000],
-                        base = [0, 5000000, 0], # Start positions for the bars
-                        text = ["500만", "+45만", "545만"],
-                        textposition = "outside",
-                        marker_color = ["#9ca3af", "#10b981", "#3b82f6"], # Gray, Green, Blue
-                        width = [0.5, 0.5, 0.5]
-                    ))
-
-                    fig.update_layout(
-                        title = "<b>급여 변동 워터폴 분석</b>",
-                        showlegend = False,
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        height=350,
-                        margin=dict(l=20, r=20, t=50, b=20),
-                        yaxis=dict(range=[4000000, 6000000])
-                    )
-                    st.plotly_chart(fig, use_container_width=True, key=f"chart_retro_{issue['issue_id']}_{key_suffix}")
+                    render_issue_chart(issue, 'retro', build_retro_figure, f"chart_retro_{issue['issue_id']}_{key_suffix}",
+                                       lazy_charts, static_charts)
                     
                 elif issue['title'] == '일할':
                     # Calculation Detail
@@ -132,19 +175,8 @@ def render_auditor_card(issue, on_apply, on_ignore, on_select, key_suffix="", re
                     </div>
                     """, unsafe_allow_html=True)
 
-                    # Gantt Chart for Proration
-                    df_timeline = pd.DataFrame([
-                        dict(Task="근무 (유급)", Start='2025-11-01', Finish='2025-11-09', Resource='Work'),
-                        dict(Task="휴직 (무급)", Start='2025-11-10', Finish='2025-11-30', Resource='Leave')
-                    ])
-                    colors = {'Work': '#3b82f6', 'Leave': '#e5e7eb'}
-                    fig = px.timeline(
-                        df_timeline, x_start="Start", x_end="Finish", y="Task", color="Resource", 
-                        title="<b>일할 계산 기간 시각화</b>", color_discrete_map=colors, height=200
-                    )
-                    fig.update_yaxes(autorange="reversed")
-                    fig.update_layout(showlegend=True, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', height=250)
-                    st.plotly_chart(fig, use_container_width=True, key=f"chart_proration_{issue['issue_id']}_{key_suffix}")
+                    render_issue_chart(issue, 'proration', build_proration_figure, f"chart_proration_{issue['issue_id']}_{key_suffix}",
+                                       lazy_charts, static_charts)
                 
                 col1, col2, col3 = st.columns([0.6, 0.2, 0.2])
                 with col2:
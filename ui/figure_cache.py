@@ -0,0 +1,75 @@
+"""
+Process-wide LRU cache of issue chart figures (no Streamlit imports).
+
+Building a Plotly figure (px.timeline especially) costs far more than
+drawing it, and the same Auditor card is drawn on every rerun, in every tab
+the issue appears in and in every session. Figures are keyed by the chart
+kind plus the issue fields the builder reads (`inputs`; none for a static
+chart, so it is built once for all issues) and evicted LRU past MAX_FIGURES.
+
+The cache holds each figure's JSON, not the figure: every call gets its own
+go.Figure rebuilt without re-validation (about 1ms), so a session changing
+its copy cannot affect another session's chart.
+
+    fig = figure_cache.get_figure('retro', issue, cards.build_retro_figure, cards.FIGURE_INPUTS['retro'])
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from modules import instrumentation
+
+MAX_FIGURES = 512
+
+_lock = threading.Lock()
+_figures = OrderedDict()   # (kind, *input values) -> figure JSON, least recently used first
+_hits = 0
+_misses = 0
+
+def figure_key(kind, issue, inputs=()):
+    return (kind,) + tuple(issue.get(field) for field in inputs)
+
+def _thaw(spec):
+    # The JSON came from a validated figure, so skip validation on the way back
+    return go.Figure(json.loads(spec), _validate=False)
+
+def get_figure(kind, issue, build_figure, inputs=()):
+    """
+    A new figure for `issue` from the cached JSON, built with build_figure(issue) on a miss.
+    `inputs` names the issue fields build_figure reads.
+    """
+    global _hits, _misses
+    key = figure_key(kind, issue, inputs)
+    with _lock:
+        spec = _figures.get(key)
+        if spec is not None:
+            _figures.move_to_end(key)
+            _hits += 1
+    if spec is not None:
+        instrumentation.count('figures.hit')
+        return _thaw(spec)
+
+    # Built outside the lock; two sessions missing the same key at once both build, last one wins
+    with instrumentation.span('figures.build'):
+        figure = build_figure(issue)
+        spec = figure.to_json()
+    with _lock:
+        _figures[key] = spec
+        _figures.move_to_end(key)
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+        _misses += 1
+    instrumentation.count('figures.miss')
+    return figure
+
+def clear():
+    global _hits, _misses
+    with _lock:
+        _figures.clear()
+        _hits = _misses = 0
+
+def stats():
+    with _lock:
+        return {'figures': len(_figures), 'max_figures': MAX_FIGURES, 'hits': _hits, 'misses': _misses}
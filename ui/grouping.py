@@ -0,0 +1,225 @@
+"""
+Grouping and table preparation for the Pivot View (no Streamlit imports).
+
+render_grouped_issues only draws what these helpers return: the list of
+groups with their precomputed summaries, the issues of one group ordered by
+impact, and the rows of the visible page.
+
+PivotIndex is an IssueStore listener that keeps all four pivot dimensions
+grouped at once (count, diff total and the impact ordering per group) and
+updates them per issue as the store changes, so switching views or tabs
+only reads.
+"""
+import itertools
+import math
+
+VIEW_MODES = ["이슈별 (Issue Type)", "특이사항별 (Special Status)", "사업장별 (Workplace)", "원인별 (Cause)"]
+
+# Pivot mode -> IssueStore index field
+MODE_FIELDS = {
+    "이슈별": 'type',
+    "특이사항별": 'special_status',
+    "사업장별": 'workplace',
+    "원인별": 'event_id'
+}
+
+# Strict 3 Categories for the Issue Type view
+ISSUE_TYPE_GROUPS = {
+    'Chaser': "🚨 [Action Required] 근태 소명",
+    'Auditor': "💰 [Approval Pending] 급여 변동 심사",
+    'Welfare': "🧾 [Claims] 의료비/복리후생"
+}
+
+DEFAULT_PAGE_SIZE = 20
+PAGE_SIZES = [10, 20, 50, 100]
+
+def mode_field(mode):
+    for prefix, field in MODE_FIELDS.items():
+        if prefix in mode:
+            return field
+    return 'type'
+
+def group_title(field, value):
+    """Expander title for one index value (same labels the grouping loop used to build)."""
+    if field == 'type':
+        return ISSUE_TYPE_GROUPS.get(value)
+    if field == 'special_status':
+        status = value or '일반 (특이사항 없음)'
+        # Add emoji based on status
+        emoji = "👤"
+        if "입사" in status: emoji = "🆕"
+        elif "퇴사" in status: emoji = "👋"
+        elif "휴직" in status: emoji = "🛌"
+        elif "복직" in status: emoji = "🔙"
+        elif "변경" in status: emoji = "🔄"
+        return f"{emoji} {status}"
+    if field == 'workplace':
+        return f"🏭 {value or 'Unknown'}"
+    return f"🔗 {value or 'Unknown Event'}"
+
+class PivotIndex:
+    """
+    Groups for every pivot dimension, maintained incrementally.
+    Each group keeps its issues in impact order (absolute diff, largest first; ties in
+    arrival order) as a sorted key list, so a page or top-N is a slice, not a sort.
+    Out-of-order arrivals are appended and the list is re-sorted on the next read
+    (near-sorted, so linear), which keeps a full replay O(n log n). Removals only count
+    the key as dead: reads skip dead keys, and the list is compacted once more than half
+    of it is dead, so a removal is amortized O(1) instead of an O(n) list delete.
+    """
+
+    def __init__(self):
+        self.store_reset()
+
+    # --- IssueStore listener ---
+    def store_reset(self):
+        self._arrival = itertools.count()
+        self._keys = {}     # issue_id -> sort key
+        self._groups = {field: {} for field in MODE_FIELDS.values()}  # field -> title -> group
+
+    def issue_added(self, issue):
+        issue_id = issue['issue_id']
+        diff = issue.get('diff', 0) or 0
+        key = (-abs(diff), next(self._arrival), issue_id)
+        self._keys[issue_id] = key
+        for field, groups in self._groups.items():
+            value = issue.get(field)
+            title = group_title(field, value)
+            if title is None:
+                continue
+            group = groups.get(title)
+            if group is None:
+                group = groups[title] = {'title': title, 'field': field, 'values': {}, 'count': 0,
+                                         'total_diff': 0, 'order': [], 'sorted': True, 'dead': 0, 'issues': {}}
+            order = group['order']
+            if group['sorted'] and order and order[-1] > key:
+                group['sorted'] = False
+            order.append(key)
+            group['issues'][issue_id] = issue
+            group['values'][value] = group['values'].get(value, 0) + 1
+            group['count'] += 1
+            group['total_diff'] += diff
+
+    def issue_removed(self, issue):
+        issue_id = issue['issue_id']
+        key = self._keys.pop(issue_id, None)
+        if key is None:
+            return
+        diff = issue.get('diff', 0) or 0
+        for field, groups in self._groups.items():
+            value = issue.get(field)
+            group = groups.get(group_title(field, value))
+            if group is None or group['issues'].pop(issue_id, None) is None:
+                continue
+            group['dead'] += 1
+            if group['dead'] * 2 > len(group['order']):
+                self._compact(group)
+            group['count'] -= 1
+            group['total_diff'] -= diff
+            if group['values'][value] == 1:
+                del group['values'][value]
+            else:
+                group['values'][value] -= 1
+            if not group['count']:
+                del groups[group['title']]
+
+    @staticmethod
+    def _order(group):
+        if not group['sorted']:
+            group['order'].sort()
+            group['sorted'] = True
+        return group['order']
+
+    def _live(self, key):
+        # Keys carry a unique arrival number, so a key is live only while its issue still maps to it
+        return self._keys.get(key[2]) == key
+
+    def _compact(self, group):
+        group['order'] = [key for key in group['order'] if self._live(key)]
+        group['dead'] = 0
+
+    # --- Reading ---
+    def groups(self, field):
+        """Non-empty groups of one dimension (the Issue Type view in its fixed category order)."""
+        groups = self._groups[field]
+        if field == 'type':
+            return [groups[title] for title in ISSUE_TYPE_GROUPS.values() if title in groups]
+        return list(groups.values())
+
+    def issues(self, group, start=0, stop=None):
+        """Issues of a group in impact order; start/stop select a page without touching the rest."""
+        lookup = group['issues']
+        order = self._order(group)
+        if not group['dead']:
+            return [lookup[key[2]] for key in order[start:stop]]
+        live = (key for key in order if self._live(key))
+        return [lookup[key[2]] for key in itertools.islice(live, start, stop)]
+
+class SqlPivot:
+    """
+    PivotIndex reading interface over a sql_issue_store.SqlIssueStore: groups are
+    GROUP BY queries and pages are LIMIT/OFFSET on the impact index, so nothing
+    needs to be maintained in memory.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def groups(self, field):
+        groups = {}
+        for value, count, total_diff in self.store.group_summaries(field):
+            title = group_title(field, value)
+            if title is None:
+                continue
+            group = groups.setdefault(title, {'title': title, 'field': field, 'values': {}, 'count': 0, 'total_diff': 0})
+            group['values'][value] = count
+            group['count'] += count
+            group['total_diff'] += total_diff
+        if field == 'type':
+            return [groups[title] for title in ISSUE_TYPE_GROUPS.values() if title in groups]
+        return list(groups.values())
+
+    def issues(self, group, start=0, stop=None):
+        return self.store.by_impact(group['field'], group['values'], start, stop)
+
+def list_groups(pivot, mode, issue_type=None):
+    """
+    Non-empty groups for a pivot mode as dicts {'title', 'field', 'values', 'count', 'total_diff'}.
+    With `issue_type`, only that type's group is returned (the per-type tabs always use the
+    Issue Type view).
+    """
+    if issue_type:
+        title = ISSUE_TYPE_GROUPS.get(issue_type)
+        return [group for group in pivot.groups('type') if group['title'] == title]
+    return pivot.groups(mode_field(mode))
+
+def group_issues(pivot, group, page=None, page_size=None):
+    """Issues of one group, sorted by impact (absolute diff, largest first); one page if given."""
+    if page is None:
+        return pivot.issues(group)
+    return pivot.issues(group, *page_bounds(group['count'], page, page_size))
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+def page_bounds(total, page, page_size):
+    """(start, stop) of a 1-based page of `total` items (page is clamped to the valid range)."""
+    page = min(max(1, page), page_count(total, page_size))
+    start = (page - 1) * page_size
+    return start, start + page_size
+
+def build_table_rows(issues, select_all=False):
+    """Rows for the selection table of the visible page."""
+    rows = []
+    for issue in issues:
+        rows.append({
+            "선택": select_all, # Default to Select All state
+            "ID": issue['issue_id'],
+            "이름": issue['name'],
+            "부서": issue.get('department', '-'), # Show Dept
+            "결재권자": issue.get('manager_id', '-'), # Added Manager Column
+            "내용": issue.get('description') or issue.get('reason') or issue.get('title'),
+            "차액": f"{issue.get('diff', 0):+,}원" if issue.get('diff') else "-",
+            "제안": "독촉" if issue['type'] == 'Chaser' else ("반영" if issue['type'] == 'Auditor' else "승인")
+        })
+    return rows